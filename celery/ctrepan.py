@@ -33,6 +33,12 @@ Inspired by celery.contrib.rdb
     The debugger will try to find an available port starting from the
     base port.  The selected port will be logged by the worker.
 
+.. envvar:: CELERY_TREPAN_HUB
+
+    ``host:port`` of a trepan hub (``python -m trepan.hub``). When set,
+    workers register with the hub instead of listening on a port of
+    their own, and clients attach to them through the hub.
+
 """
 from __future__ import absolute_import, print_function
 
@@ -40,13 +46,15 @@ import os
 import sys
 import trepan.api
 
-__all__ = ['CELERY_TREPAN_HOST', 'CELERY_TREPAN_PORT', 'default_port',
+__all__ = ['CELERY_TREPAN_HOST', 'CELERY_TREPAN_PORT', 'CELERY_TREPAN_HUB',
+           'default_port',
            'RemoteCeleryTrepan', 'debugger', 'debug']
 
 default_port = 6898
 
 CELERY_TREPAN_HOST = os.environ.get('CELERY_TREPAN_HOST') or '127.0.0.1'
 CELERY_TREPAN_PORT = int(os.environ.get('CELERY_TREPAN_PORT') or default_port)
+CELERY_TREPAN_HUB = os.environ.get('CELERY_TREPAN_HUB')
 
 #: Holds the currently active debugger.
 _current = [None]
@@ -89,7 +97,12 @@ class RemoteCeleryTrepan():
         self.ident = '{0}:{1}'.format(self.me, port)
 
         from trepan.interfaces import server as Mserver
-        connection_opts={'IO': 'TCP', 'PORT': port}
+        if CELERY_TREPAN_HUB:
+            hub_host, _, hub_port = CELERY_TREPAN_HUB.rpartition(':')
+            connection_opts = {'IO': 'HUB', 'HOST': hub_host or host,
+                               'PORT': int(hub_port)}
+        else:
+            connection_opts = {'IO': 'TCP', 'PORT': port}
         self.intf = Mserver.ServerInterface(connection_opts=connection_opts)
         host = self.intf.inout.HOST
         self.host = host if host else '<hostname>'
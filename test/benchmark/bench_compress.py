@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Measure how many bytes compressing a remote session saves.
+
+A debugger with a server interface is stopped in a small program and
+run through some typical commands. Instead of a socket, the interface
+writes to an object that records each message it sends. For each
+command we then report the bytes that would go on the wire as is, and
+compressed as trepan.inout.tcpfns does it when a connection is
+compressed: one zlib stream for the session, flushed after every
+message.
+
+Run standalone:
+
+    python test/benchmark/bench_compress.py [--json FILE] [--highlight STYLE]
+
+This file is not named test_*.py so that it isn't part of the regular
+test suite.
+"""
+
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from trepan.debugger import Trepan
+from trepan.inout import tcpfns as Mtcpfns
+from trepan.interfaces import comcodes as Mcomcodes
+from trepan.interfaces.server import ServerInterface
+from trepan.version import __version__
+
+COMMANDS = (
+    "list",
+    "disassemble",
+    "backtrace",
+    "backtrace -f",
+    "info locals",
+    "help next",
+)
+
+
+class RecordingInOut:
+    """Stands in for a TCPServer. Commands to run are given out in
+    turn; each message written is recorded under the command that
+    produced it."""
+
+    def __init__(self, commands):
+        self.commands = list(commands) + ["continue"]
+        self.command = None
+        self.written: List[Tuple[Optional[str], str]] = []
+        self.state = "connected"
+        return
+
+    def close(self):
+        self.state = "disconnected"
+        return
+
+    def read_msg(self):
+        self.command = self.commands.pop(0)
+        return Mcomcodes.CONFIRM_REPLY + self.command
+
+    def write(self, msg):
+        self.written.append((self.command, msg))
+        return
+
+    def writeline(self, msg):
+        self.write(msg + "\n")
+        return
+
+    pass
+
+
+def workload(n):
+    squares = [i * i for i in range(n)]
+    table = {str(i): squares[i] for i in range(n)}
+    return sum(table.values())
+
+
+def record_session(highlight: str) -> List[Tuple[Optional[str], str]]:
+    """Run COMMANDS in a stopped program and return the messages sent."""
+    inout = RecordingInOut(COMMANDS)
+    intf = ServerInterface(inout=inout)
+    dbg = Trepan({"interface": intf})
+    dbg.settings["highlight"] = highlight
+    dbg.run_call(workload, 20)
+    intf.flush()
+    return inout.written
+
+
+def measure(written) -> Dict[str, Any]:
+    compressor = Mtcpfns.Compressor()
+    sizes: Dict[str, List[int]] = {}
+    for command, msg in written:
+        raw = Mtcpfns.pack_frame(msg, Mtcpfns.FRAMING_V2)
+        packed = compressor(raw)
+        entry = sizes.setdefault(command or "(stop)", [0, 0])
+        entry[0] += len(raw)
+        entry[1] += len(packed)
+        pass
+    results = [
+        {
+            "command": command,
+            "bytes": raw,
+            "compressed": packed,
+            "ratio": packed / raw if raw else 1.0,
+        }
+        for command, (raw, packed) in sizes.items()
+    ]
+    total_raw = sum(r["bytes"] for r in results)
+    total_packed = sum(r["compressed"] for r in results)
+    return {
+        "trepan_version": __version__,
+        "results": results,
+        "total": {
+            "bytes": total_raw,
+            "compressed": total_packed,
+            "ratio": total_packed / total_raw,
+        },
+    }
+
+
+def run_benchmark(highlight: str = "dark") -> Dict[str, Any]:
+    report = measure(record_session(highlight))
+    report["highlight"] = highlight
+    return report
+
+
+def test_bench_compress():
+    report = run_benchmark()
+    assert report["total"]["compressed"] < report["total"]["bytes"] / 2
+    return
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--json", metavar="FILE", help="write results to FILE; '-' is stdout"
+    )
+    parser.add_argument(
+        "--highlight", choices=("light", "dark", "plain"), default="dark"
+    )
+    opts = parser.parse_args(argv)
+
+    report = run_benchmark(opts.highlight)
+    if opts.json:
+        if opts.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(opts.json, "w") as fp:
+                json.dump(report, fp, indent=2)
+        return 0
+
+    print(f"trepan3k {report['trepan_version']}, highlight {report['highlight']}")
+    print(f"{'command':16} {'bytes':>8} {'zlib':>8} {'ratio':>6}")
+    for r in report["results"] + [dict(command="total", **report["total"])]:
+        print(
+            f"{r['command']:16} {r['bytes']:8d} {r['compressed']:8d} "
+            f"{r['ratio']:6.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
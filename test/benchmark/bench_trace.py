@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Measure how much the debugger slows down a running program.
+
+Each workload is run with no debugger, and then under the debugger in
+each of these modes:
+
+  hook:        the debugger hook is installed and we "continue" with
+               no breakpoints
+  breakpoint:  one breakpoint is set, in code that never runs
+  conditional: a breakpoint whose condition is always false is set on
+               a line that runs often
+  next:        "next" over the call to the workload
+  trace:       "set trace on"; every event is printed
+  display:     "step" through the workload with two display
+               expressions
+
+For each, we report the time taken, the slowdown relative to no
+debugger, and the overhead in nanoseconds per trace event. The number
+of events is counted once, with a minimal sys.settrace() function.
+
+Stepping with displays stops at every event, so that mode is run on a
+smaller instance of each workload.
+
+Run standalone:
+
+    python test/benchmark/bench_trace.py [--json FILE] [--repeat N] ...
+
+or with pytest-benchmark:
+
+    python -m pytest test/benchmark/bench_trace.py
+
+This file is not named test_*.py so that it isn't part of the regular
+test suite.
+"""
+
+import json
+import os
+import os.path as osp
+import platform
+import runpy
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+srcdir = osp.abspath(osp.dirname(__file__))
+sys.path.insert(0, osp.join(srcdir, "..", ".."))
+
+from trepan.debugger import Trepan  # noqa
+from trepan.inout.stringarray import StringArrayInput, StringArrayOutput  # noqa
+from trepan.lib.default import DEBUGGER_SETTINGS  # noqa
+from trepan.version import __version__  # noqa
+
+EXAMPLE_DIR = osp.join(srcdir, "..", "example")
+
+MODES = ("hook", "breakpoint", "conditional", "next", "trace", "display")
+
+
+def hot_loop(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+
+def never_called():
+    return
+
+
+def drive(func: Callable, args: tuple):
+    """Run the workload under the debugger. In "next" mode we stop at
+    the call of this function and "next" over the workload."""
+    func(*args)
+    return
+
+
+@contextmanager
+def quiet():
+    """Discard the output of workloads, like hanoi's moves."""
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+
+class Workload(NamedTuple):
+    name: str
+    func: Callable
+    args: tuple
+    # Arguments for the "display" mode, which stops at every event.
+    small_args: tuple
+    # Line, relative to the start of func, for the conditional
+    # breakpoint and its always-false condition.
+    cond_offset: int
+    condition: str
+
+
+def load_workloads() -> Dict[str, Workload]:
+    with quiet():
+        fib = runpy.run_path(osp.join(EXAMPLE_DIR, "fib.py"))["fib"]
+        hanoi = runpy.run_path(osp.join(EXAMPLE_DIR, "hanoi.py"))["hanoi"]
+    return {
+        "fib": Workload("fib", fib, (15,), (4,), 1, "x < 0"),
+        "hanoi": Workload("hanoi", hanoi, (8, "a", "b", "c"), (3, "a", "b", "c"), 1, "n < 0"),
+        "hot_loop": Workload("hot_loop", hot_loop, (20000,), (10,), 3, "i < 0"),
+    }
+
+
+def count_events(func: Callable, args: tuple) -> int:
+    """Return the number of trace events that func(*args) produces."""
+    count = 0
+
+    def counter(_frame, _event, _arg):
+        nonlocal count
+        count += 1
+        return counter
+
+    with quiet():
+        sys.settrace(counter)
+        try:
+            func(*args)
+        finally:
+            sys.settrace(None)
+    # Don't count the "call" event of sys.settrace(None).
+    return count - 1
+
+
+def setup_debugger(workload: Workload, mode: str, backend: str):
+    """Create a debugger set up for `mode`. Return the debugger and the
+    start() options to use."""
+    if mode == "display":
+        cmds = ["display 1+1", "display __name__"] + ["step"] * 10000 + ["continue"]
+    elif mode == "next":
+        cmds = ["next", "next", "continue"]
+    else:
+        cmds = ["continue"]
+    # Each debugger gets its own settings so that "set trace on" here
+    # doesn't carry over to the next measurement.
+    settings = DEBUGGER_SETTINGS.copy()
+    settings["highlight"] = "plain"
+    d = Trepan(
+        {
+            "input": StringArrayInput(cmds),
+            "output": StringArrayOutput(),
+            "settings": settings,
+        }
+    )
+    core = d.core
+    core.step_ignore = 0 if mode in ("next", "display") else -1
+    if mode == "breakpoint":
+        code = never_called.__code__
+        core.bpmgr.add_breakpoint(
+            code.co_filename, code.co_firstlineno + 1, 0, func_or_code=code
+        )
+    elif mode == "conditional":
+        code = workload.func.__code__
+        core.bpmgr.add_breakpoint(
+            code.co_filename,
+            code.co_firstlineno + workload.cond_offset,
+            0,
+            condition=workload.condition,
+            func_or_code=code,
+        )
+    elif mode == "trace":
+        d.settings["trace"] = True
+    return d, {"backend": backend}
+
+
+def time_once(workload: Workload, mode: Optional[str], backend: str, small=False) -> float:
+    args = workload.small_args if small else workload.args
+    func = workload.func
+    with quiet():
+        if mode is None:
+            start = time.perf_counter()
+            func(*args)
+            return time.perf_counter() - start
+        d, start_opts = setup_debugger(workload, mode, backend)
+        core = d.core
+        start = time.perf_counter()
+        core.start(start_opts)
+        drive(func, args)
+        core.stop({"remove": True})
+        return time.perf_counter() - start
+
+
+def best_of(repeat: int, *time_args, **time_kwds) -> float:
+    return min(time_once(*time_args, **time_kwds) for _ in range(repeat))
+
+
+def run_benchmarks(
+    workload_names: Optional[Sequence[str]] = None,
+    modes: Sequence[str] = MODES,
+    backend: str = "settrace",
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Run benchmarks and return the results as a dictionary that is
+    suitable for JSON output."""
+    workloads = load_workloads()
+    if workload_names is None:
+        workload_names = list(workloads)
+    results: List[Dict[str, Any]] = []
+    for name in workload_names:
+        workload = workloads[name]
+        baselines = {}
+        for mode in modes:
+            small = mode == "display"
+            args = workload.small_args if small else workload.args
+            if small not in baselines:
+                baselines[small] = (
+                    best_of(repeat, workload, None, backend, small),
+                    count_events(workload.func, args),
+                )
+            baseline, events = baselines[small]
+            seconds = best_of(repeat, workload, mode, backend, small)
+            results.append(
+                {
+                    "workload": name,
+                    "mode": mode,
+                    "args": list(args),
+                    "events": events,
+                    "seconds": seconds,
+                    "baseline_seconds": baseline,
+                    "slowdown": seconds / baseline if baseline else None,
+                    "overhead_ns_per_event": (
+                        (seconds - baseline) * 1e9 / events if events else None
+                    ),
+                }
+            )
+            pass
+        pass
+    return {
+        "trepan_version": __version__,
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "backend": backend,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+# pytest-benchmark entry points. One benchmark per mode, on the hot
+# loop; the standalone script covers the full matrix.
+
+try:
+    import pytest_benchmark  # noqa
+except ImportError:
+    pytest_benchmark = None
+
+if pytest_benchmark is None and "pytest" in sys.modules:
+    import pytest
+
+    @pytest.fixture
+    def benchmark():
+        pytest.skip("pytest-benchmark is not installed")
+
+
+def _benchmark_mode(benchmark, mode):
+    workload = load_workloads()["hot_loop"]
+    small = mode == "display"
+    benchmark.extra_info["events"] = count_events(
+        workload.func, workload.small_args if small else workload.args
+    )
+    benchmark.pedantic(
+        time_once, args=(workload, mode, "settrace", small), rounds=3, iterations=1
+    )
+
+
+def test_bench_no_debugger(benchmark):
+    _benchmark_mode(benchmark, None)
+
+
+def test_bench_modes(benchmark, mode):
+    _benchmark_mode(benchmark, mode)
+
+
+def pytest_generate_tests(metafunc):
+    if "mode" in metafunc.fixturenames:
+        metafunc.parametrize("mode", MODES)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE; '-' is stdout")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is used")
+    parser.add_argument(
+        "--backend", choices=("settrace", "monitoring"), default="settrace"
+    )
+    parser.add_argument("--workload", action="append", choices=("fib", "hanoi", "hot_loop"))
+    parser.add_argument("--mode", action="append", choices=MODES)
+    opts = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        opts.workload, opts.mode or MODES, opts.backend, opts.repeat
+    )
+    if opts.json:
+        if opts.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(opts.json, "w") as fp:
+                json.dump(report, fp, indent=2)
+        return 0
+
+    print(
+        f"trepan3k {report['trepan_version']}, {report['python_implementation']} "
+        f"{report['python_version']}, backend {report['backend']}"
+    )
+    print(f"{'workload':10} {'mode':12} {'events':>8} {'seconds':>10} {'slowdown':>9} {'ns/event':>10}")
+    for r in report["results"]:
+        print(
+            f"{r['workload']:10} {r['mode']:12} {r['events']:8d} {r['seconds']:10.4f} "
+            f"{r['slowdown']:9.1f} {r['overhead_ns_per_event']:10.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
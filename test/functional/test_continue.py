@@ -0,0 +1,40 @@
+"""
+Functional test of debugger "continue" command with breakpoints set.
+"""
+
+from os.path import basename
+from pathlib import Path
+from test.functional.fn_helper import compare_output, strarray_setup
+
+import pyficache
+
+absolute_path = str(Path(__file__).absolute())
+short_name = basename(__file__)
+pyficache.update_cache(short_name)
+pyficache.file2file_remap.update({short_name: absolute_path})
+
+
+def square(x):
+    return x * x
+
+
+def test_continue_to_breakpoint():
+    # After "continue" only square() is traced. Stepping out of it
+    # after the breakpoint is hit has to trace the caller again.
+    cmds = ["break square()", "continue", "next", "next", "next", "continue"]
+    d = strarray_setup(cmds)
+    d.core.start()
+    x = 5  # NOQA
+    y = square(x)  # NOQA
+    z = 6  # NOQA
+    d.core.stop()
+    out = [
+        "-- x = 5  # NOQA",
+        "-> def square(x):",
+        "-- return x * x",
+        "<- return x * x",
+        "-- z = 6  # NOQA",
+    ]
+    compare_output(out, d)
+    assert d.core.full_trace_func is None
+    return
@@ -0,0 +1,61 @@
+"""
+Functional test of the sys.monitoring event backend.
+"""
+
+from os.path import basename
+from pathlib import Path
+from test.functional.fn_helper import compare_output, strarray_setup
+
+import pyficache
+import pytest
+
+from trepan.lib.monitor import HAVE_MONITORING
+
+absolute_path = str(Path(__file__).absolute())
+short_name = basename(__file__)
+pyficache.update_cache(short_name)
+pyficache.file2file_remap.update({short_name: absolute_path})
+
+START_OPTS = {"backend": "monitoring"}
+
+pytestmark = pytest.mark.skipif(
+    not HAVE_MONITORING, reason="sys.monitoring needs Python 3.12 or later"
+)
+
+
+def fact(x):
+    if x <= 1:
+        return 1
+    return x * fact(x - 1)
+
+
+def test_monitor_next():
+    cmds = ["next", "next", "continue"]
+    d = strarray_setup(cmds)
+    d.core.start(START_OPTS)
+    x = fact(4)  # NOQA
+    y = 5  # NOQA
+    z = 6  # NOQA
+    d.core.stop()
+    assert d.core.monitor is None
+    out = ["-- x = fact(4)  # NOQA", "-- y = 5  # NOQA", "-- z = 6  # NOQA"]
+    compare_output(out, d)
+    return
+
+
+def test_monitor_breakpoint():
+    cmds = ["break fact()", "continue", "delete 1", "continue"]
+    d = strarray_setup(cmds)
+    d.core.start(START_OPTS)
+    x = 5  # NOQA
+    y = fact(3)  # NOQA
+    monitor = d.core.monitor
+    # With no breakpoints left and no stepping, no events are needed
+    # anywhere.
+    assert monitor.global_events == 0
+    assert monitor.local_events == {}
+    z = fact(2)  # NOQA
+    d.core.stop()
+    out = ["-- x = 5  # NOQA", "-> def fact(x):"]
+    compare_output(out, d)
+    return
@@ -0,0 +1,55 @@
+"""
+Functional test of debugging a program with several threads.
+"""
+
+import threading
+from os.path import basename
+from pathlib import Path
+from test.functional.fn_helper import compare_output, strarray_setup
+
+import pyficache
+
+absolute_path = str(Path(__file__).absolute())
+short_name = basename(__file__)
+pyficache.update_cache(short_name)
+pyficache.file2file_remap.update({short_name: absolute_path})
+
+
+def square(x):
+    return x * x
+
+
+def test_thread_breakpoint():
+    # A thread started after the debugger stops at a breakpoint.
+    cmds = ["break square()", "continue", "continue"]
+    d = strarray_setup(cmds)
+    d.core.start()
+    x = 5  # NOQA
+    t = threading.Thread(target=square, args=(x,), name="worker")
+    t.start()
+    t.join()
+    d.core.stop()
+    out = ["-- x = 5  # NOQA", "-> def square(x):"]
+    compare_output(out, d)
+    assert "worker" == d.core.current_thread.name
+    return
+
+
+def test_thread_stepping():
+    # Stepping in one thread doesn't stop other threads.
+    cmds = ["set thread-policy stop-this-only", "next", "next", "next", "continue"]
+    d = strarray_setup(cmds)
+    d.core.start()
+    t = threading.Thread(target=square, args=(5,))
+    t.start()
+    t.join()
+    z = 6  # NOQA
+    d.core.stop()
+    out = [
+        "-- t = threading.Thread(target=square, args=(5,))",
+        "-- t.start()",
+        "-- t.join()",
+        "-- z = 6  # NOQA",
+    ]
+    compare_output(out, d)
+    return
@@ -0,0 +1,138 @@
+"""Unit test for trepan.interfaces.machine"""
+
+import io
+import json
+
+from trepan.debugger import Trepan
+from trepan.interfaces.machine import MachineInterface, plain_text_settings
+
+
+class KeptOpen(io.BytesIO):
+    """A BytesIO whose value can be read after the interface closes it."""
+
+    def close(self):
+        return
+
+    pass
+
+
+def read_messages(out):
+    return [json.loads(line) for line in out.getvalue().decode("utf-8").splitlines()]
+
+
+def test_requests_and_replies():
+    """Test that command output is gathered into one reply"""
+    inp = io.BytesIO(b'"info"\n\n{"id": 3, "command": "next"}\n[1]\n')
+    out = KeptOpen()
+    intf = MachineInterface(inp, out)
+    intf.msg("before any command")
+    assert "info" == intf.read_command()
+    intf.msg_nocr("part ")
+    intf.msg("one")
+    intf.errmsg("oops")
+    intf.result({"answer": 42})
+    assert "next" == intf.read_command()
+    intf.flush()
+
+    messages = read_messages(out)
+    assert {"event": "output", "text": "before any command"} == messages[0]
+    assert {
+        "event": "result",
+        "id": None,
+        "command": "info",
+        "output": ["part one"],
+        "errors": ["oops"],
+        "data": {"answer": 42},
+        "running": False,
+    } == messages[1]
+    assert 3 == messages[2]["id"]
+    assert messages[2]["running"]
+
+    out.truncate(0)
+    out.seek(0)
+    try:
+        intf.read_command()
+    except EOFError:
+        pass
+    else:
+        assert False, "Expecting EOFError"
+    assert "error" == read_messages(out)[0]["event"]
+    intf.finalize()
+    return
+
+
+def test_confirm():
+    """Test that confirm accepts booleans and yes/no strings"""
+    out = KeptOpen()
+    intf = MachineInterface(io.BytesIO(b'true\n"no"\n'), out)
+    assert intf.confirm("Really?", False)
+    assert not intf.confirm("Really?", True)
+    assert intf.confirm("Really?", True)
+    assert {"event": "confirm", "prompt": "Really?", "default": False} == (
+        read_messages(out)[0]
+    )
+    intf.finalize()
+    return
+
+
+def test_stop_and_results():
+    """Test the stop message and command results for a stopped program"""
+
+    def inc(x):
+        y = x + 1
+        return y
+
+    requests = b'"info locals"\n"backtrace 1"\n"continue"\n'
+    out = KeptOpen()
+    intf = MachineInterface(io.BytesIO(requests), out)
+    d = Trepan({"interface": intf})
+    d.settings["highlight"] = "plain"
+    assert 4 == d.run_call(inc, 3)
+    intf.finalize()
+
+    messages = read_messages(out)
+    stop = messages[0]
+    assert "stop" == stop["event"]
+    assert "inc" == stop["location"]["function"]
+    x_info = {"type": "int", "length": None, "preview": "3", "handle": None}
+    assert {"x": x_info} == stop["locals"]
+    assert "inc" == stop["stack"][0]["function"]
+    assert stop["stack"][0]["current"]
+
+    locals_reply = messages[1]
+    assert "info locals" == locals_reply["command"]
+    assert ["x = 3"] == locals_reply["output"]
+    assert {"x": x_info} == locals_reply["data"]
+
+    backtrace_reply = messages[2]
+    assert 1 == len(backtrace_reply["data"])
+    assert "inc" == backtrace_reply["data"][0]["function"]
+
+    assert messages[3]["running"]
+    assert "exit" == messages[-1]["event"]
+    return
+
+
+def test_plain_text_output():
+    """Test that there are no terminal escape sequences in command
+    output with the settings that the machine interface uses"""
+
+    def inc(x):
+        y = x + 1
+        return y
+
+    requests = b'"backtrace -s"\n"list"\n"info frame"\n"continue"\n'
+    out = KeptOpen()
+    intf = MachineInterface(io.BytesIO(requests), out)
+    d = Trepan({"interface": intf})
+    d.settings["style"] = "tango"
+    plain_text_settings(d.settings)
+    d.run_call(inc, 3)
+    intf.finalize()
+
+    replies = [m for m in read_messages(out) if m["event"] == "result"]
+    assert 4 == len(replies)
+    for reply in replies:
+        assert not [line for line in reply["output"] if "\x1b" in line]
+    assert replies[0]["output"]
+    return
@@ -0,0 +1,66 @@
+"""Unit test for trepan.interfaces.server"""
+
+from trepan.interfaces import comcodes as Mcomcodes
+from trepan.interfaces.server import ServerInterface
+
+
+class RecordingInOut:
+    """Stands in for a TCPServer and records the messages written."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.written = []
+        self.state = "connected"
+        return
+
+    def close(self):
+        self.state = "disconnected"
+        return
+
+    def read_msg(self):
+        return self.replies.pop(0)
+
+    def write(self, msg):
+        self.written.append(msg)
+        return
+
+    def writeline(self, msg):
+        self.write(msg + "\n")
+        return
+
+    pass
+
+
+def test_output_batching():
+    """Test that output is sent in one message before we read"""
+    inout = RecordingInOut([Mcomcodes.CONFIRM_REPLY + "next"])
+    intf = ServerInterface(inout=inout, connection_opts={"output_batch_size": 100})
+    intf.hold_output()
+    for i in range(3):
+        intf.msg(f"line {i}")
+    intf.msg_nocr("no newline")
+    assert [] == inout.written
+
+    assert "next" == intf.read_command("(trepan3k) ")
+    assert [
+        Mcomcodes.PRINT + "line 0\nline 1\nline 2\nno newline",
+        Mcomcodes.PROMPT + "(trepan3k) \n",
+    ] == inout.written
+
+    # Output that reaches the batch size is sent right away.
+    inout.written = []
+    intf.msg("x" * 100)
+    assert [Mcomcodes.PRINT + "x" * 100 + "\n"] == inout.written
+
+    inout.written = []
+    intf.msg("last")
+    intf.flush()
+    assert [Mcomcodes.PRINT + "last\n"] == inout.written
+    intf.flush()
+    assert [Mcomcodes.PRINT + "last\n"] == inout.written
+
+    # Once the program is resumed, output isn't held back.
+    intf.msg("tracing")
+    assert Mcomcodes.PRINT + "tracing\n" == inout.written[-1]
+    intf.close()
+    return
@@ -82,3 +82,88 @@ def test_checkfuncname():
     bp2 = bpmgr.add_breakpoint(__file__, None, -1, False, None, func_or_code=foo)
     foo(bp2, bpmgr)
     return
+
+
+def test_breakpoint_index():
+    """Test the per-code-object and per-file breakpoint index"""
+
+    def foo():
+        x = 1
+        return x
+
+    def bar():
+        return
+
+    bpmgr = BreakpointManager()
+    code = foo.__code__
+    assert not bpmgr.code_may_break(code)
+    line_number = code.co_firstlineno + 1
+    bp = bpmgr.add_breakpoint(__file__, line_number, 0, func_or_code=foo)
+    assert bpmgr.code_may_break(code)
+    assert not bpmgr.code_may_break(bar.__code__)
+    assert frozenset([line_number]) == bpmgr.lines_for_code(code)
+    bpmgr.delete_breakpoint(bp)
+    assert not bpmgr.code_may_break(code)
+    assert frozenset() == bpmgr.lines_for_code(code)
+
+    # A breakpoint given only by file and line number is matched against
+    # the code object when we are given its file name.
+    filename = os.path.realpath(__file__)
+    bp = bpmgr.add_breakpoint(filename, line_number)
+    assert bp.code is None
+    assert not bpmgr.code_may_break(code)
+    assert bpmgr.code_may_break(code, filename)
+    assert not bpmgr.code_may_break(bar.__code__, filename)
+    assert frozenset([line_number]) == bpmgr.lines_for_code(code, filename)
+    assert [bp.number] == bpmgr.delete_breakpoints_by_lineno(filename, line_number)
+    assert not bpmgr.code_may_break(code, filename)
+
+    # A code object equal to that of a breakpoint, like the one that
+    # runs when pyficache compiled the breakpoint's copy, matches too.
+    # Lookups are cached by identity, and the cache goes when the
+    # breakpoints change.
+    source = "def baz():\n    return 1\n"
+    baz_code, running_code = [
+        compile(source, "baz.py", "exec").co_consts[0] for _ in range(2)
+    ]
+    assert baz_code is not running_code and baz_code == running_code
+    bp = bpmgr.add_breakpoint("baz.py", 2, 0, func_or_code=baz_code)
+    assert (frozenset([2]), False) == bpmgr.code_breaks(running_code)
+    assert (frozenset([2]), False) == bpmgr.code_breaks(running_code)
+    bpmgr.delete_breakpoint(bp)
+    assert (frozenset(), False) == bpmgr.code_breaks(running_code)
+    return
+
+
+def test_breakpoint_condition():
+    """Test that breakpoint conditions are compiled once when set"""
+
+    def foo():
+        return
+
+    bpmgr = BreakpointManager()
+    line_number = foo.__code__.co_firstlineno
+    bp = bpmgr.add_breakpoint(__file__, line_number, 0, condition="x > 1", func_or_code=foo)
+    code = bp.condition_code
+    assert code is not None
+    assert eval(code, {"x": 2})
+    bp.condition = None
+    assert bp.condition is None and bp.condition_code is None
+
+    # A bad condition is reported, and the old condition is kept.
+    bp.condition = "x > 1"
+    try:
+        bp.condition = "x >"
+        assert False, "SyntaxError should have been raised"
+    except SyntaxError:
+        pass
+    assert "x > 1" == bp.condition
+    assert bp.condition_code is not None
+
+    try:
+        bpmgr.add_breakpoint(__file__, line_number, 0, condition="if", func_or_code=foo)
+        assert False, "SyntaxError should have been raised"
+    except SyntaxError:
+        pass
+    assert [bp] == bpmgr.bplist[os.path.realpath(__file__), line_number]
+    return
@@ -2,9 +2,15 @@
 """Unit test for trepan.lib.bytecode"""
 import inspect
 import platform
+import weakref
 import pytest
 
-from trepan.lib.bytecode import is_def_stmt, op_at_frame, stmt_contains_opcode
+from trepan.lib.bytecode import (
+    code_index,
+    is_def_stmt,
+    op_at_frame,
+    stmt_contains_opcode,
+)
 
 
 def test_contains_make_function():
@@ -30,3 +36,25 @@ def test_is_def_frame():
     frame = inspect.currentframe()
     assert not is_def_stmt("foo(): pass", frame)
     return
+
+
+def test_code_index():
+    source = "x = 1\nfor i in range(3):\n    x += i\n\ndef f():\n    pass\n"
+    co = compile(source, "<test>", "exec")
+    index = code_index(co)
+    assert index is code_index(co)
+    assert {1, 2, 3, 5} == index.lines - {0}
+    for line, offsets in index.line_offsets.items():
+        for offset in offsets:
+            assert line == index.linestarts[offset] == index.line_at(offset)
+            assert line == index.line_at(offset + 2) or offset + 2 in index.linestarts
+    assert stmt_contains_opcode(co, 5, "MAKE_FUNCTION")
+    assert not stmt_contains_opcode(co, 1, "MAKE_FUNCTION")
+    assert "FOR_ITER" in index.opnames(2)
+    assert frozenset() == index.opnames(4)
+
+    # The index goes away with the code object.
+    index_ref = weakref.ref(index)
+    del co, index
+    assert index_ref() is None
+    return
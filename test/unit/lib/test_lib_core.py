@@ -32,3 +32,37 @@ def test_canonic():
             os.path.sep == dc.canonic(__file__)[0]
         ), "canonic should produce an absolute file"
     return
+
+
+def test_canonic_cache():
+    opts = {"processor": MockProcessor()}
+    dc = TrepanCore(None, opts=opts)
+    canonic = dc.canonic(__file__)
+    assert 1 == dc.canonic_misses
+    assert canonic == dc.canonic(__file__)
+    code = test_canonic_cache.__code__
+    assert canonic == dc.canonic_code_filename(code)
+    assert canonic == dc.canonic_code_filename(code)
+    stats = dc.canonic_cache_stats()
+    assert {"files": 1, "code objects": 1, "hits": 3, "misses": 1} == stats
+    dc.clear_canonic_cache()
+    assert canonic == dc.canonic(__file__)
+    assert 2 == dc.canonic_misses
+    return
+
+
+def test_clear_canonic_cache_breakpoints():
+    """Breakpoints by file name found for a code object under its old
+    canonic name are forgotten when file name remapping changes."""
+    opts = {"processor": MockProcessor()}
+    dc = TrepanCore(None, opts=opts)
+    code = test_clear_canonic_cache_breakpoints.__code__
+    line_number = code.co_firstlineno + 3
+    remapped = "/remapped/test_lib_core.py"
+    dc.bpmgr.add_breakpoint(remapped, line_number)
+    assert frozenset() == dc.bpmgr.lines_for_code(code, dc.canonic_code_filename(code))
+
+    # After a remapping, the code's canonic name is `remapped`.
+    dc.clear_canonic_cache()
+    assert frozenset([line_number]) == dc.bpmgr.lines_for_code(code, remapped)
+    return
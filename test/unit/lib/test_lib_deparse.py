@@ -0,0 +1,95 @@
+"""Unit test for the deparse cache in trepan.lib.deparse"""
+import os
+import os.path as osp
+import subprocess
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+from trepan.lib.deparse import (
+    code_key,
+    code_objects,
+    deparse_cache_dir,
+    is_pending,
+    pending,
+    read_deparse_cache,
+    write_deparse_cache,
+)
+
+SOURCE = "def f(x):\n    return x + 1\n\nclass C:\n    def g(self):\n        pass\n"
+
+
+def test_code_key():
+    co = compile(SOURCE, "<test>", "exec")
+    assert code_key(co) == code_key(compile(SOURCE, "<test>", "exec"))
+    # The line map of cached source depends on where the code is.
+    assert code_key(co) != code_key(compile(SOURCE, "<other>", "exec"))
+    moved = compile("\n" + SOURCE, "<test>", "exec")
+    assert code_key(co.co_consts[0]) != code_key(moved.co_consts[0])
+    changed = compile(SOURCE.replace("x + 1", "x + 2"), "<test>", "exec")
+    assert code_key(co) != code_key(changed)
+    assert ["<module>", "f", "C", "g"] == [c.co_name for c in code_objects(co)]
+    return
+
+
+def test_code_key_across_processes():
+    """Keys don't depend on the string hash seed, which sets the repr()
+    order of frozenset constants."""
+    script = (
+        "from trepan.lib.deparse import code_key;"
+        "print(code_key(compile(\"x in {'aa', 'bb', 'cc', 'dd'}\", '<t>', 'exec')))"
+    )
+    keys = set()
+    for seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        keys.add(
+            subprocess.check_output([sys.executable, "-c", script], env=env).strip()
+        )
+    assert 1 == len(keys)
+    return
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Needs Unix permissions")
+def test_shared_cache_dir(tmp_path):
+    """A cache directory that others can write to is not used."""
+    tempdir = str(tmp_path)
+    key = code_key(compile(SOURCE, "<test>", "exec"))
+    write_deparse_cache(key, SOURCE, [(1, 1)], tempdir)
+    user_dir = osp.dirname(deparse_cache_dir(tempdir))
+    os.chmod(user_dir, 0o777)
+    try:
+        assert read_deparse_cache(key, tempdir) is None
+        with pytest.raises(PermissionError):
+            write_deparse_cache(key, SOURCE, [(1, 1)], tempdir)
+    finally:
+        os.chmod(user_dir, 0o700)
+    assert read_deparse_cache(key, tempdir) is not None
+    return
+
+
+def test_deparse_cache(tmp_path):
+    tempdir = str(tmp_path)
+    key = code_key(compile(SOURCE, "<test>", "exec"))
+    assert read_deparse_cache(key, tempdir) is None
+    linemap = [(1, 1), (2, 2)]
+    path = write_deparse_cache(key, SOURCE, linemap, tempdir)
+    assert (path, linemap) == read_deparse_cache(key, tempdir)
+    with open(path) as fp:
+        assert fp.read().startswith(SOURCE)
+    return
+
+
+def test_is_pending():
+    co = compile(SOURCE, "<test>", "exec")
+    assert not is_pending(co)
+    future = Future()
+    pending[code_key(co)] = future
+    try:
+        assert is_pending(co)
+        future.set_result(code_key(co))
+        assert not is_pending(co)
+        assert code_key(co) not in pending
+    finally:
+        pending.pop(code_key(co), None)
+    return
@@ -0,0 +1,58 @@
+"""Unit test for trepan.lib.disassemble"""
+from trepan.lib.disassemble import DisassemblyCache, DisasmCache, disassemble
+
+
+def fib(x):
+    if x <= 1:
+        return 1
+    return fib(x - 1) + fib(x - 2)
+
+
+def disassembly(code, **opts) -> str:
+    out = []
+    opts.setdefault("end_line", -1)
+    disassemble(lambda s: out.append(s + "\n"), out.append, code, **opts)
+    return "".join(out)
+
+
+def test_disassembly_cache():
+    cache = DisassemblyCache(maxsize=2)
+    code = fib.__code__
+    entry = cache.get(code)
+    assert entry is cache.get(code)
+    assert {"size": 1, "maxsize": 2, "hits": 1, "misses": 1} == cache.stats()
+    assert entry.instructions[0].offset == 0
+
+    # The least-recently-used code object is dropped.
+    cache.get(test_disassembly_cache.__code__)
+    cache.get(code)
+    cache.get(disassembly.__code__)
+    assert 2 == len(cache)
+    assert entry is cache.get(code)
+    cache.clear()
+    assert {"size": 0, "maxsize": 2, "hits": 0, "misses": 0} == cache.stats()
+    return
+
+
+def test_cached_disassembly():
+    """Disassembly from the cache is the same as the first time, and the
+    current-instruction marker goes where it belongs."""
+    code = fib.__code__
+    DisasmCache.clear()
+    for style in ("none", "tango"):
+        first = disassembly(code, style=style)
+        assert first == disassembly(code, style=style)
+    assert "-->" not in first
+
+    offsets = [i.offset for i in DisasmCache.get(code).instructions if i.offset]
+    for lasti in offsets[:2]:
+        text = disassembly(code, lasti=lasti)
+        assert 1 == text.count("-->")
+        assert text.replace("-->", "   ") == disassembly(code)
+    assert DisasmCache.stats()["hits"] > 0
+
+    # Only the lines asked for are shown, and formatted.
+    line = code.co_firstlineno + 2
+    part = disassembly(code, start_line=line, end_line=line)
+    assert part and part in disassembly(code)
+    return
@@ -19,4 +19,12 @@ def test_display():
     assert mgr.delete_index(1) is True, "return True on ok delete"
     assert mgr.delete_index(1) is False, "return False on no delete"
     assert len(mgr.list) == 1, "display list again with one item"
+    assert disp.code is not None, "display expression should be compiled"
+    assert "2: x = 1" in disp.to_s(frame)
+    try:
+        mgr.add(frame, "x >")
+        assert False, "SyntaxError should have been raised"
+    except SyntaxError:
+        pass
+    assert len(mgr.list) == 1, "a bad expression isn't added"
     return
@@ -19,3 +19,14 @@ def test_extract_expression():
         assert expect == Meval.extract_expression(fragment)
         pass
     return
+
+
+def test_compile_expression():
+    code = Meval.compile_expression(" x + 1 ")
+    assert 3 == eval(code, {"x": 2})
+    try:
+        Meval.compile_expression("x +")
+        assert False, "SyntaxError should have been raised"
+    except SyntaxError:
+        pass
+    return
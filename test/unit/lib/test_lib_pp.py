@@ -1,8 +1,10 @@
 """Unit test for trepan.lib.pp"""
 
+from collections import deque
 from typing import List
 
 from trepan.lib.pp import pp, pprint_simple_array
+from trepan.lib.variables import VariableStore
 
 errmsgs: List[str] = []
 
@@ -61,6 +63,25 @@ def test_lib_pp():
     x = [i for i in range(10)]
     pp(x, 20, msg_nocr, msg, "x = ")
     assert ["x = [0, 1, 2, 3, 4, 5,\n 6, 7, 8, 9]\n\n"] == msgs
+
+    # Only a preview of a big value is shown, whatever its type.
+    reset_output()
+    pp(list(range(1_000_000)), 80, msg_nocr, msg, "x =")
+    assert ["x = list of length 1000000 = [0, 1, 2, 3, 4, 5, ...]"] == msgs
+
+    class Column:
+        def __len__(self):
+            return 10_000_000
+
+    reset_output()
+    variables = VariableStore()
+    pp(Column(), 80, msg_nocr, msg, "c =", variables=variables)
+    assert msgs[0].startswith("c = Column of length 10000000 = ")
+    assert ["  use 'expand @1' to see more"] == msgs[1:]
+
+    reset_output()
+    pp(deque(range(5000)), 80, msg_nocr, msg)
+    assert ["deque of length 5000 = deque([0, 1, 2, 3, 4, 5, ...])"] == msgs
     return
 
 
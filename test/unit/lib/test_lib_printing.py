@@ -1,5 +1,9 @@
 """Unit test for trepan.lib.printing"""
 
+import array
+
+import pytest
+
 import trepan.lib.printing as printing
 
 
@@ -21,3 +25,45 @@ def test_lib_argspec():
         == "printing.print_obj(arg, frame, format=None, short=False) -> str"
     )
     return
+
+
+def test_dump_memory():
+    buf = bytearray(b"Hello, world!" * 1000)
+    assert [
+        "0x00000007: 77 6f 72 6c 64 21 48 65 6c 6c 6f 2c 20 77 6f 72  |world!Hello, wor|",
+        "0x00000017: 6c 64 21                                         |ld!|",
+    ] == printing.dump_memory(buf, 7, 19)
+    assert [
+        "0x00000000:  72 101 108 108 111  44  32 119 111 114 108 100  33  72 101 108"
+        "  |Hello, world!Hel|"
+    ] == printing.dump_memory(buf, 0, 16, "u")
+    # Each word has all bytes the same, so byte order doesn't matter.
+    words = array.array("B", b"\1\1\1\1\2\2\2\2\3\3\3\3\4\4\4\4")
+    assert [
+        "0x00000000: 01010101 02020202 03030303 04040404  |................|"
+    ] == printing.dump_memory(words, 0, 4, "x", "w")
+
+    # A partial unit at the end is left off.
+    lines = printing.dump_memory(bytes(3), 0, 2, "x", "h")
+    assert 1 == len(lines)
+    assert lines[0].startswith("0x00000000: 0000 ")
+    assert lines[0].endswith("|..|")
+
+    with pytest.raises(TypeError):
+        printing.dump_memory("not a buffer")
+    with pytest.raises(ValueError):
+        printing.dump_memory(buf, len(buf) + 1)
+    # Less than one unit left: an error, not an empty dump.
+    with pytest.raises(ValueError, match="no complete 8-byte units"):
+        printing.dump_memory(buf, len(buf) - 3, 3, "x", "g")
+    return
+
+
+def test_parse_memory_format():
+    assert (32, "x", "b") == printing.parse_memory_format("/32xb")
+    assert (64, "d", "w") == printing.parse_memory_format("/dw")
+    assert (8, "o", "g") == printing.parse_memory_format("/8go")
+    assert (64, "x", "b") == printing.parse_memory_format("/")
+    with pytest.raises(ValueError):
+        printing.parse_memory_format("/zz")
+    return
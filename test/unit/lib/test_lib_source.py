@@ -0,0 +1,91 @@
+"""Unit test for trepan.lib.source"""
+import os
+import os.path as osp
+import tempfile
+
+import pyficache
+
+import trepan.lib.source as Msource
+from trepan.lib.source import HighlightCache, MappedSource, mapped_source, source_size
+
+
+def write_file(path: str, text: str, mtime: int):
+    with open(path, "w") as fp:
+        fp.write(text)
+    os.utime(path, (mtime, mtime))
+    return
+
+
+def test_highlight_cache():
+    cache = HighlightCache(maxsize=2)
+    entry = cache.get(__file__, "plain")
+    assert entry is cache.get(__file__, "plain", "tango")
+    assert {"size": 1, "maxsize": 2, "hits": 1, "misses": 1} == cache.stats()
+    assert '"""Unit test for trepan.lib.source"""' == entry.getline(1)
+    assert entry.getline(len(entry) + 1) is None
+
+    # Each highlight mode and style has its own lines.
+    light = cache.get(__file__, "light")
+    tango = cache.get(__file__, "light", "tango")
+    assert light is not tango
+    assert 2 == len(cache)
+    line = tango.getline(1)
+    assert line != entry.getline(1) and "\x1b[" in line
+    assert "Unit test for trepan.lib.source" in line
+    cache.clear()
+    assert {"size": 0, "maxsize": 2, "hits": 0, "misses": 0} == cache.stats()
+    return
+
+
+def test_highlight_chunks_and_changes():
+    """Lines of large files are highlighted a chunk at a time, and lines
+    of a changed file are highlighted again."""
+    cache = HighlightCache(chunk_size=3, whole_file_lines=3)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = osp.join(tmpdir, "source_cache_test.py")
+        text = "\n\nx = 1\n" + "".join(f"y{i} = {i}\n" for i in range(10))
+        write_file(path, text, 1_000_000)
+        entry = cache.get(path, "dark", "monokai", reload_on_change=True)
+        assert 13 == len(entry)
+        # Leading blank lines are kept, so line numbers still match.
+        assert "" == entry.getline(1)
+        assert "x" in entry.getline(3)
+        assert 3 == len(entry._lines)
+        assert "y9" in entry.getline(13)
+        assert 4 == len(entry._lines)
+
+        write_file(path, "z = 2\n" + text, 2_000_000)
+        changed = cache.get(path, "dark", "monokai", reload_on_change=True)
+        assert changed is not entry
+        assert "z" in changed.getline(1)
+        pyficache.clear_file_cache(path)
+    return
+
+
+def test_mapped_source(monkeypatch):
+    """Large files are memory mapped and only the lines asked for are
+    decoded."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = osp.join(tmpdir, "mapped_source_test.py")
+        text = "# -*- coding: latin-1 -*-\r\nname = '\xe9t\xe9'\r\n\nlast = 1"
+        with open(path, "wb") as fp:
+            fp.write(text.encode("latin-1"))
+        assert mapped_source(path) is None
+
+        monkeypatch.setattr(Msource, "MMAP_MIN_SIZE", 10)
+        source = mapped_source(path)
+        assert isinstance(source, MappedSource)
+        assert source is mapped_source(path)
+        assert 4 == len(source) == source_size(path)
+        assert "name = '\xe9t\xe9'\n" == source.getline(2)
+        assert ["\n", "last = 1\n"] == source[2:]
+        assert source.getline(5) is None
+        assert "last = 1" == HighlightCache().getline(path, 4)
+
+        with open(path, "ab") as fp:
+            fp.write(b"\nmore = 2\n")
+        assert 5 == source_size(path)
+        assert mapped_source(path) is not source
+        assert mapped_source("<string>") is None
+        Msource._mapped.pop(osp.realpath(path)).close()
+    return
@@ -2,8 +2,14 @@
 import inspect
 import pytest
 import platform
+import sys
 
-from trepan.lib.stack import FrameInfo, count_frames, is_eval_or_exec_stmt
+from trepan.lib.stack import (
+    FrameDepthCache,
+    FrameInfo,
+    count_frames,
+    is_eval_or_exec_stmt,
+)
 
 
 def test_count_frames():
@@ -13,6 +19,47 @@ def test_count_frames():
     assert len(FrameInfo) > 0
     assert count_frames(f) > 2
     assert frame_count - 1 == count_frames(f.f_back)
+
+    def inner():
+        return count_frames(inspect.currentframe())
+
+    assert frame_count + 1 == inner()
+
+    # Depths past 1000 are counted, and once the caller's depth is
+    # known, only the new frame needs to be looked at.
+    def recurse(n):
+        if n == 0:
+            return count_frames(inspect.currentframe())
+        return recurse(n - 1)
+
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(recursion_limit + 1500)
+    try:
+        assert frame_count + 1201 == recurse(1200)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+    misses = FrameInfo.misses
+    assert frame_count + 2 == recurse(1)
+    assert misses + 2 == FrameInfo.misses
+    return
+
+
+def test_frame_depth_cache():
+    cache = FrameDepthCache(maxsize=2)
+    f = inspect.currentframe()
+    assert cache.get(f) is None
+    cache[f] = 5
+    assert f in cache
+    assert 5 == cache.get(f)
+    cache[f.f_back] = 4
+    cache[f.f_back.f_back] = 3
+    assert 2 == len(cache), "cache should stay bounded"
+    assert f not in cache, "least-recently used entry should be dropped"
+    cache.discard(f.f_back)
+    assert f.f_back not in cache
+    assert {"size": 1, "maxsize": 2, "hits": 1, "misses": 1} == cache.stats()
+    cache.clear()
+    assert 0 == len(cache)
     return
 
 
@@ -0,0 +1,63 @@
+"""Unit test for trepan.lib.variables"""
+
+import pytest
+
+from trepan.lib.variables import PAGE_SIZE, VariableStore, is_large
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def test_describe():
+    store = VariableStore()
+    info = store.describe(5, "five")
+    assert {
+        "name": "five",
+        "type": "int",
+        "length": None,
+        "preview": "5",
+        "handle": None,
+    } == info
+
+    big = list(range(1_000_000))
+    info = store.describe(big)
+    assert "list" == info["type"]
+    assert 1_000_000 == info["length"]
+    assert len(info["preview"]) < 100
+    assert 1 == info["handle"]
+    # The same value gets the same handle.
+    assert 1 == store.describe(big)["handle"]
+    assert is_large(big)
+    assert not is_large("x" * 1_000_000)
+    return
+
+
+def test_children():
+    store = VariableStore()
+    big = list(range(1_000_000))
+    handle = store.describe(big)["handle"]
+    page = store.children(handle, 500_000, 2)
+    assert 1_000_000 == page["length"]
+    assert ["[500000]", "[500001]"] == [c["name"] for c in page["children"]]
+    assert ["500000", "500001"] == [c["preview"] for c in page["children"]]
+    assert PAGE_SIZE == len(store.children(handle)["children"])
+    assert [] == store.children(handle, 2_000_000, 10)["children"]
+
+    handle = store.describe({"a": [1, 2], "b": 3})["handle"]
+    a, b = store.children(handle)["children"]
+    assert ("'a'", "list", 2) == (a["name"], a["type"], a["length"])
+    assert b["handle"] is None
+    assert ["[0]", "[1]"] == [
+        c["name"] for c in store.children(a["handle"])["children"]
+    ]
+
+    handle = store.describe(Point(1, 2))["handle"]
+    assert ["x", "y"] == [c["name"] for c in store.children(handle)["children"]]
+
+    store.clear()
+    with pytest.raises(KeyError):
+        store.children(handle)
+    return
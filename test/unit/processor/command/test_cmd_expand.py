@@ -0,0 +1,42 @@
+"""Unit test for trepan.processor.command.expand"""
+
+import inspect
+from test.unit.cmdhelper import setup_unit_test_debugger
+
+from trepan.processor.command.expand import ExpandCommand
+
+
+def test_expand():
+    errors = []
+    msgs = []
+
+    d, cp = setup_unit_test_debugger()
+    cmd = ExpandCommand(cp)
+    cmd.msg = msgs.append
+    cmd.errmsg = errors.append
+    cp.curframe = inspect.currentframe()
+
+    big = list(range(5000))  # NOQA
+    cp.cmd_argstr = "big"
+    cmd.run([cmd.name, "big"])
+    assert msgs[0].startswith("big: list of length 5000 @1 = [0, 1, 2")
+    assert "  [99]: int = 99" == msgs[100]
+    assert "  ... 4900 more; use 'expand @1 100' to see them." == msgs[-1]
+
+    msgs.clear()
+    cmd.run([cmd.name, "@1", "4998"])
+    assert ["  [4998]: int = 4998", "  [4999]: int = 4999"] == msgs
+
+    msgs.clear()
+    cmd.run([cmd.name, "@1", "10", "2"])
+    assert [
+        "  [10]: int = 10",
+        "  [11]: int = 11",
+        "  ... 4988 more; use 'expand @1 12' to see them.",
+    ] == msgs
+
+    # Handles are forgotten when the program is resumed.
+    cp.variables.clear()
+    cmd.run([cmd.name, "@1"])
+    assert ["No value with handle 1; it may have expired."] == errors
+    return
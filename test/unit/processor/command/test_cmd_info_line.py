@@ -0,0 +1,29 @@
+"""Unit test for the code_line_info() used by "info line" """
+import sys
+
+from trepan.lib.bytecode import code_index
+from trepan.processor.command.info_subcmd.line import code_line_info
+
+
+def fn():
+    return 1
+
+
+class Klass:
+    @staticmethod
+    def method():
+        return 2
+
+
+def test_code_line_info():
+    """Lines of the stack's code and of functions and methods in the
+    module loaded from the file are found."""
+    frame = sys._getframe()
+    line_info = code_line_info(__file__, frame)
+    current = line_info[frame.f_lineno - 1]
+    assert [test_code_line_info.__code__] == [code for code, _ in current]
+    for func in (fn, Klass.method):
+        body_line = max(code_index(func.__code__).lines)
+        assert func.__code__ in [code for code, _ in line_info[body_line]]
+    assert {} == code_line_info("/no/such/file.py", frame)
+    return
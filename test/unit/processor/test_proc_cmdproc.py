@@ -3,7 +3,7 @@
 import inspect
 from test.unit.cmdhelper import setup_unit_test_debugger
 
-from trepan.processor.cmdproc import arg_split, resolve_name
+from trepan.processor.cmdproc import arg_split, resolve_name, split_format_suffix
 
 errors = []
 msgs = []
@@ -149,3 +149,14 @@ def test_resolve_name():
     assert resolve_name(cp, "quit")
     assert resolve_name(cp, "q")
     return
+
+
+def test_split_format_suffix():
+    _, cp = setup_unit_test_debugger()
+    assert ["x", "/8xb", "buf"] == split_format_suffix(cp, ["x/8xb", "buf"])
+    assert ["examine", "/4dw", "buf"] == split_format_suffix(cp, ["examine/4dw", "buf"])
+    assert ["x", "/8xb", "buf"] == split_format_suffix(cp, ["x", "/8xb", "buf"])
+    # Only commands that take a format get it split off.
+    assert ["c/2"] == split_format_suffix(cp, ["c/2"])
+    assert ["/x"] == split_format_suffix(cp, ["/x"])
+    return
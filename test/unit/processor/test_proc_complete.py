@@ -65,6 +65,7 @@ def test_completion():
                 "args",
                 "breakpoints",
                 "builtins",
+                "cache",
                 "code",
                 "display",
                 "files",
@@ -0,0 +1,113 @@
+"""Unit test for trepan.hub"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from trepan.hub import TrepanHub
+from trepan.inout.hubconn import HubConnection
+from trepan.inout.tcpclient import TCPClient
+from trepan.interfaces import comcodes as Mcomcodes
+
+
+def start_hub(opts):
+    """Run a hub in a background thread. Return the hub and its loop."""
+    hub = TrepanHub(opts)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(hub.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait(5)
+    return hub, loop
+
+
+def stop_hub(hub, loop):
+    asyncio.run_coroutine_threadsafe(hub.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    return
+
+
+def wait_for_sessions(hub, count):
+    for _ in range(100):
+        if len(hub.sessions) >= count:
+            return
+        time.sleep(0.02)
+    assert False, "debugged program didn't register"
+
+
+def test_hub_attach_by_id():
+    """Test relaying between a debugged program and a client"""
+    hub, loop = start_hub({"PORT": 0, "negotiate_timeout": 0.1})
+    port = hub.opts["PORT"]
+    program = client = None
+    try:
+        program = HubConnection(opts={"PORT": port})
+        program.writeline(Mcomcodes.PRINT + "before a client")
+        program.writeline(Mcomcodes.PROMPT + "(trepan3k) ")
+        wait_for_sessions(hub, 1)
+        [session_id] = hub.sessions
+
+        client = TCPClient(opts={"open": True, "PORT": port, "session": session_id})
+        assert client.read_msg().startswith(Mcomcodes.PRINT + "Attached to session")
+        assert Mcomcodes.PRINT + "before a client\n" == client.read_msg()
+        assert Mcomcodes.PROMPT + "(trepan3k) \n" == client.read_msg()
+
+        client.writeline(Mcomcodes.CONFIRM_REPLY + "next")
+        assert Mcomcodes.CONFIRM_REPLY + "next\n" == program.read_msg()
+        assert str(session_id) == program.session_id
+
+        # Large messages go through whole.
+        big = Mcomcodes.PRINT + "x" * 50000 + "\n"
+        program.write(big)
+        assert big == client.read_msg()
+
+        # When the program goes away, the client is told to quit.
+        program.close()
+        program = None
+        assert Mcomcodes.QUIT == client.read_msg()[0]
+    finally:
+        for conn in (program, client):
+            if conn:
+                conn.close()
+        stop_hub(hub, loop)
+    return
+
+
+def test_hub_choose_session():
+    """Test a client picking a session from the hub's list, with the
+    program connecting over a Unix-domain socket"""
+    if not hasattr(__import__("socket"), "AF_UNIX"):
+        return
+    path = os.path.join(tempfile.mkdtemp(), "hub.sock")
+    hub, loop = start_hub({"PORT": 0, "path": path, "negotiate_timeout": 0.1})
+    program = client = None
+    try:
+        program = HubConnection(opts={"path": path})
+        program.writeline(Mcomcodes.PROMPT + "(trepan3k) ")
+        wait_for_sessions(hub, 1)
+        [session_id] = hub.sessions
+
+        client = TCPClient(opts={"open": True, "PORT": hub.opts["PORT"]})
+        listing = client.read_msg()
+        assert "pid %d" % os.getpid() in listing
+        assert Mcomcodes.PROMPT == client.read_msg()[0]
+        client.writeline(Mcomcodes.CONFIRM_REPLY + "nosuch")
+        assert "No session nosuch" in client.read_msg()
+        client.read_msg()  # listing
+        client.read_msg()  # prompt
+        client.writeline(Mcomcodes.CONFIRM_REPLY + str(session_id))
+        assert client.read_msg().startswith(Mcomcodes.PRINT + "Attached to session")
+        assert Mcomcodes.PROMPT + "(trepan3k) \n" == client.read_msg()
+    finally:
+        for conn in (program, client):
+            if conn:
+                conn.close()
+        stop_hub(hub, loop)
+    return
@@ -1,4 +1,10 @@
 """Unit test for trepan.inout.tcp*"""
+import socket
+import threading
+
+import pytest
+
+from trepan.inout import tcpfns as Mtcpfns
 from trepan.inout.tcpclient import TCPClient
 from trepan.inout.tcpserver import TCPServer
 
@@ -34,3 +40,221 @@ def test_client_server():
         if server:
             server.close()
     return
+
+
+def test_framing():
+    """Test packing and unpacking messages in both framing formats"""
+    big = "." + "x" * 20000 + "\n"
+    for framing in (Mtcpfns.FRAMING_V1, Mtcpfns.FRAMING_V2):
+        buf = Mtcpfns.MessageBuffer()
+        buf.data += Mtcpfns.pack_frame(".one\n", framing)
+        packed = Mtcpfns.pack_frame("Cé", framing)
+        # A partial message is left in the buffer until the rest arrives.
+        buf.data += packed[:-1]
+        assert ".one\n" == buf.next_msg(framing)
+        assert buf.next_msg(framing) is None
+        buf.data += packed[-1:]
+        assert "Cé" == buf.next_msg(framing)
+        assert 0 == len(buf)
+
+    # Long messages have to be split in the original format.
+    buf.data += Mtcpfns.pack_frame(big, Mtcpfns.FRAMING_V1)
+    pieces = []
+    while len(buf):
+        msg = buf.next_msg(Mtcpfns.FRAMING_V1)
+        assert msg[0] == "."
+        pieces.append(msg[1:])
+    assert len(pieces) > 1
+    assert big[1:] == "".join(pieces)
+
+    assert 2 == Mtcpfns.parse_hello(Mtcpfns.hello_msg(2))
+    assert Mtcpfns.parse_hello(".framing 2") is None
+    assert 2 == Mtcpfns.parse_hello(Mtcpfns.hello_msg(2, "zlib"))
+    assert "zlib" == Mtcpfns.hello_compression(Mtcpfns.hello_msg(2, "zlib"))
+    assert Mtcpfns.hello_compression(Mtcpfns.hello_msg(2, "lzma")) is None
+    assert Mtcpfns.hello_compression(Mtcpfns.hello_msg(2)) is None
+    return
+
+
+def test_client_server_framing():
+    """Test framing negotiation and messages larger than a packet"""
+    big = "." + "y" * 100000 + "\n"
+    for client_framing in (Mtcpfns.FRAMING_V1, Mtcpfns.FRAMING_V2):
+        client = None
+        server = None
+        try:
+            try:
+                server = TCPServer(opts={"open": True, "negotiate_timeout": 0.1})
+            except Exception:
+                print("Skipping because of server open failure")
+                return
+            try:
+                client = TCPClient(
+                    opts={"open": True, "PORT": server.PORT, "framing": client_framing}
+                )
+            except IOError:
+                print("Skipping because of client open failure")
+                return
+            server.write(big)
+            if client_framing == Mtcpfns.FRAMING_V1:
+                got = ""
+                while len(got) < len(big) - 1:
+                    got += client.read_msg()[1:]
+                assert big[1:] == got
+            else:
+                assert big == client.read_msg()
+            assert client_framing == server.framing == client.framing
+
+            client.write(big)
+            assert big[0] == server.read_msg()[0]
+        finally:
+            if client:
+                client.close()
+            if server:
+                server.close()
+    return
+
+
+def test_client_server_compression():
+    """Test that a connection is compressed only if both sides want it"""
+    big = "." + "\x1b[38;5;188mz\x1b[39m" * 10000 + "\n"
+    for server_compress in (False, True):
+        client = None
+        server = None
+        try:
+            try:
+                server = TCPServer(
+                    opts={
+                        "open": True,
+                        "negotiate_timeout": 1,
+                        "compress": server_compress,
+                    }
+                )
+            except Exception:
+                print("Skipping because of server open failure")
+                return
+            try:
+                client = TCPClient(
+                    opts={"open": True, "PORT": server.PORT, "compress": True}
+                )
+            except IOError:
+                print("Skipping because of client open failure")
+                return
+            for msg in (".one\n", big, ".two\n"):
+                server.write(msg)
+                assert msg == client.read_msg()
+                client.write(msg)
+                assert msg == server.read_msg()
+            assert server_compress == (server.compressor is not None)
+            assert server_compress == (client.compressor is not None)
+        finally:
+            if client:
+                client.close()
+            if server:
+                server.close()
+    return
+
+
+def test_replay_buffer():
+    replay = Mtcpfns.ReplayBuffer(10)
+    assert 1 == replay.add("abcd")
+    assert 2 == replay.add("efgh")
+    assert ["efgh"] == replay.since(1)
+    assert ["abcd"] == replay.since(0, 1)
+    # Older messages are dropped to keep within the size.
+    replay.add("ijkl")
+    assert ["efgh", "ijkl"] == replay.since(0)
+    assert [] == replay.since(3)
+    return
+
+
+def test_session_resume():
+    """Test that a client that loses its connection gets back what it
+    missed, and that dead clients are noticed"""
+    client = None
+    server = None
+    try:
+        try:
+            server = TCPServer(
+                opts={"open": True, "negotiate_timeout": 1, "resume_timeout": 5}
+            )
+        except Exception:
+            print("Skipping because of server open failure")
+            return
+        try:
+            client = TCPClient(
+                opts={"open": True, "PORT": server.PORT, "keepalive": 1}
+            )
+        except IOError:
+            print("Skipping because of client open failure")
+            return
+        server.write(".one\n")
+        assert ".one\n" == client.read_msg()
+        client.write("Cack")
+        assert "Cack" == server.read_msg()
+        server.write(".two\n")
+        assert ".two\n" == client.read_msg()
+        assert server.resumable and client.token == server.token
+
+        # The network goes away, and output sent meanwhile is lost.
+        client.inout.shutdown(socket.SHUT_RDWR)
+        server.write(".three\n")
+        read = []
+        reader = threading.Thread(target=lambda: read.append(server.read_msg()))
+        reader.start()
+        assert ".three\n" == client.read_msg()
+        client.write("Cfour")
+        reader.join(5)
+        assert ["Cfour"] == read
+
+        # A client that leaves on purpose isn't waited for.
+        client.close()
+        with pytest.raises(EOFError):
+            server.read_msg()
+
+        # A client that says nothing for client_timeout seconds is
+        # dropped, and if it doesn't come back, we give up.
+        server.client_timeout = server.resume_timeout = 0.2
+        client = TCPClient(
+            opts={"open": True, "PORT": server.PORT, "keepalive": 60}
+        )
+        server.write(".five\n")
+        assert ".five\n" == client.read_msg()
+        with pytest.raises(EOFError):
+            server.read_msg()
+    finally:
+        if client:
+            client.close()
+        if server:
+            server.close()
+    return
+
+
+def test_no_resume():
+    """Test that a client that doesn't send keepalives gets the old
+    behavior: the server sees EOF when it goes away"""
+    client = None
+    server = None
+    try:
+        try:
+            server = TCPServer(opts={"open": True, "negotiate_timeout": 1})
+        except Exception:
+            print("Skipping because of server open failure")
+            return
+        try:
+            client = TCPClient(opts={"open": True, "PORT": server.PORT, "keepalive": 0})
+        except IOError:
+            print("Skipping because of client open failure")
+            return
+        server.write(".one\n")
+        assert ".one\n" == client.read_msg()
+        assert not server.resumable
+        client.inout.shutdown(socket.SHUT_RDWR)
+        with pytest.raises(EOFError):
+            server.read_msg()
+    finally:
+        if client:
+            client.close()
+        if server:
+            server.close()
+    return
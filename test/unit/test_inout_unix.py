@@ -0,0 +1,76 @@
+"""Unit test for trepan.inout.unix*"""
+import os
+import os.path as osp
+import socket
+
+import pytest
+
+from trepan.inout import tcpfns as Mtcpfns, unixserver as Munixserver
+from trepan.inout.unixclient import UnixClient
+from trepan.inout.unixserver import UnixServer, peer_credentials, socket_path
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix-domain sockets"
+)
+
+
+def test_client_server(tmp_path):
+    path = str(tmp_path / "debugger.sock")
+    server = UnixServer(opts={"open": True, "path": path})
+    client = None
+    try:
+        assert 0o600 == os.stat(path).st_mode & 0o777
+        client = UnixClient(opts={"open": True, "path": path})
+        for line in ["one", "two", "three"]:
+            server.writeline(line)
+            assert line == client.read_msg().rstrip("\n")
+            pass
+
+        for line in ["four", "five", "six"]:
+            client.writeline(line)
+            assert line == server.read_msg().rstrip("\n")
+            pass
+        assert Mtcpfns.FRAMING_LATEST == server.framing == client.framing
+        if peer_credentials(server.conn) is not None:
+            assert os.getpid() == server.peer_pid
+    finally:
+        if client:
+            client.close()
+        server.close()
+    assert not osp.exists(path)
+    return
+
+
+def test_socket_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert osp.join(str(tmp_path), "trepan3k", "1234.sock") == socket_path(1234)
+
+    # With no path, the server's socket is found by process id.
+    server = UnixServer(opts={"open": True})
+    try:
+        assert socket_path() == server.path
+        assert 0o700 == os.stat(osp.dirname(server.path)).st_mode & 0o777
+    finally:
+        server.close()
+    return
+
+
+def test_reject_peer(tmp_path, monkeypatch):
+    path = str(tmp_path / "debugger.sock")
+    server = UnixServer(opts={"open": True, "path": path})
+    try:
+        # Pretend that connections come from some other user.
+        other_uid = os.getuid() + 1000
+        monkeypatch.setattr(
+            Munixserver, "peer_credentials", lambda conn: (1, other_uid, other_uid)
+        )
+        rejected = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        rejected.connect(path)
+        server.inout.settimeout(1)
+        with pytest.raises(socket.timeout):
+            server.wait_for_connect()
+        assert b"" == rejected.recv(10)
+        rejected.close()
+    finally:
+        server.close()
+    return
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Unit test for trepan.listener"""
+
+import threading
+
+from trepan.api import listen
+from trepan.inout.tcpclient import TCPClient
+from trepan.interfaces import comcodes as Mcomcodes
+
+
+def spin(state: dict) -> int:
+    """Loop until state["done"] is set, without calling any Python
+    functions."""
+    count = 0
+    state["spinning"].set()
+    while not state["done"]:
+        count += 1
+    return count
+
+
+def test_listen():
+    # The client runs in this process, so it must not be stopped too.
+    listener = listen({"HOST": "127.0.0.1", "PORT": 0}, stop_all=False)
+    core = listener.debugger.core
+    state = {"done": False, "spinning": threading.Event()}
+    output = []
+
+    def client():
+        state["spinning"].wait()
+        # Nothing is traced until a client connects.
+        output.append(core.is_started())
+        inout = TCPClient(opts={"open": True, "HOST": "127.0.0.1", "PORT": listener.port})
+        try:
+            while True:
+                msg = inout.read_msg()
+                if msg[:1] == Mcomcodes.PROMPT:
+                    break
+                output.append(msg[1:])
+            state["done"] = True
+            inout.writeline(Mcomcodes.CONFIRM_REPLY + "continue")
+        finally:
+            inout.close()
+
+    client_thread = threading.Thread(target=client)
+    client_thread.start()
+    try:
+        assert spin(state) > 0
+        client_thread.join(5)
+        assert not client_thread.is_alive()
+    finally:
+        core.stop()
+        listener.close()
+    assert not output[0]
+    assert any("spin" in line for line in output[1:]), output
+    return
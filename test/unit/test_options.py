@@ -17,6 +17,7 @@ def test_options():
     # Setup.
     option_key_set = {
         "annotate",
+        "backend",
         "basename",
         "cd",
         "client",
@@ -89,3 +90,16 @@ def test_options():
     opts, dbg_opts, sys_argv = process_options("5", arg_str.split())
     assert sys_argv == ['--host', '0.0.0.0']
     assert opts.module == "dis", "should have found module name"
+
+    print("6: trepan3k --unix without --server")
+    with pytest.raises(SystemExit):
+        process_options("6", ["trepan3k", "--unix"])
+    opts, dbg_opts, sys_argv = process_options("6", ["trepan3k", "--server", "--unix"])
+    assert opts.unix and opts.server
+
+    print("7: trepan3k --backend=monitoring")
+    opts, dbg_opts, sys_argv = process_options("7", ["trepan3k", "--backend=monitoring"])
+    if sys.version_info >= (3, 12):
+        assert opts.backend == "monitoring"
+    else:
+        assert opts.backend == "settrace"
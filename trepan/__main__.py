@@ -31,12 +31,25 @@ from trepan.client import run
 from trepan.clifns import whence_file
 from trepan.debugger import Trepan
 from trepan.exception import DebuggerQuit, DebuggerRestart
+from trepan.inout.machine import check_encoding
+from trepan.interfaces.machine import (
+    MachineInterface,
+    plain_text_settings,
+    stdio_streams,
+)
 from trepan.interfaces.server import ServerInterface
 from trepan.lib.file import is_compiled_py, readable
 from trepan.misc import wrapped_lines
 from trepan.options import postprocess_options, process_options
 from trepan.version import __version__
 
+try:
+    from trepan.lib.deparse import deparse_in_background
+
+    have_deparser = True
+except ImportError:
+    have_deparser = False
+
 package = "trepan"
 
 # The name of the debugger we are currently going by.
@@ -53,20 +66,43 @@ def main(dbg=None, sys_argv=list(sys.argv)):
     opts, dbg_opts, sys_argv = process_options(__version__, sys_argv)
 
     if opts.server is not None:
-        if opts.server == "tcp":
-            connection_opts = {"IO": "TCP", "PORT": opts.port}
+        if opts.unix:
+            connection_opts = {"IO": "UNIX", "compress": opts.compress}
+        elif opts.server == "tcp" or opts.compress:
+            # FIFOs can't be compressed, so --compress means TCP.
+            connection_opts = {
+                "IO": "TCP",
+                "PORT": opts.port,
+                "compress": opts.compress,
+            }
         else:
             connection_opts = {"IO": "FIFO"}
+        if opts.client_timeout is not None:
+            connection_opts["client_timeout"] = opts.client_timeout
         intf = ServerInterface(connection_opts=connection_opts)
         dbg_opts["interface"] = intf
         if "FIFO" == intf.server_type:
             print(f"Starting FIFO server for process {os.getpid()}.")
         elif "TCP" == intf.server_type:
             print(f"Starting TCP server listening on port {intf.inout.PORT}.")
+        elif "UNIX" == intf.server_type:
+            print(
+                f"Starting Unix-domain socket server on {intf.inout.path}; "
+                f"use trepan3kc --pid {os.getpid()} to connect."
+            )
             pass
     elif opts.client:
         run(opts, sys_argv)
         return
+    elif opts.machine is not None:
+        try:
+            check_encoding(opts.machine)
+        except (ImportError, ValueError) as e:
+            print(f"{__title__}: {e}.", file=sys.stderr)
+            sys.exit(1)
+        dbg_opts["interface"] = MachineInterface(
+            *stdio_streams(), opts={"encoding": opts.machine}
+        )
 
     dbg_opts["orig_sys_argv"] = orig_sys_argv
 
@@ -75,6 +111,9 @@ def main(dbg=None, sys_argv=list(sys.argv)):
         dbg.core.add_ignore(main)
 
     postprocess_options(dbg, opts)
+    if opts.machine is not None:
+        # Front ends want text without terminal escape sequences.
+        plain_text_settings(dbg.settings)
 
     # process_options has munged sys.argv to remove any options that
     # options that belong to this debugger. The original options to
@@ -104,6 +143,7 @@ def main(dbg=None, sys_argv=list(sys.argv)):
                 sys.exit(1)
 
         if is_compiled_py(mainpyfile):
+            co = None
             try:
                 (
                     python_version,
@@ -156,6 +196,10 @@ def main(dbg=None, sys_argv=list(sys.argv)):
                 print(str(e))
                 sys.exit(3)
             except IOError:
+                if have_deparser and co is not None:
+                    # There is no source, so functions will have to be
+                    # deparsed to be shown. Get started on that.
+                    deparse_in_background(co, dbg.settings["tempdir"])
                 decompiler = "uncompyle6"
                 no_decompiler = False
                 try:
@@ -297,7 +341,9 @@ def main(dbg=None, sys_argv=list(sys.argv)):
 
         try:
             if (dbg.program_sys_argv or opts.module) and mainpyfile:
-                normal_termination = dbg.run_script(mainpyfile)
+                normal_termination = dbg.run_script(
+                    mainpyfile, start_opts={"backend": opts.backend}
+                )
                 if not normal_termination:
                     break
             else:
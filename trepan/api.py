@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2008-2009, 2013-2017, 2019-2021, 2023-2025 Rocky
+#   Copyright (C) 2008-2009, 2013-2017, 2019-2021, 2023-2026 Rocky
 #   Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -40,6 +40,7 @@ import traceback
 
 from trepan.debugger import Trepan, debugger_obj
 from trepan.interfaces.server import ServerInterface
+from trepan.listener import DEFAULT_SIGNAL, RemoteListener
 from trepan.lib.default import DEBUGGER_SETTINGS
 from trepan.post_mortem import post_mortem_excepthook, uncaught_exception
 
@@ -208,6 +209,41 @@ def debug_for_remote_access():
           file=sys.stderr)
     debug(dbg_opts=dbg_opts, step_ignore=0, level=1)
 
+
+def listen(
+    connection_opts=None, thread=None, stop_all=True, start_opts=None, signum=DEFAULT_SIGNAL
+):
+    """Listen for a remote debugger client in a background thread and
+    return right away; the program keeps running untraced.
+
+    When a client connects, the debugger is started and `thread`, a
+    threading.Thread or thread id, stops at its next event. By default
+    this is the main thread. If `stop_all` is True, other traced threads
+    stop as well.
+
+    Before Python 3.12, only the main thread can be stopped, and listen()
+    has to be called from it. The main thread is interrupted with SIGUSR1
+    when a client connects, or with `signum` if that is given.
+
+    The RemoteListener is returned. Its port is the TCP port used;
+    call its close() method to stop listening.
+    """
+    opts = {
+        "IO": "TCP",
+        "PORT": int(os.getenv("TREPAN3K_TCP_PORT", DEFAULT_DEBUG_PORT)),
+    }
+    opts.update(connection_opts or {})
+    listener = RemoteListener(
+        opts, thread=thread, stop_all=stop_all, start_opts=start_opts, signum=signum
+    )
+    print(
+        "%s server listening on %s; the program continues until a client connects."
+        % (opts["IO"], listener.port),
+        file=sys.stderr,
+    )
+    return listener
+
+
 def debugger_on_post_mortem():
     """Call debugger on an exception that terminates a program"""
     sys.excepthook = post_mortem_excepthook
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2009, 2013-2017, 2021, 2023-2025 Rocky Bernstein
+#   Copyright (C) 2009, 2013-2017, 2021, 2023-2026 Rocky Bernstein
 #
 #    This program is free software; you can redistribute it and/or modify
 #    it under the terms of the GNU General Public License as published by
@@ -18,6 +18,7 @@
 #    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
 #    02110-1301 USA.
 
+import os.path as osp
 import sys
 import time
 from optparse import OptionParser
@@ -25,6 +26,8 @@ from typing import Final
 
 # Our local modules
 from trepan.api import DEFAULT_DEBUG_PORT
+from trepan.inout.unixserver import socket_path
+from trepan.lib.default import CLIENT_SOCKET_OPTS
 from trepan.interfaces import client as Mclient, comcodes as Mcomcodes
 from trepan.version import __version__
 
@@ -74,7 +77,51 @@ def process_options(pkg_version, sys_argv, option_list=None):
         action="store",
         type="int",
         metavar="NUMBER",
-        help="Use PID to get FIFO names for " "out-of-process connections.",
+        help="Connect to the debugged process with id PID, using its "
+        "Unix-domain socket or else its FIFOs.",
+    )
+
+    optparser.add_option(
+        "--compress",
+        dest="compress",
+        action="store_true",
+        default=False,
+        help="Ask for a zlib-compressed connection. The server has to "
+        "have been started with --compress too.",
+    )
+
+    optparser.add_option(
+        "--keepalive",
+        dest="keepalive",
+        default=CLIENT_SOCKET_OPTS["keepalive"],
+        action="store",
+        type="int",
+        metavar="SECONDS",
+        help="Send a keepalive message every SECONDS seconds, so that the "
+        "server can tell if the connection is lost. If it is, reconnect "
+        "and resume the session. 0 turns this off.",
+    )
+
+    optparser.add_option(
+        "--reconnect",
+        dest="reconnect",
+        default=CLIENT_SOCKET_OPTS["reconnect"],
+        action="store",
+        type="int",
+        metavar="SECONDS",
+        help="Keep trying to reconnect for SECONDS seconds when the "
+        "connection is lost.",
+    )
+
+    optparser.add_option(
+        "--session",
+        dest="session",
+        default=None,
+        action="store",
+        type="string",
+        metavar="ID",
+        help="When connecting to a trepan hub, attach to session ID. "
+        "Without this, the hub lists its sessions and asks.",
     )
 
     optparser.disable_interspersed_args()
@@ -126,11 +173,11 @@ def start_client(connection_opts):
         elif Mcomcodes.RESTART == control:
             # FIXME need to save stuff like port # and
             # and for FIFO we need new pid.
-            if "TCP" == connection_opts["IO"]:
+            if connection_opts["IO"] in ("TCP", "UNIX"):
                 print("Restarting...")
                 intf.inout.close()
                 time.sleep(1)
-                intf.inout.open()
+                intf.inout.open(connection_opts)
             else:
                 print("Don't know how to hard-restart FIFO...")
                 done = True
@@ -147,9 +194,28 @@ def start_client(connection_opts):
 
 def run(opts, sys_argv):
     if hasattr(opts, "pid") and opts.pid > 0:
-        remote_opts = {"open": opts.pid, "IO": "FIFO"}
+        if osp.exists(socket_path(opts.pid)):
+            remote_opts = {
+                "open": True,
+                "IO": "UNIX",
+                "pid": opts.pid,
+                "compress": opts.compress,
+                "keepalive": opts.keepalive,
+                "reconnect": opts.reconnect,
+            }
+        else:
+            remote_opts = {"open": opts.pid, "IO": "FIFO"}
     else:
-        remote_opts = {"open": True, "IO": "TCP", "PORT": opts.port, "HOST": opts.host}
+        remote_opts = {
+            "open": True,
+            "IO": "TCP",
+            "PORT": opts.port,
+            "HOST": opts.host,
+            "session": opts.session,
+            "compress": opts.compress,
+            "keepalive": opts.keepalive,
+            "reconnect": opts.reconnect,
+        }
     start_client(remote_opts)
     return
 
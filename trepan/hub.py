@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A trepan hub: one endpoint for remote debugging many processes.
+
+Debugged programs connect out to the hub, over TCP or a Unix-domain
+socket, and register with their pid, host and program name; see
+trepan.inout.hubconn. Clients like trepan3kc connect to the hub and
+attach to one of the registered sessions, either by giving a session id
+with --session, or by picking one from a list that the hub shows.
+
+Once attached, the hub passes messages back and forth between the
+client and the debugged program. Output from a debugged program that
+arrives while no client is attached is held until one attaches. A client
+can detach by disconnecting; the session stays registered until the
+debugged program goes away.
+"""
+
+import asyncio
+import json
+import sys
+from collections import deque
+from optparse import OptionParser
+from typing import Dict, Optional
+
+from trepan.inout import tcpfns as Mtcpfns
+from trepan.interfaces import comcodes as Mcomcodes
+from trepan.version import __version__
+
+DEFAULT_HUB_OPTS = {
+    "HOST": "127.0.0.1",
+    "PORT": 1955,
+    "path": None,  # Unix-domain socket path to listen on as well
+    # Seconds to wait, after a connect, for the messages that say
+    # whether this is a debugged program or a client.
+    "negotiate_timeout": 0.5,
+    # Most messages from a debugged program kept while no client is
+    # attached
+    "backlog": 1000,
+}
+
+# Communication codes of messages that wait for a reply
+REPLY_CODES = frozenset(
+    [Mcomcodes.PROMPT, Mcomcodes.CONFIRM_TRUE, Mcomcodes.CONFIRM_FALSE]
+)
+
+
+class HubPeer:
+    """One end of a connection to the hub, sending and receiving
+    messages."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.buf = Mtcpfns.MessageBuffer()
+        self.framing = Mtcpfns.FRAMING_V1
+        return
+
+    async def read_msg(self) -> str:
+        """Return the next message. EOFError is raised when the other
+        end closes the connection."""
+        while True:
+            msg = self.buf.next_msg(self.framing)
+            if msg is not None:
+                return msg
+            data = await self.reader.read(Mtcpfns.TCP_MAX_PACKET)
+            if not data:
+                raise EOFError
+            self.buf.data += data
+
+    async def send(self, msg: str, framing: Optional[int] = None):
+        if framing is None:
+            framing = self.framing
+        self.writer.write(Mtcpfns.pack_frame(msg, framing))
+        await self.writer.drain()
+        return
+
+    def close(self):
+        self.writer.close()
+        return
+
+    pass
+
+
+class Session:
+    """A debugged program registered with the hub."""
+
+    def __init__(self, session_id: int, info: dict, peer: HubPeer, backlog: int):
+        self.id = session_id
+        self.info = info
+        self.peer = peer
+        self.client: Optional[HubPeer] = None
+
+        # Messages received while no client is attached
+        self.backlog = deque(maxlen=backlog)
+
+        # The last prompt or confirmation request that hasn't been
+        # answered. A client that attaches gets it again.
+        self.waiting: Optional[str] = None
+        return
+
+    def __str__(self):
+        info = self.info
+        status = "attached" if self.client else "waiting"
+        return (
+            f"{self.id:4d}  pid {info.get('pid', '?')} on {info.get('host', '?')} "
+            f"({status}): {info.get('program', '')}"
+        )
+
+    pass
+
+
+class TrepanHub:
+    """Accepts connections from debugged programs and from clients, and
+    connects each client to the session it picks."""
+
+    def __init__(self, opts: Optional[dict] = None):
+        self.opts = DEFAULT_HUB_OPTS.copy()
+        self.opts.update(opts or {})
+        self.sessions: Dict[int, Session] = {}
+        self.last_id = 0
+        self.servers = []
+        # Tasks handling connections
+        self.tasks = set()
+        return
+
+    async def start(self):
+        """Start listening. The TCP port actually used is in
+        self.opts["PORT"] afterwards."""
+        opts = self.opts
+        server = await asyncio.start_server(
+            self.handle_connection, opts["HOST"], opts["PORT"]
+        )
+        opts["PORT"] = server.sockets[0].getsockname()[1]
+        self.servers.append(server)
+        if opts["path"]:
+            self.servers.append(
+                await asyncio.start_unix_server(self.handle_connection, opts["path"])
+            )
+        return
+
+    async def serve_forever(self):
+        if not self.servers:
+            await self.start()
+        await asyncio.gather(*(server.serve_forever() for server in self.servers))
+        return
+
+    async def close(self):
+        """Stop listening and drop all connections."""
+        for server in self.servers:
+            server.close()
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return
+
+    async def handle_connection(self, reader, writer):
+        peer = HubPeer(reader, writer)
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            info, attach_id = await self.negotiate(peer)
+            if info is not None:
+                await self.serve_program(peer, info)
+            else:
+                await self.serve_client(peer, attach_id)
+        except (EOFError, ConnectionError):
+            pass
+        finally:
+            self.tasks.discard(task)
+            peer.close()
+        return
+
+    async def negotiate(self, peer: HubPeer):
+        """Read the messages that a peer sends on connecting: a
+        registration or the session to attach to, then an offer of a
+        framing version. Older clients send nothing.
+
+        Return the registration information, or None for a client,
+        and the session id the client asked for."""
+        info = None
+        attach_id = None
+        try:
+            while True:
+                msg = await asyncio.wait_for(
+                    peer.read_msg(), self.opts["negotiate_timeout"]
+                )
+                if msg.startswith(Mtcpfns.HUB_REGISTER):
+                    info = json.loads(msg[len(Mtcpfns.HUB_REGISTER) :])
+                elif msg.startswith(Mtcpfns.HUB_ATTACH):
+                    attach_id = msg[len(Mtcpfns.HUB_ATTACH) :]
+                else:
+                    offer = Mtcpfns.parse_hello(msg)
+                    if offer is not None:
+                        framing = min(offer, Mtcpfns.FRAMING_LATEST)
+                        await peer.send(Mtcpfns.hello_msg(framing))
+                        peer.framing = framing
+                    break
+        except asyncio.TimeoutError:
+            pass
+        return info, attach_id
+
+    async def serve_program(self, peer: HubPeer, info: dict):
+        self.last_id += 1
+        session = Session(self.last_id, info, peer, self.opts["backlog"])
+        self.sessions[session.id] = session
+        try:
+            await peer.send(Mtcpfns.HUB_SESSION + str(session.id))
+            while True:
+                msg = await peer.read_msg()
+                if msg[:1] in REPLY_CODES:
+                    session.waiting = msg
+                client = session.client
+                if client is None:
+                    session.backlog.append(msg)
+                else:
+                    try:
+                        await client.send(msg)
+                    except ConnectionError:
+                        session.backlog.append(msg)
+        finally:
+            del self.sessions[session.id]
+            if session.client:
+                try:
+                    await session.client.send(Mcomcodes.QUIT)
+                except ConnectionError:
+                    pass
+                session.client.close()
+        return
+
+    async def choose_session(self, peer: HubPeer, attach_id: Optional[str]):
+        """Find the session that a client wants. If it didn't say, or
+        the session isn't available, list the sessions and ask."""
+        while True:
+            session = None
+            if attach_id is not None:
+                try:
+                    session = self.sessions.get(int(attach_id))
+                except ValueError:
+                    pass
+                if session is None:
+                    await peer.send(f"{Mcomcodes.PRINT}No session {attach_id}.\n")
+                elif session.client is not None:
+                    await peer.send(
+                        f"{Mcomcodes.PRINT}Session {attach_id} already has a client.\n"
+                    )
+                    session = None
+                else:
+                    return session
+            if self.sessions:
+                listing = "\n".join(str(s) for s in self.sessions.values())
+            else:
+                listing = "No debugged programs have registered."
+            await peer.send(f"{Mcomcodes.PRINT}{listing}\n")
+            await peer.send(f"{Mcomcodes.PROMPT}Session id (q to quit): \n")
+            reply = await peer.read_msg()
+            attach_id = reply[1:].strip()
+            if attach_id in ("q", "quit"):
+                await peer.send(Mcomcodes.QUIT)
+                return None
+            if attach_id == "":
+                attach_id = None
+        return
+
+    async def serve_client(self, peer: HubPeer, attach_id: Optional[str]):
+        session = await self.choose_session(peer, attach_id)
+        if session is None:
+            return
+        session.client = peer
+        try:
+            pending = list(session.backlog)
+            session.backlog.clear()
+            if session.waiting is not None and (
+                not pending or pending[-1] is not session.waiting
+            ):
+                pending.append(session.waiting)
+            await peer.send(f"{Mcomcodes.PRINT}Attached to session {session}\n")
+            for msg in pending:
+                await peer.send(msg)
+            while True:
+                msg = await peer.read_msg()
+                session.waiting = None
+                await session.peer.send(msg)
+        finally:
+            if session.client is peer:
+                session.client = None
+        return
+
+    pass
+
+
+def process_options(pkg_version: str, sys_argv: list):
+    usage_str = """%prog [options]
+
+    Accept connections from programs to debug and from trepan3k clients,
+    and connect each client to the program it picks."""
+
+    optparser = OptionParser(usage=usage_str, version="%%prog version %s" % pkg_version)
+    optparser.add_option(
+        "-H",
+        "--host",
+        dest="host",
+        default=DEFAULT_HUB_OPTS["HOST"],
+        action="store",
+        type="string",
+        metavar="IP-OR-HOST",
+        help="listen on IP or host name.",
+    )
+    optparser.add_option(
+        "-P",
+        "--port",
+        dest="port",
+        default=DEFAULT_HUB_OPTS["PORT"],
+        action="store",
+        type="int",
+        metavar="NUMBER",
+        help="listen on TCP port NUMBER.",
+    )
+    optparser.add_option(
+        "--unix",
+        dest="path",
+        default=None,
+        action="store",
+        type="string",
+        metavar="PATH",
+        help="also listen on Unix-domain socket PATH.",
+    )
+    return optparser.parse_args(sys_argv[1:])
+
+
+def main(sys_argv=sys.argv):
+    opts, _ = process_options(__version__, sys_argv)
+    hub = TrepanHub({"HOST": opts.host, "PORT": opts.port, "path": opts.path})
+
+    async def run():
+        await hub.start()
+        where = f"{hub.opts['HOST']}:{hub.opts['PORT']}"
+        if opts.path:
+            where += f" and {opts.path}"
+        print(f"trepan3k hub listening on {where}.", file=sys.stderr)
+        await hub.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return
+
+
+if __name__ == "__main__":
+    main()
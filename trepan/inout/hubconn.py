@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Debugged-program side of a connection to a trepan hub.
+
+Rather than listening for a client, the debugged program connects out
+to a hub (see trepan.hub) and registers itself there. Clients attach to
+it through the hub. After that, messages are the same as for TCPServer.
+"""
+
+import json
+import os
+import socket
+import sys
+
+from trepan.inout import tcpfns as Mtcpfns
+from trepan.inout.tcpclient import TCPClient
+from trepan.misc import option_set
+
+HUB_CONNECTION_OPTS = {
+    "open": True,
+    "HOST": "127.0.0.1",
+    "PORT": 1955,
+    "path": None,  # Unix-domain socket path of the hub, instead of HOST/PORT
+    "framing": Mtcpfns.FRAMING_LATEST,
+    "session": None,
+}
+
+
+class HubConnection(TCPClient):
+    """Debugger server input/output by way of a trepan hub."""
+
+    def __init__(self, inout=None, opts=None):
+        self.info = registration_info()
+        hub_opts = HUB_CONNECTION_OPTS.copy()
+        hub_opts.update(opts or {})
+        TCPClient.__init__(self, inout, hub_opts)
+        return
+
+    def open(self, opts=None):
+        # Where the hub is, for reporting.
+        self.HOST = option_set(opts, "HOST", HUB_CONNECTION_OPTS)
+        self.PORT = option_set(opts, "PORT", HUB_CONNECTION_OPTS)
+        path = option_set(opts, "path", HUB_CONNECTION_OPTS)
+        if path is None:
+            return TCPClient.open(self, opts)
+
+        self.max_framing = option_set(opts, "framing", HUB_CONNECTION_OPTS)
+        self.inout = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.inout.connect(path)
+        except socket.error:
+            self.inout.close()
+            self.inout = None
+            raise IOError("could not connect to trepan hub at %s" % path)
+        self.start_session()
+        return
+
+    def opening_msgs(self) -> list:
+        return [Mtcpfns.HUB_REGISTER + json.dumps(self.info)]
+
+    def start_session(self):
+        """Register with the hub. Unlike a client, we write before
+        reading anything, so wait until the hub has answered our
+        framing offer and given us a session id."""
+        TCPClient.start_session(self)
+        while self.session_id is None:
+            msg = self.buf.next_msg(self.framing)
+            if msg is None:
+                if 0 == self.buf.fill(self.inout):
+                    self.state = "disconnected"
+                    raise EOFError
+                continue
+            self.handle_connection_msg(msg)
+        return
+
+    pass
+
+
+def registration_info() -> dict:
+    """What we tell the hub about ourselves."""
+    return {
+        "pid": os.getpid(),
+        "host": socket.gethostname(),
+        "program": " ".join(sys.argv) if sys.argv and sys.argv[0] else sys.executable,
+    }
+
+
+# Demo
+if __name__ == "__main__":
+    print(registration_info())
+    if len(sys.argv) > 1:
+        inout = HubConnection(opts={"PORT": int(sys.argv[1])})
+        inout.writeline(".Hello from %s" % os.getpid())
+        print("Got: ", inout.read_msg().rstrip("\n"))
+        print("Session: ", inout.session_id)
+        inout.close()
+    pass
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Reading and writing messages for front ends, rather than text for
+people. A message is a JSON-like value: a dictionary, list, string,
+number, boolean or None.
+
+Messages are encoded either as JSON, one message per line, or as
+msgpack. msgpack needs the msgpack package. Values that can't be
+encoded are replaced by their repr().
+
+See trepan.interfaces.machine for the messages themselves.
+"""
+
+import json
+from typing import Any
+
+from trepan import misc as Mmisc
+from trepan.inout.base import DebuggerInOutBase, DebuggerInputBase
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODINGS = ("json", "msgpack")
+
+DEFAULT_MACHINE_OPTS = {"encoding": "json"}
+
+
+def check_encoding(encoding: str):
+    """Raise ValueError if `encoding` is not one we know about, or
+    ImportError if it needs a package that isn't installed."""
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            "encoding should be one of %s; got %s" % (", ".join(ENCODINGS), encoding)
+        )
+    if encoding == "msgpack" and msgpack is None:
+        raise ImportError("the msgpack encoding needs the msgpack package")
+    return
+
+
+def encode(message: Any, encoding: str = "json") -> bytes:
+    if encoding == "msgpack":
+        return msgpack.packb(message, default=repr)
+    return (json.dumps(message, default=repr, ensure_ascii=False) + "\n").encode(
+        "utf-8"
+    )
+
+
+class MachineOutput(DebuggerInOutBase):
+    """Writes messages to a binary stream."""
+
+    def __init__(self, out, opts=None):
+        self.encoding = Mmisc.option_set(opts, "encoding", DEFAULT_MACHINE_OPTS)
+        check_encoding(self.encoding)
+        self.output = out
+        return
+
+    def flush(self):
+        return self.output.flush()
+
+    def write(self, msg):
+        """Text that isn't part of a message is sent as an "output"
+        message."""
+        self.write_message({"event": "output", "text": msg})
+        return
+
+    def write_message(self, message: Any):
+        self.output.write(encode(message, self.encoding))
+        self.output.flush()
+        return
+
+    pass
+
+
+class MachineInput(DebuggerInputBase):
+    """Reads messages from a binary stream."""
+
+    def __init__(self, inp, opts=None):
+        self.encoding = Mmisc.option_set(opts, "encoding", DEFAULT_MACHINE_OPTS)
+        check_encoding(self.encoding)
+        self.input = inp
+        self.unpacker = (
+            msgpack.Unpacker(raw=False) if self.encoding == "msgpack" else None
+        )
+        return
+
+    def open(self, inp, opts=None):
+        self.input = inp
+        return
+
+    def read_message(self) -> Any:
+        """Read the next message. EOFError is raised on EOF and
+        ValueError if what we read can't be decoded."""
+        if self.unpacker is None:
+            while True:
+                line = self.input.readline()
+                if not line:
+                    raise EOFError
+                if line.strip():
+                    return json.loads(line)
+        while True:
+            try:
+                return next(self.unpacker)
+            except StopIteration:
+                pass
+            read = getattr(self.input, "read1", self.input.read)
+            data = read(4096)
+            if not data:
+                raise EOFError
+            self.unpacker.feed(data)
+
+    def readline(self, use_raw=None):
+        message = self.read_message()
+        return message if isinstance(message, str) else json.dumps(message)
+
+    pass
+
+
+# Demo
+if __name__ == "__main__":
+    import io
+
+    buf = io.BytesIO()
+    out = MachineOutput(buf)
+    out.write_message({"event": "stop", "location": {"line": 1}})
+    out.writeline("Hello")
+    print(buf.getvalue().decode("utf-8"), end="")
+    inp = MachineInput(io.BytesIO(buf.getvalue()))
+    print(inp.read_message())
+    print(inp.readline())
+    pass
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013-2015, 2025 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2009, 2013-2015, 2025-2026 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -16,6 +16,8 @@
 """Debugger Socket Input/Output Interface."""
 
 import socket
+import threading
+import time
 from typing import Final
 
 from trepan.lib.default import CLIENT_SOCKET_OPTS
@@ -33,7 +35,32 @@ class TCPClient(DebuggerInOutBase):
         get_option = lambda key: option_set(opts, key, CLIENT_SOCKET_OPTS)
         self.inout = None
         self.addr = None
-        self.buf = ""
+        self.buf = Mtcpfns.MessageBuffer()  # Read buffer
+        # Message framing version in use. We start out with the
+        # original format and switch when the server accepts our offer.
+        self.framing = Mtcpfns.FRAMING_V1
+        self.max_framing = get_option("framing")
+        # Session to attach to when connecting to a trepan hub, and the
+        # session id the hub reports back.
+        self.session = get_option("session")
+        self.session_id = None
+        # Whether to ask for a compressed connection, and if the server
+        # agreed, what compresses what we send.
+        self.compress = get_option("compress")
+        self.compressor = None
+        # Seconds between keepalive messages, and for how long to try
+        # to reconnect and resume the session when the connection is
+        # lost. The server gives us the session's token, and we count
+        # the messages we get so that it knows what we missed.
+        self.keepalive = get_option("keepalive")
+        self.reconnect = get_option("reconnect")
+        self.token = None
+        self.received = 0
+        self.heartbeat = None
+        # The compressor keeps state, so writes from the heartbeat
+        # thread and from us mustn't overlap.
+        self.write_lock = threading.Lock()
+        self.open_opts = opts
         self.line_edit = False  # Our name for GNU readline capability
         self.state = "disconnected"
         if inout:
@@ -45,9 +72,17 @@ class TCPClient(DebuggerInOutBase):
 
     def close(self):
         """Closes both input and output"""
+        self.token = None
         if self.inout:
+            if self.heartbeat and self.state == "connected":
+                # Let the server know that we aren't coming back.
+                try:
+                    self.write(Mtcpfns.BYE)
+                except OSError:
+                    pass
             self.inout.close()
             pass
+        self.heartbeat = None
         self.state = "disconnnected"
         return
 
@@ -57,6 +92,12 @@ class TCPClient(DebuggerInOutBase):
 
         HOST = get_option("HOST")
         PORT = get_option("PORT")
+        self.max_framing = get_option("framing")
+        self.session = get_option("session")
+        self.compress = get_option("compress")
+        self.keepalive = get_option("keepalive")
+        self.reconnect = get_option("reconnect")
+        self.open_opts = opts
         self.inout = None
         for res in socket.getaddrinfo(HOST, PORT, socket.AF_UNSPEC, socket.SOCK_STREAM):
             af, socktype, proto, _, sa = res
@@ -73,8 +114,36 @@ class TCPClient(DebuggerInOutBase):
                 self.inout.close()
                 self.inout = None
                 continue
+            break
         if self.inout is None:
             raise IOError("could not open client socket on port %s" % PORT)
+        # Replies to the server are short and should go out at once.
+        self.inout.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.start_session()
+        return
+
+    def opening_msgs(self) -> list:
+        """Messages to send, in the original framing format, as soon as
+        we connect and before offering a framing version."""
+        if self.session is not None:
+            return [Mtcpfns.HUB_ATTACH + str(self.session)]
+        return []
+
+    def start_session(self):
+        """Set up a newly-made connection."""
+        self.state = "connected"
+        self.buf = Mtcpfns.MessageBuffer()
+        self.framing = Mtcpfns.FRAMING_V1
+        self.compressor = None
+        msgs = self.opening_msgs()
+        if self.max_framing > Mtcpfns.FRAMING_V1:
+            # Offer a newer framing format. The server's answer is
+            # handled in read_msg().
+            compression = Mtcpfns.COMPRESSIONS[0] if self.compress else None
+            resume = Mtcpfns.RESUME_FEATURE if self.keepalive else None
+            msgs.append(Mtcpfns.hello_msg(self.max_framing, compression, resume))
+        if msgs:
+            self.inout.sendall(b"".join(Mtcpfns.pack_msg(msg) for msg in msgs))
         return
 
     def read_msg(self):
@@ -82,23 +151,107 @@ class TCPClient(DebuggerInOutBase):
         more than one message will be set in a receive, so we will
         have to buffer that for the next read.
         EOFError will be raised on EOF.
+
+        If the connection is lost while we have a session we can
+        resume, we try to reconnect first.
         """
         if self.state == "connected":
-            if 0 == len(self.buf):
-                self.buf = self.inout.recv(Mtcpfns.TCP_MAX_PACKET)
-                if 0 == (self.buf):
-                    self.state = "disconnected"
-                    raise EOFError
-                pass
-            self.buf, data = Mtcpfns.unpack_msg(self.buf)
-            return data.decode("utf-8")
+            while True:
+                msg = self.buf.next_msg(self.framing)
+                if msg is None:
+                    try:
+                        received = self.buf.fill(self.inout)
+                    except OSError:
+                        received = 0
+                    if 0 == received:
+                        self.state = "disconnected"
+                        if not self.resume_session():
+                            raise EOFError
+                    continue
+                if not self.handle_connection_msg(msg):
+                    self.received += 1
+                    return msg
         else:
             raise IOError("read_msg called in state: %s." % self.state)
 
+    def resume_session(self) -> bool:
+        """Try to connect again and resume our session, for up to
+        `reconnect` seconds. Return True if we are connected."""
+        if self.token is None:
+            return False
+        self.inout.close()
+        deadline = time.monotonic() + self.reconnect
+        while time.monotonic() < deadline:
+            try:
+                self.open(self.open_opts)
+                return True
+            except IOError:
+                time.sleep(1)
+            pass
+        return False
+
+    def send_heartbeats(self, conn):
+        """Send keepalive messages while `conn` is our connection."""
+        while self.heartbeat and self.inout is conn:
+            time.sleep(self.keepalive)
+            if self.inout is conn and self.state == "connected":
+                try:
+                    self.write(Mtcpfns.PING)
+                except OSError:
+                    pass
+            pass
+        return
+
+    def handle_connection_msg(self, msg: str) -> bool:
+        """Act on `msg` if it is about the connection itself rather than
+        for the debugger interface. Return True if it was."""
+        framing = Mtcpfns.parse_hello(msg)
+        if framing is not None:
+            # The server's answer to our framing offer.
+            self.framing = min(framing, self.max_framing)
+            if self.compress and Mtcpfns.hello_compression(msg):
+                # Everything after the answer is compressed.
+                self.compressor = Mtcpfns.Compressor()
+                self.buf.start_decompressing()
+            if self.keepalive and Mtcpfns.RESUME_FEATURE in Mtcpfns.hello_features(
+                msg
+            ):
+                if self.token is None:
+                    self.write(Mtcpfns.SESSION_RESUME + "new")
+                else:
+                    self.write(
+                        "%s%s %d" % (Mtcpfns.SESSION_RESUME, self.token, self.received)
+                    )
+                # A thread left from an earlier connection stops by
+                # itself.
+                self.heartbeat = threading.Thread(
+                    target=self.send_heartbeats, args=(self.inout,), daemon=True
+                )
+                self.heartbeat.start()
+            return True
+        if msg.startswith(Mtcpfns.SESSION_TOKEN):
+            self.token, received = msg[len(Mtcpfns.SESSION_TOKEN) :].split()
+            self.received = int(received)
+            return True
+        if msg.startswith(Mtcpfns.HUB_SESSION):
+            self.session_id = msg[len(Mtcpfns.HUB_SESSION) :]
+            return True
+        return False
+
     def write(self, msg):
         """This method the debugger uses to write a message unit."""
-        # FIXME: do we have to check the size of msg and split output?
-        return self.inout.send(Mtcpfns.pack_msg(msg))
+        with self.write_lock:
+            data = Mtcpfns.pack_frame(msg, self.framing)
+            if self.compressor:
+                data = self.compressor(data)
+            try:
+                return self.inout.sendall(data)
+            except OSError:
+                if self.token is None:
+                    raise
+                # We'll notice when reading, and reconnect. The server
+                # sends its prompt again then.
+                return None
 
     pass
 
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009-2017, 2021 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2009-2017, 2021, 2026 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -13,17 +13,109 @@
 #
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
-"""Subsidiary routines used to "pack" and "unpack" TCP messages. """
+"""Subsidiary routines used to "pack" and "unpack" TCP messages.
+
+Messages that the debugger interfaces send start with a one-character
+communication code from trepan.interfaces.comcodes, followed by text.
+
+There are two framing formats:
+
+ 1. The original format: a 4-digit ASCII length of the UTF-8 bytes of
+    the message followed by those bytes. Messages longer than 9999 bytes
+    are split into several messages that each carry the communication
+    code.
+
+ 2. A 5-byte header, the communication code as a single byte and a
+    4-byte big-endian length, followed by the UTF-8 bytes of the text.
+
+Connections start out using format 1. A client that understands format
+2 sends a SYNC message, "framing 2", in format 1 as soon as it connects.
+A server that understands it answers with the version it picked, also
+as a format-1 SYNC message, and from then on both sides use that
+version. Older clients don't send anything until prompted, so servers
+wait a short time for this and otherwise stay with format 1.
+
+A client can also ask for the connection to be compressed by adding
+the compression method to its offer, as in "framing 2 zlib". If the
+server agrees, its answer names the method too. Everything either side
+sends after that answer is then a zlib stream, flushed at the end of
+each write. Colored source listings and disassembly compress very
+well. See test/benchmark/bench_compress.py.
+
+Likewise, a client adds "resume" to its offer if it sends keepalive
+messages and can resume a session after losing its connection. If the
+server agrees, the client then sends SESSION_RESUME, either with "new"
+or with the token of the session it had and the number of messages it
+got. The server sends again the messages the client missed, as far as
+it still has them, and then SESSION_TOKEN with the session's token and
+the number of the last message sent. From then on, the client sends
+PING every so often, so that the server can tell when it has gone
+away, and BYE when it leaves on purpose.
+"""
+
+import struct
+import zlib
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from trepan.interfaces.comcodes import SYNC
 
 TCP_MAX_PACKET = 8192  # Largest size for a recv
 LOG_MAX_MSG = 4  # int(log(TCP_MAX_PACKET)
 
+# The largest message that fits in the original format
+MAX_MSG_V1 = 10**LOG_MAX_MSG - 1
+
+FRAMING_V1 = 1
+FRAMING_V2 = 2
+FRAMING_LATEST = FRAMING_V2
+
+# Communication code byte and length of the UTF-8 text that follows.
+HEADER_V2 = struct.Struct(">BI")
+
+# Communication code byte for messages without a code
+NO_CODE = 0
+
+FRAMING_HELLO = SYNC + "framing "
+
+# Compression methods that can be asked for in a framing offer.
+COMPRESSIONS = ("zlib",)
 
-def pack_msg(msg):
-    fmt = "%%0%dd" % LOG_MAX_MSG  # A funny way of writing: '%04d'
+# Framing-offer feature for keepalive and session resume, and the
+# messages used with it.
+RESUME_FEATURE = "resume"
+SESSION_RESUME = SYNC + "resume "
+SESSION_TOKEN = SYNC + "token "
+PING = SYNC + "ping"
+BYE = SYNC + "bye"
+
+# Messages used with a trepan hub (see trepan.hub). A debugged program
+# connecting to the hub registers with HUB_REGISTER followed by JSON
+# describing it, and a client picks a session with HUB_ATTACH and the
+# session id. Either is sent before the framing offer. The hub answers
+# a registration with HUB_SESSION and the id it assigned.
+HUB_REGISTER = SYNC + "register "
+HUB_ATTACH = SYNC + "attach "
+HUB_SESSION = SYNC + "session "
+
+
+def pack_msg(msg: str) -> bytes:
+    """Pack `msg` in the original framing format. Messages that are too
+    long for a 4-digit length are split up; each piece is given the
+    communication code of `msg`."""
     byte_msg = bytes(msg, "UTF-8")
-    byte_fmt = bytes(fmt % len(byte_msg), "UTF-8")
-    return byte_fmt + byte_msg
+    if len(byte_msg) <= MAX_MSG_V1:
+        fmt = "%%0%dd" % LOG_MAX_MSG  # A funny way of writing: '%04d'
+        byte_fmt = bytes(fmt % len(byte_msg), "UTF-8")
+        return byte_fmt + byte_msg
+
+    code, text = msg[:1], msg[1:]
+    # A character is at most 4 bytes in UTF-8.
+    chunk_size = (MAX_MSG_V1 - 4) // 4
+    return b"".join(
+        pack_msg(code + text[i : i + chunk_size])
+        for i in range(0, len(text), chunk_size)
+    )
 
 
 def unpack_msg(buf):
@@ -36,8 +128,172 @@ def unpack_msg(buf):
     return buf, data
 
 
+def pack_frame(msg: str, framing: int = FRAMING_V1) -> bytes:
+    """Pack `msg` for sending using framing format `framing`."""
+    if framing == FRAMING_V1:
+        return pack_msg(msg)
+    if msg and ord(msg[0]) < 128:
+        code, text = ord(msg[0]), msg[1:]
+    else:
+        code, text = NO_CODE, msg
+    byte_text = bytes(text, "UTF-8")
+    return HEADER_V2.pack(code, len(byte_text)) + byte_text
+
+
+def unpack_frame(buf, framing: int = FRAMING_V1) -> Tuple[int, Optional[str]]:
+    """Try to unpack a message from the start of bytes-like `buf`.
+
+    Return the number of bytes used and the message. If `buf` doesn't
+    hold a complete message yet, (0, None) is returned.
+    """
+    if framing == FRAMING_V1:
+        if len(buf) < LOG_MAX_MSG:
+            return 0, None
+        end = LOG_MAX_MSG + int(bytes(buf[:LOG_MAX_MSG]))
+        if len(buf) < end:
+            return 0, None
+        return end, str(buf[LOG_MAX_MSG:end], "UTF-8")
+
+    header_size = HEADER_V2.size
+    if len(buf) < header_size:
+        return 0, None
+    code, length = HEADER_V2.unpack_from(buf)
+    end = header_size + length
+    if len(buf) < end:
+        return 0, None
+    text = str(buf[header_size:end], "UTF-8")
+    return end, text if code == NO_CODE else chr(code) + text
+
+
+def hello_msg(framing: int, *features: Optional[str]) -> str:
+    """The SYNC message that offers, or accepts, framing version
+    `framing` and `features`, such as a compression method. Features
+    that are None are left out."""
+    return " ".join([f"{FRAMING_HELLO}{framing}"] + [f for f in features if f])
+
+
+def parse_hello(msg: str) -> Optional[int]:
+    """If `msg` is a framing hello message, return the framing version
+    in it. Otherwise return None."""
+    if msg.startswith(FRAMING_HELLO):
+        try:
+            return int(msg[len(FRAMING_HELLO) :].split()[0])
+        except (IndexError, ValueError):
+            pass
+    return None
+
+
+def hello_features(msg: str) -> List[str]:
+    """Return the features, like compression, named in framing hello
+    message `msg`."""
+    return msg[len(FRAMING_HELLO) :].split()[1:]
+
+
+def hello_compression(msg: str) -> Optional[str]:
+    """Return the compression method named in framing hello message
+    `msg`, if it is one we know about."""
+    for feature in hello_features(msg):
+        if feature in COMPRESSIONS:
+            return feature
+    return None
+
+
+class Compressor:
+    """Compresses what is written to a connection into a zlib stream.
+    Each write is flushed, so the other side can decompress it right
+    away."""
+
+    def __init__(self, level: int = 6):
+        self.zobj = zlib.compressobj(level)
+        return
+
+    def __call__(self, data: bytes) -> bytes:
+        return self.zobj.compress(data) + self.zobj.flush(zlib.Z_SYNC_FLUSH)
+
+    pass
+
+
+class ReplayBuffer:
+    """The most recent messages sent, numbered from 1, so that they can
+    be sent again to a client that resumes a session. Only up to
+    `max_size` characters of messages are kept."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.msgs: Deque[Tuple[int, str]] = deque()
+        self.size = 0
+        self.seq = 0
+        return
+
+    def add(self, msg: str) -> int:
+        """Remember `msg`, and return its number."""
+        self.seq += 1
+        self.msgs.append((self.seq, msg))
+        self.size += len(msg)
+        while self.size > self.max_size and len(self.msgs) > 1:
+            _, old = self.msgs.popleft()
+            self.size -= len(old)
+        return self.seq
+
+    def since(self, seq: int, last: Optional[int] = None) -> List[str]:
+        """Return the messages numbered after `seq`, up to and including
+        `last`, which is by default the latest, as far as we still have
+        them."""
+        if last is None:
+            last = self.seq
+        return [msg for n, msg in self.msgs if seq < n <= last]
+
+    pass
+
+
+class MessageBuffer:
+    """Received bytes not yet unpacked into messages. Data is received
+    with recv_into() into a reusable buffer."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.chunk = bytearray(TCP_MAX_PACKET)
+        self.view = memoryview(self.chunk)
+        self.decompressor = None
+        return
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def fill(self, sock) -> int:
+        """Receive whatever is available from socket `sock`, waiting
+        if there is nothing. The number of bytes received is returned;
+        0 means the other end has closed the connection."""
+        size = sock.recv_into(self.chunk)
+        if self.decompressor is None:
+            self.data += self.view[:size]
+        elif size:
+            self.data += self.decompressor.decompress(self.view[:size])
+        return size
+
+    def start_decompressing(self):
+        """Treat everything received from now on, including what is
+        still buffered, as a zlib stream."""
+        self.decompressor = zlib.decompressobj()
+        self.data = bytearray(self.decompressor.decompress(bytes(self.data)))
+        return
+
+    def next_msg(self, framing: int = FRAMING_V1) -> Optional[str]:
+        """Remove and return the first complete message, or None if there
+        isn't one yet."""
+        used, msg = unpack_frame(self.data, framing)
+        if msg is not None:
+            del self.data[:used]
+        return msg
+
+    pass
+
+
 # Demo
 if __name__ == "__main__":
     print(unpack_msg(pack_msg("Hello, there!"))[1])
     # assert unpack_msg(pack_msg(msg))[1] == msg
+    big = ".%s\n" % ("x" * 20000)
+    print(len(pack_frame(big)), len(pack_frame(big, FRAMING_V2)))
+    print(unpack_frame(pack_frame(".Hello, there!", FRAMING_V2), FRAMING_V2))
     pass
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013-2014, 2016-2017, 2025 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2009, 2013-2014, 2016-2017, 2025-2026 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -15,6 +15,8 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Debugger Server Input/Output interface. """
 
+import secrets
+import select
 import socket, errno
 
 from typing import Final
@@ -32,12 +34,37 @@ class TCPServer(DebuggerInOutBase):
 
     def __init__(self, inout=None, opts=None):
         get_option = lambda key: Mmisc.option_set(opts, key, self.DEFAULT_INIT_OPTS)
+        get_socket_option = lambda key: Mmisc.option_set(
+            opts, key, Mdefault.SERVER_SOCKET_OPTS
+        )
 
         self.inout = None
         self.conn = None
         self.addr = None
         self.remote_addr = ""
-        self.buf = ""  # Read buffer
+        self.buf = Mtcpfns.MessageBuffer()  # Read buffer
+
+        # Message framing version in use on the current connection, and
+        # the latest version we will agree to.
+        self.framing = Mtcpfns.FRAMING_V1
+        self.max_framing = get_socket_option("framing")
+        self.negotiate_timeout = get_socket_option("negotiate_timeout")
+        # Whether we agree to compress the connection when a client
+        # asks, and if we have, what compresses what we send.
+        self.compress = get_socket_option("compress")
+        self.compressor = None
+
+        # Keepalive and session resume; see tcpfns. "resumable" is set
+        # when the client has said it sends keepalives and can resume.
+        self.resume = get_socket_option("resume")
+        self.client_timeout = get_socket_option("client_timeout")
+        self.resume_timeout = get_socket_option("resume_timeout")
+        self.resumable = False
+        self.client_left = False
+        self.token = secrets.token_hex(8)
+        self.replay = Mtcpfns.ReplayBuffer(get_socket_option("replay_size"))
+        # Number of the last message sent before the current connection.
+        self.connect_seq = 0
         self.line_edit = False  # Our name for GNU readline capability
         self.state = "disconnected"
         self.PORT = None
@@ -74,6 +101,12 @@ class TCPServer(DebuggerInOutBase):
         self.PORT = get_option("PORT")
         self.reuse = get_option("reuse")
         self.search_limit = get_option("search_limit")
+        self.max_framing = get_option("framing")
+        self.negotiate_timeout = get_option("negotiate_timeout")
+        self.compress = get_option("compress")
+        self.resume = get_option("resume")
+        self.client_timeout = get_option("client_timeout")
+        self.resume_timeout = get_option("resume_timeout")
         self.inout = None
 
         this_port = self.PORT - 1
@@ -118,40 +151,171 @@ class TCPServer(DebuggerInOutBase):
                 "could not open server socket after trying ports "
                 "%s..%s" % (self.PORT, this_port)
             )
-        self.PORT = this_port
+        # The port asked for may have been 0, meaning any free port.
+        self.PORT = self.inout.getsockname()[1]
         return
 
     def read(self):
-        if len(self.buf) == 0:
-            self.read_msg()
-            pass
-        return self.buf
+        return self.read_msg()
 
     def read_msg(self):
         """Read one message unit. It's possible however that
         more than one message will be set in a receive, so we will
         have to buffer that for the next read.
         EOFError will be raised on EOF.
+
+        If the client can resume its session and its connection is
+        lost, we wait for it to reconnect rather than raise EOFError.
         """
-        if self.state != "connected":
-            self.wait_for_connect()
-            pass
-        if self.state == "connected":
-            if 0 == len(self.buf):
-                self.buf = self.conn.recv(Mtcpfns.TCP_MAX_PACKET)
-                if 0 == len(self.buf):
-                    self.state = "disconnected"
-                    raise EOFError
+        while True:
+            if self.state != "connected":
+                if self.resumable and not self.client_left:
+                    self.wait_for_connect(timeout=self.resume_timeout)
+                else:
+                    self.wait_for_connect()
                 pass
-            self.buf, data = Mtcpfns.unpack_msg(self.buf)
-            return data.decode("utf-8")
+            msg = self.buf.next_msg(self.framing)
+            if msg is None:
+                if not self.receive():
+                    self.connection_lost()
+                continue
+            if not self.handle_connection_msg(msg):
+                return msg
+            pass
+
+    def receive(self) -> bool:
+        """Receive more from the client. Return False if the connection
+        has been lost: the client closed it, there was an error, or a
+        client that sends keepalives hasn't been heard from in
+        client_timeout seconds."""
+        try:
+            if self.resumable and self.client_timeout:
+                ready, _, _ = select.select([self.conn], [], [], self.client_timeout)
+                if not ready:
+                    return False
+            return 0 != self.buf.fill(self.conn)
+        except OSError:
+            return False
+
+    def connection_lost(self):
+        """Drop the current connection. EOFError is raised unless the
+        client may come back to resume its session."""
+        self.conn.close()
+        self.conn = None
+        self.state = "disconnected"
+        if not self.resumable or self.client_left:
+            raise EOFError
+        return
+
+    def handle_connection_msg(self, msg: str) -> bool:
+        """Act on `msg` if it is about the connection itself rather than
+        for the debugger interface. Return True if it was."""
+        if Mtcpfns.parse_hello(msg) is not None:
+            # The client's framing offer came in after we
+            # stopped waiting for it. Stay with what we have.
+            self.conn.sendall(Mtcpfns.pack_msg(Mtcpfns.hello_msg(self.framing)))
+            return True
+        if msg == Mtcpfns.PING:
+            return True
+        if msg == Mtcpfns.BYE:
+            self.client_left = True
+            return True
+        if msg.startswith(Mtcpfns.SESSION_RESUME) and self.resumable:
+            self.resume_session(msg[len(Mtcpfns.SESSION_RESUME) :].split())
+            return True
+        return False
+
+    def resume_session(self, args):
+        """Answer a client's SESSION_RESUME message, whose arguments are
+        `args`. A client resuming our session is sent what it missed.
+        A new client is sent the last message, which is usually the
+        prompt we are waiting on an answer to, unless we have sent it
+        something already."""
+        if len(args) == 2 and args[0] == self.token and args[1].isdigit():
+            received = int(args[1])
+        elif self.replay.seq == self.connect_seq:
+            received = self.connect_seq - 1
         else:
-            raise IOError("read_msg called in state: %s." % self.state)
+            received = self.connect_seq
+        for msg in self.replay.since(received, self.connect_seq):
+            self.send(msg)
+        # The client now has everything up to our latest message, so
+        # it can count from there.
+        self.send("%s%s %d" % (Mtcpfns.SESSION_TOKEN, self.token, self.replay.seq))
+        return
 
-    def wait_for_connect(self):
-        self.conn, self.addr = self.inout.accept()
-        self.remote_addr = ":".join(str(v) for v in self.addr)
+    def accept(self):
+        """Accept a connection. Return it and a description of the
+        client's address."""
+        conn, addr = self.inout.accept()
+        # Output is batched by the server interface, so don't have the
+        # OS hold back small writes waiting for acknowledgements.
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        return conn, ":".join(str(v) for v in addr)
+
+    def wait_for_connect(self, timeout=None):
+        """Wait for a client to connect. If `timeout` is given and no
+        client connects in that many seconds, EOFError is raised."""
+        if timeout is None:
+            self.conn, self.remote_addr = self.accept()
+        else:
+            self.inout.settimeout(timeout)
+            try:
+                self.conn, self.remote_addr = self.accept()
+            except socket.timeout:
+                # Give up on the session.
+                self.resumable = False
+                raise EOFError
+            finally:
+                self.inout.settimeout(None)
         self.state = "connected"
+        self.buf = Mtcpfns.MessageBuffer()
+        self.connect_seq = self.replay.seq
+        self.client_left = False
+        self.negotiate()
+        return
+
+    def negotiate(self):
+        """Pick the message framing version for a new connection.
+        Clients that know about framing versions offer one right after
+        connecting, possibly asking for compression and session resume
+        too."""
+        self.framing = Mtcpfns.FRAMING_V1
+        self.compressor = None
+        self.resumable = False
+        if self.max_framing <= Mtcpfns.FRAMING_V1:
+            return
+        msg = None
+        while msg is None:
+            ready, _, _ = select.select([self.conn], [], [], self.negotiate_timeout)
+            if not ready or 0 == self.buf.fill(self.conn):
+                return
+            msg = self.buf.next_msg(Mtcpfns.FRAMING_V1)
+        offer = Mtcpfns.parse_hello(msg)
+        if offer is None:
+            # Not an offer. We don't expect anything else before a
+            # prompt, but leave it to be read.
+            self.buf.data[:0] = Mtcpfns.pack_msg(msg)
+            return
+        framing = min(offer, self.max_framing, Mtcpfns.FRAMING_LATEST)
+        compression = Mtcpfns.hello_compression(msg) if self.compress else None
+        self.resumable = self.resume and (
+            Mtcpfns.RESUME_FEATURE in Mtcpfns.hello_features(msg)
+        )
+        self.conn.sendall(
+            Mtcpfns.pack_msg(
+                Mtcpfns.hello_msg(
+                    framing,
+                    compression,
+                    Mtcpfns.RESUME_FEATURE if self.resumable else None,
+                )
+            )
+        )
+        self.framing = framing
+        if compression:
+            self.compressor = Mtcpfns.Compressor()
+            self.buf.start_decompressing()
         return
 
     def write(self, msg):
@@ -159,14 +323,28 @@ class TCPServer(DebuggerInOutBase):
         writeline, no newline is added to the end to `str'. Also
         msg doesn't have to be a string.
         """
-        if self.state != "connected":
+        if self.state != "connected" and (not self.resumable or self.client_left):
             self.wait_for_connect()
             pass
-        buffer = Mtcpfns.pack_msg(msg)
-        while len(buffer) > Mtcpfns.TCP_MAX_PACKET:
-            self.conn.send(buffer[: Mtcpfns.TCP_MAX_PACKET])
-            buffer = buffer[Mtcpfns.TCP_MAX_PACKET :]
-        return self.conn.send(buffer)
+        if self.resumable:
+            # Keep it to send again if the client has to reconnect.
+            self.replay.add(msg)
+            if self.state != "connected":
+                return None
+        try:
+            return self.send(msg)
+        except OSError:
+            if not self.resumable:
+                raise
+            self.connection_lost()
+        return None
+
+    def send(self, msg):
+        """Send `msg` on the current connection."""
+        data = Mtcpfns.pack_frame(msg, self.framing)
+        if self.compressor:
+            data = self.compressor(data)
+        return self.conn.sendall(data)
 
 
 # Demo
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Debugger Client Input/Output over a Unix-domain socket. See
+trepan.inout.unixserver."""
+
+import socket
+
+from trepan import misc as Mmisc
+from trepan.inout.tcpclient import TCPClient
+from trepan.inout.unixserver import socket_path
+from trepan.lib import default as Mdefault
+
+
+class UnixClient(TCPClient):
+    """Debugger Client Input/Output over a Unix-domain socket."""
+
+    def open(self, opts=None):
+        get_option = lambda key: Mmisc.option_set(
+            opts, key, Mdefault.UNIX_SOCKET_OPTS
+        )
+        path = get_option("path")
+        if path is None:
+            path = socket_path(get_option("pid"))
+        self.max_framing = get_option("framing")
+        self.compress = get_option("compress")
+        self.keepalive = get_option("keepalive")
+        self.reconnect = get_option("reconnect")
+        self.open_opts = opts
+        self.session = None
+        self.inout = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.inout.connect(path)
+        except socket.error:
+            self.inout.close()
+            self.inout = None
+            raise IOError("could not connect to debugger socket %s" % path)
+        self.start_session()
+        return
+
+    pass
+
+
+# Demo
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        inout = UnixClient(opts={"open": True, "pid": int(sys.argv[1])})
+        while True:
+            line = input("nu? ")
+            if len(line) == 0:
+                break
+            inout.writeline(line)
+            print("Got: ", inout.read_msg().rstrip("\n"))
+            pass
+        inout.close()
+    pass
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Debugger Server Input/Output over a Unix-domain socket.
+
+Messages are the same as for TCPServer, but there is no port to pick:
+the socket is named after the process id, in a directory that only our
+user can get at. See socket_path(). So a client on the same computer
+needs only the process id to connect.
+"""
+
+import os
+import os.path as osp
+import socket
+import struct
+import tempfile
+from typing import Optional, Tuple
+
+from trepan import misc as Mmisc
+from trepan.inout.tcpserver import TCPServer
+from trepan.lib import default as Mdefault
+
+# pid, uid and gid of the process at the other end of a socket, as
+# returned by SO_PEERCRED.
+PEERCRED = struct.Struct("3i")
+
+
+def socket_dir(create: bool = False) -> str:
+    """Return the directory that holds the sockets of debugged
+    processes. If `create` is True, it is created if needed; it has to
+    belong to us and not be accessible by anyone else."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and osp.isdir(runtime_dir):
+        path = osp.join(runtime_dir, "trepan3k")
+    else:
+        path = osp.join(tempfile.gettempdir(), "trepan3k-%s" % os.getuid())
+    if create:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.stat(path)
+        if info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise IOError("%s must belong to you and be private to you" % path)
+    return path
+
+
+def socket_path(pid: Optional[int] = None) -> str:
+    """Return the path of the socket of the process with id `pid`, by
+    default our own."""
+    if pid is None:
+        pid = os.getpid()
+    return osp.join(socket_dir(), "%s.sock" % pid)
+
+
+def peer_credentials(conn) -> Optional[Tuple[int, int, int]]:
+    """Return the pid, uid and gid of the process at the other end of
+    Unix-domain socket `conn`, or None if the OS doesn't tell us."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    return PEERCRED.unpack(
+        conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, PEERCRED.size)
+    )
+
+
+class UnixServer(TCPServer):
+    """Debugger Server Input/Output over a Unix-domain socket."""
+
+    def __init__(self, inout=None, opts=None):
+        self.path = None
+        self.check_peer = Mmisc.option_set(
+            opts, "check_peer", Mdefault.UNIX_SOCKET_OPTS
+        )
+        self.peer_pid = None
+        TCPServer.__init__(self, inout, opts)
+        return
+
+    def close(self):
+        """Closes both socket and server connection, and removes the
+        socket file."""
+        TCPServer.close(self)
+        if self.path and osp.exists(self.path):
+            os.unlink(self.path)
+            pass
+        self.path = None
+        return
+
+    def open(self, opts=None):
+        get_option = lambda key: Mmisc.option_set(
+            opts, key, Mdefault.UNIX_SOCKET_OPTS
+        )
+        if not hasattr(socket, "AF_UNIX"):
+            raise IOError("Unix-domain sockets are not available here")
+
+        path = get_option("path")
+        if path is None:
+            socket_dir(create=True)
+            path = socket_path()
+        if osp.exists(path):
+            # Left over from an earlier process with our pid.
+            os.unlink(path)
+        self.max_framing = get_option("framing")
+        self.negotiate_timeout = get_option("negotiate_timeout")
+        self.compress = get_option("compress")
+        self.resume = get_option("resume")
+        self.client_timeout = get_option("client_timeout")
+        self.resume_timeout = get_option("resume_timeout")
+        self.inout = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.inout.bind(path)
+        except socket.error:
+            self.inout.close()
+            self.inout = None
+            raise IOError("could not open server socket %s" % path)
+        os.chmod(path, 0o600)
+        self.inout.listen(1)
+        self.path = path
+        self.state = "listening"
+        return
+
+    def is_allowed(self, conn) -> bool:
+        """Accept connections only from processes run by us, or by
+        root. Where the OS doesn't give peer credentials, we rely on
+        the permissions of the socket and its directory."""
+        credentials = peer_credentials(conn)
+        if credentials is None:
+            return True
+        pid, uid, _ = credentials
+        self.peer_pid = pid
+        return not self.check_peer or uid in (os.getuid(), 0)
+
+    def accept(self):
+        while True:
+            conn, _ = self.inout.accept()
+            if self.is_allowed(conn):
+                break
+            conn.close()
+        return conn, "pid %s" % self.peer_pid if self.peer_pid else self.path
+
+    pass
+
+
+# Demo
+if __name__ == "__main__":
+    inout = UnixServer(opts={"open": False})
+    import sys
+
+    if len(sys.argv) > 1:
+        inout.open()
+        print("Listening for connection on %s" % inout.path)
+        while True:
+            try:
+                line = inout.read_msg().rstrip("\n")
+                print(line)
+                inout.writeline("ack: " + line)
+            except EOFError:
+                break
+            pass
+        pass
+    inout.close()
+    pass
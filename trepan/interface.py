@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2010, 2013, 2015, 2018, 2023, 2025 Rocky Bernstein
+#   Copyright (C) 2010, 2013, 2015, 2018, 2023, 2025-2026 Rocky Bernstein
 #   <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -33,6 +33,10 @@ class TrepanInterface:
         - another interface in another process or computer
     """
 
+    # True if the interface sends data, such as stop locations and
+    # command results, rather than text. See trepan.interfaces.machine.
+    structured = False
+
     def __init__(self, inp=None, out=None):
         self.input = inp or sys.stdin
         self.output = out or sys.stdout
@@ -56,6 +60,19 @@ class TrepanInterface:
     def finalize(self, last_wishes=None):
         raise NotImplementedError(NotImplementedMessage)
 
+    def flush(self):
+        """Send any output that the interface is holding back. The
+        command processor calls this before the program resumes.
+        Output written after that, while the program runs, should not
+        be held back."""
+        return
+
+    def hold_output(self):
+        """The command processor calls this when the program stops.
+        Until flush() is called, an interface may hold output back
+        until it reads input."""
+        return
+
     def msg(self, msg):
         """used to write to a debugger that is connected to this
         server; `str' written will have a newline added to it
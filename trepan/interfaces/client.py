@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2009, 2013-2014, 2017, 2023-2024 Rocky Bernstein
+#   Copyright (C) 2009, 2013-2014, 2017, 2023-2024, 2026 Rocky Bernstein
 #   <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -19,7 +19,11 @@
 The debugged program is at the other end of the communication."""
 
 import sys
-from trepan.inout import fifoclient as Mfifoclient, tcpclient as Mtcpclient
+from trepan.inout import (
+    fifoclient as Mfifoclient,
+    tcpclient as Mtcpclient,
+    unixclient as Munixclient,
+)
 
 # Our local modules
 from trepan.interfaces import user as Muser
@@ -49,15 +53,20 @@ class ClientInterface(Muser.UserInterface):
             self.server_type = opts["IO"]
             if "FIFO" == self.server_type:
                 self.inout = Mfifoclient.FIFOClient(opts=opts)
-            elif "TCP" == self.server_type:
+            elif self.server_type in ("TCP", "UNIX"):
+                client_class = (
+                    Mtcpclient.TCPClient
+                    if "TCP" == self.server_type
+                    else Munixclient.UnixClient
+                )
                 try:
-                    self.inout = Mtcpclient.TCPClient(opts=opts)
+                    self.inout = client_class(opts=opts)
                 except OSError as e:
                     self.errmsg(str(e))
                     sys.exit(1)
             else:
                 self.errmsg(
-                    f"Expecting server type TCP or FIFO. Got: {self.server_type}."
+                    f"Expecting server type TCP, UNIX or FIFO. Got: {self.server_type}."
                 )
                 sys.exit(1)
             pass
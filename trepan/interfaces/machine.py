@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Interface for front ends, like IDEs, that want data rather than
+text to scrape.
+
+Every message that we send is a dictionary with an "event" key:
+
+  stop:    the program has stopped. The message also has the reason,
+           location, stack, locals and displays; see
+           trepan.processor.machine.stop_info().
+  result:  the reply to a command. "output" and "errors" hold the lines
+           of text that the command produced, and "data", if present,
+           holds its result as data. "running" is true if the program
+           has been resumed, as with "next" or "continue".
+  confirm: a yes or no answer is needed to "prompt". Reply with true
+           or false.
+  input:   a line of input is needed, for "prompt".
+  output, error:
+           text produced outside of any command, in "text".
+  exit:    the debugger is finishing.
+
+A request is either a string holding a debugger command, or a
+dictionary with the command in "command" and an "id" that is copied to
+the reply.
+
+Messages are encoded as JSON lines or msgpack; see trepan.inout.machine.
+"""
+
+import atexit
+import os
+import sys
+from typing import Any, Optional
+
+from trepan import interface as Minterface, misc as Mmisc
+from trepan.inout.machine import DEFAULT_MACHINE_OPTS, MachineInput, MachineOutput
+
+
+class MachineInterface(Minterface.TrepanInterface):
+    """Interface for front ends that want data rather than text."""
+
+    structured = True
+
+    def __init__(self, inp=None, out=None, opts=None):
+        encoding = Mmisc.option_set(opts, "encoding", DEFAULT_MACHINE_OPTS)
+        machine_opts = {"encoding": encoding}
+        self.input = MachineInput(inp or sys.stdin.buffer, machine_opts)
+        self.output = MachineOutput(out or sys.stdout.buffer, machine_opts)
+        self.interactive = False
+
+        # Reply to the command being run, and text given to msg_nocr()
+        # that doesn't end in a newline yet.
+        self.reply: Optional[dict] = None
+        self.partial = ""
+        self.finished = False
+        atexit.register(self.finalize)
+        return
+
+    def add_text(self, kind: str, text: str):
+        text = self.partial + text
+        self.partial = ""
+        if self.reply is not None:
+            self.reply[kind].append(text)
+        else:
+            self.event("output" if kind == "output" else "error", {"text": text})
+        return
+
+    def close(self):
+        """Closes both input and output"""
+        try:
+            self.input.close()
+            self.output.close()
+        except Exception:
+            pass
+        return
+
+    def confirm(self, prompt: str, default: bool) -> bool:
+        self.event("confirm", {"prompt": prompt, "default": default})
+        try:
+            answer = self.input.read_message()
+        except (EOFError, ValueError):
+            return default
+        if isinstance(answer, str):
+            answer = answer.strip().lower()
+            if answer in ("y", "yes"):
+                return True
+            if answer in ("n", "no"):
+                return False
+            return default
+        return bool(answer)
+
+    def errmsg(self, msg: str, prefix="** "):
+        """Common routine for reporting debugger error messages."""
+        self.add_text("errors", msg)
+        return
+
+    def event(self, name: str, data: Optional[dict] = None):
+        """Send message `name`, with the contents of `data`."""
+        message = {"event": name}
+        if data:
+            message.update(data)
+        self.output.write_message(message)
+        return
+
+    def finalize(self, last_wishes=None):
+        if self.finished:
+            return
+        self.finished = True
+        try:
+            self.send_reply(running=True)
+            self.event("exit")
+        except Exception:
+            pass
+        self.close()
+        return
+
+    def flush(self):
+        """The command processor calls this when the program is about
+        to be resumed."""
+        self.send_reply(running=True)
+        return
+
+    def msg(self, msg: str):
+        self.add_text("output", msg)
+        return
+
+    def msg_nocr(self, msg: str):
+        self.partial += msg
+        return
+
+    def read_command(self, prompt: str = "") -> str:
+        """Send the reply to the last command, and read a new one."""
+        self.send_reply(running=False)
+        while True:
+            try:
+                request = self.input.read_message()
+            except ValueError as e:
+                self.event("error", {"text": f"Bad request: {e}"})
+                continue
+            request_id = None
+            if isinstance(request, dict):
+                request_id = request.get("id")
+                request = request.get("command")
+            if not isinstance(request, str):
+                self.event(
+                    "error",
+                    {"id": request_id, "text": "A request needs a command string."},
+                )
+                continue
+            self.reply = {
+                "event": "result",
+                "id": request_id,
+                "command": request,
+                "output": [],
+                "errors": [],
+            }
+            return request
+
+    def readline(self, prompt: str = "", add_to_history=True) -> str:
+        self.event("input", {"prompt": prompt})
+        return self.input.readline()
+
+    def result(self, data: Any):
+        """Give `data` as the result of the command being run."""
+        if self.reply is not None:
+            self.reply["data"] = data
+        else:
+            self.event("result", {"data": data})
+        return
+
+    def send_reply(self, running: bool):
+        """Send the reply to the command that has been run, if any."""
+        if self.partial:
+            self.add_text("output", "")
+        if self.reply is not None:
+            reply, self.reply = self.reply, None
+            reply["running"] = running
+            self.output.write_message(reply)
+        return
+
+    def warnmsg(self, msg: str, prefix="* "):
+        self.add_text("output", prefix + msg)
+        return
+
+    pass
+
+
+def plain_text_settings(settings: dict):
+    """Change debugger `settings` so that command output has no terminal
+    escape sequences in it. Both "highlight" and "style" are needed:
+    some commands go by one, and some by the other."""
+    settings["highlight"] = "plain"
+    settings["style"] = "none"
+    return
+
+
+def stdio_streams():
+    """Return binary streams for talking to a front end on standard
+    input and output. File descriptor 1 is then pointed at standard
+    error, so that output from the debugged program doesn't get mixed
+    in with our messages."""
+    sys.stdout.flush()
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    return sys.stdin.buffer, out
+
+
+# Demo
+if __name__ == "__main__":
+    intf = MachineInterface()
+    intf.msg("Testing1, 2, 3")
+    intf.event("stop", {"location": {"filename": __file__, "line": 1}})
+    if len(sys.argv) > 1:
+        try:
+            command = intf.read_command()
+        except EOFError:
+            print("No input EOF: ", file=sys.stderr)
+        else:
+            intf.msg(f"You said {command}")
+            intf.result({"command": command})
+            intf.flush()
+            pass
+        pass
+    pass
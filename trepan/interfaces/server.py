@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013-2015, 2017 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2009, 2013-2015, 2017, 2026 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -18,10 +18,22 @@ import atexit
 
 # Our local modules
 from trepan import interface as Minterface
-from trepan.inout import fifoserver as Mfifoserver, tcpserver as Mtcpserver
+from trepan.inout import (
+    fifoserver as Mfifoserver,
+    hubconn as Mhubconn,
+    tcpserver as Mtcpserver,
+    unixserver as Munixserver,
+)
 from trepan.interfaces import comcodes as Mcomcodes
 
-DEFAULT_INIT_CONNECTION_OPTS = {"IO": "TCP", "PORT": 1955}
+DEFAULT_INIT_CONNECTION_OPTS = {
+    "IO": "TCP",
+    "PORT": 1955,
+    # While the program is stopped, output is held back and sent as a
+    # single message when we are about to read, or when this many
+    # characters have accumulated.
+    "output_batch_size": 16384,
+}
 
 
 class ServerInterface(Minterface.TrepanInterface):
@@ -35,12 +47,22 @@ class ServerInterface(Minterface.TrepanInterface):
         opts = DEFAULT_INIT_CONNECTION_OPTS.copy()
         opts.update(connection_opts)
         self.inout = None  # initialize in case assignment below fails
+        self.pending_output = []
+        self.pending_size = 0
+        self.output_batch_size = opts["output_batch_size"]
+        # True while the program is stopped; see hold_output().
+        self.holding_output = False
         if inout:
             self.inout = inout
         else:
             self.server_type = opts["IO"]
             if "FIFO" == self.server_type:
                 self.inout = Mfifoserver.FIFOServer()
+            elif "HUB" == self.server_type:
+                # Connect out to a trepan hub rather than listen.
+                self.inout = Mhubconn.HubConnection(opts=opts)
+            elif "UNIX" == self.server_type:
+                self.inout = Munixserver.UnixServer(opts=opts)
             else:
                 self.inout = Mtcpserver.TCPServer(opts=opts)
                 pass
@@ -55,6 +77,8 @@ class ServerInterface(Minterface.TrepanInterface):
     def close(self):
         """Closes both input and output"""
         if self.inout:
+            if self.is_connected():
+                self.send_output()
             self.inout.close()
         return
 
@@ -84,11 +108,37 @@ class ServerInterface(Minterface.TrepanInterface):
     def finalize(self, last_wishes=Mcomcodes.QUIT):
         # print exit annotation
         if self.is_connected():
+            self.send_output()
             self.inout.writeline(last_wishes)
             pass
         self.close()
         return
 
+    def flush(self):
+        """Send output that has been held back, and stop holding output
+        back. The command processor calls this before the program
+        resumes, so that output written while it runs, like that of
+        "set trace", is sent right away."""
+        self.holding_output = False
+        self.send_output()
+        return
+
+    def hold_output(self):
+        """Hold output back until we read, flush() is called, or
+        enough has accumulated. The command processor calls this when
+        the program stops."""
+        self.holding_output = True
+        return
+
+    def send_output(self):
+        """Send output that has been held back as a single message."""
+        if self.pending_output:
+            text = "".join(self.pending_output)
+            self.pending_output = []
+            self.pending_size = 0
+            self.inout.write(Mcomcodes.PRINT + text)
+        return
+
     def is_connected(self):
         """Return True if we are connected"""
         return self.inout and "connected" == self.inout.state
@@ -97,25 +147,36 @@ class ServerInterface(Minterface.TrepanInterface):
         """used to write to a debugger that is connected to this
         server; `str' written will have a newline added to it
         """
-        self.inout.writeline(Mcomcodes.PRINT + msg)
+        self.msg_nocr(msg + "\n")
         return
 
     def msg_nocr(self, msg):
         """used to write to a debugger that is connected to this
-        server; `str' written will not have a newline added to it
+        server; `str' written will not have a newline added to it.
+
+        While the program is stopped, output is batched: it is sent
+        when we next read from the connection, when flush() is called,
+        or when enough of it has accumulated. Otherwise it is sent
+        right away.
         """
-        self.inout.write(Mcomcodes.PRINT + msg)
+        self.pending_output.append(msg)
+        self.pending_size += len(msg)
+        if not self.holding_output or self.pending_size >= self.output_batch_size:
+            self.send_output()
         return
 
     def read_command(self, prompt):
         return self.readline(prompt)
 
     def read_data(self):
+        self.send_output()
         return self.inout.read_data()
 
     def readline(self, prompt, add_to_history=True):
         if prompt:
             self.write_prompt(prompt)
+        else:
+            self.send_output()
             pass
         coded_line = self.inout.read_msg()
         self.read_ctrl = coded_line[0]
@@ -126,6 +187,7 @@ class ServerInterface(Minterface.TrepanInterface):
         return self.inout.state
 
     def write_prompt(self, prompt):
+        self.send_output()
         return self.inout.writeline(Mcomcodes.PROMPT + prompt)
 
     def write_confirm(self, prompt, default):
@@ -134,6 +196,7 @@ class ServerInterface(Minterface.TrepanInterface):
         else:
             code = Mcomcodes.CONFIRM_FALSE
             pass
+        self.send_output()
         return self.inout.writeline(code + prompt)
 
     pass
@@ -22,7 +22,7 @@ __all__ = ["BreakpointManager", "Breakpoint"]
 import os.path as osp
 from collections import defaultdict
 from types import CodeType, ModuleType
-from typing import DefaultDict, Optional
+from typing import DefaultDict, Dict, FrozenSet, Optional, Tuple
 from types import FrameType
 from pyficache import (
     code_position_cache,
@@ -30,6 +30,9 @@ from pyficache import (
 )
 from xdis import load_module
 
+from trepan.lib.bytecode import code_index
+from trepan.lib.eval import compile_expression
+
 
 class Breakpoint:
     """Breakpoint class implements temporary breakpoints, ignore
@@ -105,6 +108,8 @@ class Breakpoint:
             # TODO: Figure out code offset.
             self.offset = None
 
+        # Setting the condition also compiles it into
+        # self.condition_code; a SyntaxError here is raised to the caller.
         self.condition = condition
         self.enabled = True
 
@@ -172,6 +177,23 @@ class Breakpoint:
             msg += f"\n\tbreakpoint already hit {self.hits} time{ss}"
         return msg
 
+    @property
+    def condition(self) -> Optional[str]:
+        """The Python expression that must be true for the breakpoint to
+        stop, or None if the breakpoint is unconditional."""
+        return self._condition
+
+    @condition.setter
+    def condition(self, condition: Optional[str]):
+        # Compile first so that a SyntaxError leaves the old condition
+        # in place.
+        if condition:
+            self.condition_code: Optional[CodeType] = compile_expression(condition)
+        else:
+            self.condition_code = None
+            condition = None
+        self._condition = condition
+
     def enable(self):
         self.enabled = True
         return self.enabled
@@ -195,6 +217,9 @@ class Breakpoint:
     pass  # end of Breakpoint class
 
 
+NO_BREAKPOINTS: FrozenSet[int] = frozenset()
+
+
 class BreakpointManager:
     """Manages the list of Breakpoints.
 
@@ -203,6 +228,13 @@ class BreakpointManager:
     dictionary. If the breakpoint is a function it is in `code2position_brkpts' as
     well.  Note there may be more than one breakpoint per line which
     may have different conditions associated with them.
+
+    So that the event hook can decide quickly whether a frame can stop
+    at a breakpoint, we also keep an index from code object to the
+    frozenset of line numbers, and of offsets, that have breakpoints,
+    and from file name to line numbers for breakpoints that don't
+    have a code object yet. See `code_may_break()' and
+    `lines_for_code()'.
     """
 
     def __init__(self):
@@ -251,7 +283,8 @@ class BreakpointManager:
         If ``offset`` is given and not -1, then it we must also be at that offset in order to stop.
         ``temporary`` specifies whether the breakpoint will be removed once it is hit.
         `condition`` specifies that a string Python expression to be evaluated to determine
-        whether the breakpoint is hit or not.
+        whether the breakpoint is hit or not. It is compiled here, and
+        SyntaxError is raised if it is not a valid expression.
 
         The parameter ``position`` is -1 when we want a breakpoint on a call event.
         """
@@ -293,6 +326,12 @@ class BreakpointManager:
                 position = 0
             if line_number == -1:
                 line_number = code.co_firstlineno
+        elif func_or_code is None and filename and line_number > 0:
+            # A breakpoint by file and line number for code that
+            # hasn't been compiled yet, e.g. a module that has not been
+            # imported. The code object gets matched when it runs.
+            code = None
+            position = None
         else:
             print(f"Don't know what to do with {func_or_code}, {type(func_or_code)}")
             return
@@ -318,6 +357,7 @@ class BreakpointManager:
             else:
                 # Add breakpoint to list of breakpoints indexed by code object.
                 self.code2position_brkpts[code].append(brkpt)
+        self.update_index()
         return brkpt
 
     def delete_all_breakpoints(self) -> str:
@@ -343,22 +383,23 @@ class BreakpointManager:
         if index not in self.bplist:
             return False
 
-        # FIXME: should mark breakpoint as being a call breakpoint or not instead of doing
-        # this logic.
-        brkpts = self.codecall_brkpts[bp.code] if bp.offset is None else self.code2position_brkpts[bp.code]
-        if not brkpts:
-            brkpts = self.code2position_brkpts[bp.code]
+        if bp.code is not None:
+            # FIXME: should mark breakpoint as being a call breakpoint or not instead of doing
+            # this logic.
+            brkpts = self.codecall_brkpts[bp.code] if bp.offset is None else self.code2position_brkpts[bp.code]
+            if not brkpts:
+                brkpts = self.code2position_brkpts[bp.code]
 
-        assert brkpts, f"Should have a list of breakpoints set in {bp.code}"
-        if bp in brkpts:
-            brkpts.remove(bp)
+            assert brkpts, f"Should have a list of breakpoints set in {bp.code}"
+            if bp in brkpts:
+                brkpts.remove(bp)
 
         self.bplist[index].remove(bp)
         if not self.bplist[index]:
             # No more breakpoints for this file:line combo
             del self.bplist[index]
 
-
+        self.update_index()
         return True
 
     def delete_breakpoint_by_number(self, bpnum: int) -> tuple:
@@ -433,7 +474,7 @@ class BreakpointManager:
                 continue
             # Count every hit when bp is enabled
             b.hits += 1
-            if not b.condition:
+            if b.condition_code is None:
                 # If unconditional, and ignoring, go on to next, else
                 # break
                 if b.ignore > 0:
@@ -448,7 +489,7 @@ class BreakpointManager:
                 # Ignore count applies only to those bpt hits where the
                 # condition evaluates to true.
                 try:
-                    val = eval(b.condition, frame.f_globals, frame.f_locals)
+                    val = eval(b.condition_code, frame.f_globals, frame.f_locals)
                     if val:
                         if b.ignore > 0:
                             b.ignore = b.ignore - 1
@@ -489,6 +530,112 @@ class BreakpointManager:
 
         self.bplist = defaultdict(list)
 
+        # An index built from the above by update_index(). The values
+        # are line numbers of breakpoints in a code object. Note that
+        # lookup is by code-object equality, so code that pyficache
+        # compiles to find a breakpoint position matches the code
+        # object that runs.
+        self.code2lines: Dict[CodeType, FrozenSet[int]] = {}
+
+        # True if code2lines or codecall_brkpts has any breakpoints.
+        self._has_code_brkpts = False
+
+        # Results of code_breaks(), by id() of the code object. Hashing
+        # a code object hashes all of its contents, which is too slow
+        # to do on every event.
+        self._code_breaks: Dict[int, Tuple[CodeType, FrozenSet[int], bool]] = {}
+
+        # Line numbers of breakpoints that don't have a code object,
+        # indexed by file name.
+        self.file2lines: Dict[str, FrozenSet[int]] = {}
+
+        # Cache of file2lines breakpoints found in a code object, by
+        # id() of the code object. This is filled in lazily by
+        # lines_for_code().
+        self._code2file_lines: Dict[int, Tuple[CodeType, FrozenSet[int]]] = {}
+
+        return
+
+    def clear_file_lines_cache(self):
+        """Forget which file2lines breakpoints each code object has.
+        This must be called when the canonic file names of code objects
+        can change, since those are what file2lines is indexed by."""
+        self._code2file_lines = {}
+        return
+
+    def code_may_break(self, code: CodeType, filename: Optional[str] = None) -> bool:
+        """Return True if running ``code`` might stop at a breakpoint:
+        there is a call breakpoint for it or a breakpoint at one of its
+        lines. ``filename`` is the canonic file name for ``code``. It
+        is needed only if there are breakpoints in ``file2lines``.
+        """
+        lines, has_call_brkpts = self.code_breaks(code)
+        if lines or has_call_brkpts:
+            return True
+        return bool(self.file2lines) and bool(self.lines_for_code(code, filename))
+
+    def code_breaks(self, code: CodeType) -> Tuple[FrozenSet[int], bool]:
+        """Return the line numbers in ``code2lines`` for ``code``, and
+        whether there is a call breakpoint for ``code``.
+
+        This is called on events, so the result is cached by id() of
+        the code object, and believed only if the code object is the
+        same one, as in ``canonic_code_filename()``.
+        """
+        if not self._has_code_brkpts:
+            return NO_BREAKPOINTS, False
+        entry = self._code_breaks.get(id(code))
+        if entry is not None and entry[0] is code:
+            return entry[1], entry[2]
+        lines = self.code2lines.get(code, NO_BREAKPOINTS)
+        has_call_brkpts = bool(self.codecall_brkpts.get(code))
+        if len(self._code_breaks) >= 10000:
+            # Code objects that are created on the fly, e.g. via exec(),
+            # shouldn't accumulate here.
+            self._code_breaks.clear()
+        self._code_breaks[id(code)] = (code, lines, has_call_brkpts)
+        return lines, has_call_brkpts
+
+    def lines_for_code(
+        self, code: CodeType, filename: Optional[str] = None
+    ) -> FrozenSet[int]:
+        """Return the set of line numbers in ``code`` that have
+        breakpoints. ``filename`` is used as in ``code_may_break()``.
+        """
+        lines = self.code_breaks(code)[0]
+        if not self.file2lines or filename is None:
+            return lines
+        entry = self._code2file_lines.get(id(code))
+        if entry is not None and entry[0] is code:
+            file_lines = entry[1]
+        else:
+            file_lines = self.file2lines.get(filename, NO_BREAKPOINTS)
+            if file_lines:
+                file_lines = file_lines & code_index(code).lines
+            self._code2file_lines[id(code)] = (code, file_lines)
+        return lines | file_lines if file_lines else lines
+
+    def update_index(self):
+        """Rebuild the per-code-object and per-file breakpoint index.
+        This needs to be called whenever breakpoints are added or
+        removed."""
+        code2lines: DefaultDict[CodeType, set] = defaultdict(set)
+        file2lines: DefaultDict[str, set] = defaultdict(set)
+        for code, brkpts in self.code2position_brkpts.items():
+            for bp in brkpts:
+                code2lines[code].add(bp.line_number)
+        for bp in self.bpbynumber:
+            if bp is not None and bp.code is None and bp.filename:
+                file2lines[bp.filename].add(bp.line_number)
+        self.code2lines = {code: frozenset(lines) for code, lines in code2lines.items()}
+        self._has_code_brkpts = bool(self.code2lines) or any(
+            self.codecall_brkpts.values()
+        )
+        self._code_breaks = {}
+        self.file2lines = {
+            filename: frozenset(lines) for filename, lines in file2lines.items()
+        }
+        self._code2file_lines = {}
         return
 
     pass  # BreakpointManager
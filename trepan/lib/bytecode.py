@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2009, 2012-2013, 2020, 2023-2025 Rocky Bernstein
+#   Copyright (C) 2009, 2012-2013, 2020, 2023-2026 Rocky Bernstein
 #   <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -17,16 +17,113 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Bytecode instruction routines"""
 
+import bisect
 import re
-
+import weakref
 from opcode import opname
-from types import FrameType
-from typing import Optional
+from types import CodeType, FrameType
+from typing import Dict, FrozenSet, List, Optional
 from xdis import PYTHON_IMPLEMENTATION, PYTHON_VERSION_TRIPLE, get_opcode_module
 
 opcode_module = get_opcode_module(PYTHON_VERSION_TRIPLE, PYTHON_IMPLEMENTATION)
 
 
+class CodeIndex:
+    """Line and offset tables for a code object, built the first time
+    they are asked for. Get one with code_index(), so that the tables
+    are shared by everything that looks at the same code object.
+
+    Only a weak reference to the code object is kept.
+    """
+
+    def __init__(self, co: CodeType):
+        self.code_ref = weakref.ref(co)
+        self._linestarts: Optional[Dict[int, int]] = None
+        self._start_offsets: Optional[List[int]] = None
+        self._line_offsets: Optional[Dict[int, List[int]]] = None
+        self._lines: Optional[FrozenSet[int]] = None
+        self._line_opnames: Optional[Dict[int, FrozenSet[str]]] = None
+        return
+
+    @property
+    def code(self) -> CodeType:
+        co = self.code_ref()
+        assert co is not None, "code object has gone away"
+        return co
+
+    @property
+    def linestarts(self) -> Dict[int, int]:
+        """Map from the offsets that start a line to their line
+        number, as findlinestarts() gives."""
+        if self._linestarts is None:
+            self._linestarts = dict(opcode_module.findlinestarts(self.code))
+        return self._linestarts
+
+    @property
+    def line_offsets(self) -> Dict[int, List[int]]:
+        """Map from line number to the offsets that start it, in
+        increasing order. A line can start more than once, as in a loop
+        condition."""
+        if self._line_offsets is None:
+            line_offsets: Dict[int, List[int]] = {}
+            for offset, line in sorted(self.linestarts.items()):
+                line_offsets.setdefault(line, []).append(offset)
+            self._line_offsets = line_offsets
+        return self._line_offsets
+
+    @property
+    def lines(self) -> FrozenSet[int]:
+        """The line numbers that have code."""
+        if self._lines is None:
+            self._lines = frozenset(self.linestarts.values())
+        return self._lines
+
+    def line_at(self, offset: int) -> Optional[int]:
+        """Return the line number that the instruction at `offset` is
+        part of, or None if it comes before any line."""
+        if self._start_offsets is None:
+            self._start_offsets = sorted(self.linestarts)
+        i = bisect.bisect_right(self._start_offsets, offset)
+        if i == 0:
+            return None
+        return self.linestarts[self._start_offsets[i - 1]]
+
+    def opnames(self, line: int) -> FrozenSet[str]:
+        """Return the names of the opcodes in the code for `line`."""
+        if self._line_opnames is None:
+            line_opnames: Dict[int, set] = {}
+            bytecode = self.code.co_code
+            linestarts = self.linestarts
+            names: Optional[set] = None
+            for offset in range(0, len(bytecode), 2):
+                if offset in linestarts:
+                    names = line_opnames.setdefault(linestarts[offset], set())
+                if names is not None:
+                    names.add(opname[bytecode[offset]])
+                pass
+            self._line_opnames = {
+                line: frozenset(names) for line, names in line_opnames.items()
+            }
+        return self._line_opnames.get(line, frozenset())
+
+    pass
+
+
+_code_indexes: Dict[int, CodeIndex] = {}
+
+
+def code_index(co: CodeType) -> CodeIndex:
+    """Return the CodeIndex for `co`. It is dropped when `co` goes
+    away."""
+    key = id(co)
+    index = _code_indexes.get(key)
+    if index is None or index.code_ref() is not co:
+        index = CodeIndex(co)
+        index.code_ref = weakref.ref(co, lambda _: _code_indexes.pop(key, None))
+        _code_indexes[key] = index
+    return index
+
+
 def opname_at_code_offset(bytecode_bytes: bytes, offset: int) -> str:
     try:
         opcode = bytecode_bytes[offset]
@@ -65,8 +162,7 @@ def next_opcode(code, offset):
 def next_linestart(co, offset: int, count=1) -> int:
     code = co.co_code
 
-    linestarts = dict(opcode_module.findlinestarts(co))
-    n = len(code)
+    linestarts = code_index(co).linestarts
     # contains_cond_jump = False
     while offset < len(code):
         if offset in linestarts:
@@ -80,29 +176,7 @@ def next_linestart(co, offset: int, count=1) -> int:
 
 
 def stmt_contains_opcode(co, lineno, query_opname) -> bool:
-    linestarts = dict(opcode_module.findlinestarts(co))
-    code = co.co_code
-    found_start = False
-    offset = 0
-    start_line = None
-    for offset, start_line in list(linestarts.items()):
-        if start_line == lineno:
-            print("=" * 30)
-            found_start = True
-            break
-        pass
-    if not found_start:
-        return False
-    for op, offset in next_opcode(code, offset):
-        linestart = linestarts.get(offset)
-        if -1000 == offset or linestart and linestart != start_line:
-            return False
-        op_name = opname[op]
-        # debug: print opname
-        if query_opname == op_name:
-            return True
-        pass
-    return False
+    return query_opname in code_index(co).opnames(lineno)
 
 
 _re_def_str = r"^\s*def\s"
@@ -29,8 +29,9 @@ import os
 import os.path as osp
 import sys
 import threading
-from types import FrameType
-from typing import Any, Dict, NewType, Optional
+from collections import namedtuple
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, NewType, Optional, Tuple
 
 # External packages
 import pyficache
@@ -39,7 +40,9 @@ import tracer
 # Our local modules
 from trepan.clifns import search_file
 from trepan.lib.breakpoint import BreakpointManager
-from trepan.lib.default import START_OPTS, STOP_OPTS
+from trepan.lib.default import DEBUGGER_SETTINGS, START_OPTS, STOP_OPTS
+from trepan.lib.eval import compile_expression
+from trepan.lib.monitor import HAVE_MONITORING, MonitoringBackend
 from trepan.lib.stack import FrameInfo, count_frames
 from trepan.misc import option_set
 from trepan.processor.cmdproc import CommandProcessor
@@ -57,7 +60,71 @@ DEFAULT_INIT_OPTS: InitOptions = {
 }
 
 
+# The settings that trace_dispatch() consults on every event, copied
+# out of the debugger settings by TrepanCore.update_dispatch_plan().
+#   events:   the events that can stop
+#   trace:    True if events are printed as they happen
+#   printset: the events that get printed when trace is True
+#   stop_all: True if other threads wait while a thread is stopped
+DispatchPlan = namedtuple("DispatchPlan", "events trace printset stop_all")
+
+
+# Values that stepping state has in a thread that hasn't set its own.
+# Such a thread only stops at breakpoints.
+THREAD_STATE_DEFAULTS: Dict[str, Any] = {
+    "current_bp": None,
+    "different_line": True,
+    "event": None,
+    "last_filename": None,
+    "last_frame": None,
+    "last_level": 10000,
+    "last_lineno": None,
+    "last_offset": None,
+    "step_events": None,
+    "step_ignore": -1,
+    "stop_level": None,
+    "stop_on_finish": False,
+    "stop_reason": "",
+}
+
+
+class ThreadState(threading.local):
+    """Stepping state of TrepanCore that is kept separately for each
+    thread, so that events in one thread don't disturb "step", "next"
+    or "finish" in another."""
+
+    def __init__(self):
+        self.__dict__.update(THREAD_STATE_DEFAULTS)
+
+
+def _thread_state_property(name: str) -> property:
+    """Make TrepanCore attribute `name` refer to the value of `name` in
+    the thread state of the calling thread."""
+
+    def getter(core):
+        return getattr(core.thread_state, name)
+
+    def setter(core, value):
+        setattr(core.thread_state, name, value)
+
+    return property(getter, setter, doc=f"{name} of the calling thread")
+
+
 class TrepanCore:
+    current_bp = _thread_state_property("current_bp")
+    different_line = _thread_state_property("different_line")
+    event = _thread_state_property("event")
+    last_filename = _thread_state_property("last_filename")
+    last_frame = _thread_state_property("last_frame")
+    last_level = _thread_state_property("last_level")
+    last_lineno = _thread_state_property("last_lineno")
+    last_offset = _thread_state_property("last_offset")
+    step_events = _thread_state_property("step_events")
+    step_ignore = _thread_state_property("step_ignore")
+    stop_level = _thread_state_property("stop_level")
+    stop_on_finish = _thread_state_property("stop_on_finish")
+    stop_reason = _thread_state_property("stop_reason")
+
     def __init__(self, debugger, opts: InitOptions = DEFAULT_INIT_OPTS):
         """Create a debugger object. But depending on the value of
         key 'start' inside hash `opts', we may or may not initially
@@ -69,17 +136,59 @@ class TrepanCore:
         def get_option(key: str) -> Any:
             return option_set(opts, key, DEFAULT_INIT_OPTS)
 
+        # Stepping state, like step_ignore and stop_level below, is
+        # per thread. The thread that creates us starts out with the
+        # values given in `opts`; other threads start out with
+        # THREAD_STATE_DEFAULTS.
+        self.thread_state = ThreadState()
+
         self.bpmgr = BreakpointManager()
         self.current_bp = None
-        self.current_thread = None
+
+        # The thread that last stopped in the debugger.
+        self.current_thread = threading.current_thread()
         self.debugger = debugger
 
-        # Threading lock ensures that we don't have other traced threads
-        # running when we enter the debugger. Later we may want to have
-        # a switch to control.
+        # Threading lock ensures that only one thread at a time is
+        # in the debugger's command processor.
         self.debugger_lock = threading.Lock()
 
+        # This is cleared while a thread is stopped in the debugger.
+        # Under the "stop-all" thread policy, other threads wait on it
+        # at their next event.
+        self.resumed = threading.Event()
+        self.resumed.set()
+
+        # True if start() arranged for threads started afterwards to
+        # be traced.
+        self.traced_threads = False
+
+        # Thread id of a thread that should stop at its next event. This
+        # is set from another thread, by request_stop().
+        self.stop_request: Optional[int] = None
+
+        # What trace_dispatch() needs from the debugger settings. This
+        # is an immutable value that gets replaced, so it can be read
+        # from any thread without a lock. See update_dispatch_plan().
+        self.dispatch_plan = DispatchPlan(None, False, frozenset(), True)
+        self.update_dispatch_plan()
+
+        # filename_cache maps a file name to its absolute, real path.
+        # canonic_cache maps a file name to the result of canonic(),
+        # which also takes into account file name remapping. code2canonic
+        # maps the id of a code object to the code object and the canonic
+        # name of its co_filename. The last two get cleared when file
+        # remappings change; see clear_canonic_cache().
         self.filename_cache = {}
+        self.canonic_cache: Dict[str, str] = {}
+        self.code2canonic: Dict[int, Tuple[CodeType, str]] = {}
+        self.canonic_hits = 0
+        self.canonic_misses = 0
+
+        # When not None, we get events from sys.monitoring rather than
+        # from sys.settrace() via the "tracer" package.
+        # See start() and trepan.lib.monitor.
+        self.monitor: Optional[MonitoringBackend] = None
 
         # Initially the event parameter of the event hook.
         # We can however modify it, such as for breakpoints
@@ -110,7 +219,6 @@ class TrepanCore:
         # We also will cache the last frame and thread number encountered
         # so we don't have to compute the current level all the time.
         self.last_frame = None
-        self.current_thread = threading.current_thread()
         self.last_level = 10000
         self.last_thread = None
         self.stop_level = None
@@ -136,8 +244,16 @@ class TrepanCore:
         # debugging.
         self.trace_hook_suspend = False
 
+        # Setting this also compiles it into self.until_condition_code.
         self.until_condition = get_option("until_condition")
 
+        # When not None, we are "continue"ing with breakpoints set and
+        # only frames whose code can hit a breakpoint are traced. This is
+        # the global trace function that was in effect before, which is
+        # the one that runs our trace_dispatch() hook.
+        # See trace_only_breakpoints() and trace_all().
+        self.full_trace_func: Optional[Callable] = None
+
         return
 
     def add_ignore(self, *frames_or_fns) -> Optional[Any]:
@@ -164,6 +280,11 @@ class TrepanCore:
 
         if filename == "<" + filename[1:-1] + ">":
             return filename
+        canonic = self.canonic_cache.get(filename)
+        if canonic is not None:
+            self.canonic_hits += 1
+            return canonic
+        self.canonic_misses += 1
         canonic = self.filename_cache.get(filename)
         if not canonic:
             lead_dir = filename.split(os.sep)[0]
@@ -188,6 +309,23 @@ class TrepanCore:
             # removing logging can null out pyficache
             canonic = pyficache.unmap_file(canonic)
 
+        self.canonic_cache[filename] = canonic
+        return canonic
+
+    def canonic_code_filename(self, code: CodeType) -> str:
+        """Return the canonic() value of the co_filename of `code`.
+        This is called on events, so the result is also cached by code
+        object to save a string hash and dictionary lookup."""
+        entry = self.code2canonic.get(id(code))
+        if entry is not None and entry[0] is code:
+            self.canonic_hits += 1
+            return entry[1]
+        canonic = self.canonic(code.co_filename)
+        if len(self.code2canonic) >= 10000:
+            # Code objects that are created on the fly, e.g. via exec(),
+            # shouldn't accumulate here.
+            self.code2canonic.clear()
+        self.code2canonic[id(code)] = (code, canonic)
         return canonic
 
     def canonic_filename(self, frame: Optional[FrameType]) -> str:
@@ -200,7 +338,27 @@ class TrepanCore:
         if "<string>" == filename:
             if new_filename := pyficache.main.code2tempfile.get(frame.f_code):
                 filename = new_filename
-        return self.canonic(filename)
+            return self.canonic(filename)
+        return self.canonic_code_filename(frame.f_code)
+
+    def clear_canonic_cache(self):
+        """Forget canonic() results, and the breakpoints by file name
+        found from them. This must be called when file name remapping
+        changes, since canonic() includes remapping."""
+        self.canonic_cache.clear()
+        self.code2canonic.clear()
+        self.bpmgr.clear_file_lines_cache()
+        return
+
+    def canonic_cache_stats(self) -> Dict[str, int]:
+        """Return the sizes of the canonic() caches and their hit and
+        miss counts."""
+        return {
+            "files": len(self.canonic_cache),
+            "code objects": len(self.code2canonic),
+            "hits": self.canonic_hits,
+            "misses": self.canonic_misses,
+        }
 
     def filename(self, filename=None) -> Optional[str]:
         """Return filename or the basename of that depending on the
@@ -219,8 +377,42 @@ class TrepanCore:
     def is_running(self):
         return "Running" == self.execution_status
 
+    def update_dispatch_plan(self):
+        """Recompute self.dispatch_plan from the debugger settings.
+
+        This is done when we start and whenever the command processor
+        resumes execution. Code that changes debugger settings some
+        other way, while the program is running, should call this
+        afterwards."""
+        settings = self.debugger.settings if self.debugger else DEBUGGER_SETTINGS
+        events = settings.get("events")
+        self.dispatch_plan = DispatchPlan(
+            events=None if events is None else frozenset(events),
+            trace=bool(settings.get("trace")),
+            printset=frozenset(settings.get("printset") or ()),
+            stop_all=settings.get("thread_policy", "stop-all") == "stop-all",
+        )
+        return
+
+    @property
+    def until_condition(self) -> Optional[str]:
+        """A Python expression which, when set, must be true before we
+        stop. It is compiled once when set, rather than on each event."""
+        return self._until_condition
+
+    @until_condition.setter
+    def until_condition(self, condition: Optional[str]):
+        if condition:
+            self.until_condition_code = compile_expression(condition, "<until>")
+        else:
+            self.until_condition_code = None
+            condition = None
+        self._until_condition = condition
+
     def is_started(self):
         """Return True if debugging is in progress."""
+        if self.monitor is not None:
+            return self.monitor.is_active and not self.trace_hook_suspend
         return (
             tracer.is_started()
             and not self.trace_hook_suspend
@@ -249,6 +441,19 @@ class TrepanCore:
             def get_option(key: str) -> Any:
                 return option_set(opts, key, START_OPTS)
 
+            if get_option("backend") == "monitoring" and HAVE_MONITORING:
+                if self.monitor is None:
+                    self.monitor = MonitoringBackend(self)
+                try:
+                    self.monitor.start()
+                except ValueError:
+                    # Some other tool has sys.monitoring's debugger
+                    # tool id. Fall back to using sys.settrace().
+                    self.monitor = None
+                else:
+                    self.execution_status = "Running"
+                    return
+
             add_hook_opts = get_option("add_hook_opts")
 
             # Has tracer been started?
@@ -258,12 +463,17 @@ class TrepanCore:
                     tracer_start_opts.update(opts.get("tracer_start", {}))
                 tracer_start_opts["trace_func"] = self.trace_dispatch
                 tracer_start_opts["add_hook_opts"] = add_hook_opts
+                # Have tracer call threading.settrace() so that threads
+                # started from now on get traced too.
+                self.traced_threads = bool(get_option("trace_threads"))
+                tracer_start_opts["include_threads"] = self.traced_threads
                 tracer.start(tracer_start_opts)
             elif not tracer.find_hook(self.trace_dispatch):
                 tracer.add_hook(self.trace_dispatch, add_hook_opts)
                 pass
             self.execution_status = "Running"
         finally:
+            self.update_dispatch_plan()
             self.trace_hook_suspend = False
         return
 
@@ -276,6 +486,13 @@ class TrepanCore:
             def get_option(key: str) -> Any:
                 return option_set(options, key, STOP_OPTS)
 
+            if self.monitor is not None:
+                self.monitor.stop()
+                self.monitor = None
+                return
+
+            self.trace_all(None)
+
             args = [self.trace_dispatch]
             remove = get_option("remove")
             if remove:
@@ -287,20 +504,126 @@ class TrepanCore:
                 except LookupError:
                     pass
                 pass
+            if self.traced_threads and not tracer.is_started():
+                threading.settrace(None)
+                self.traced_threads = False
         finally:
             self.trace_hook_suspend = False
         return
 
+    def trace_only_breakpoints(self, frame: Optional[FrameType]) -> bool:
+        """Used when "continue"ing with breakpoints set. Arrange for
+        only frames whose code can hit a breakpoint to get traced,
+        starting with `frame` and the frames below it. All other frames
+        run untraced. The global trace function becomes
+        _breakpoint_call_dispatch() which sees just "call" events.
+
+        When threads are traced, the frames of the other threads are
+        handled the same way, and so are threads started from now on.
+        Before Python 3.12 there is no way to change the global trace
+        function of a thread that is already running other than from
+        inside it, so those threads still give new calls to the full
+        trace function.
+
+        Return True if we were able to do this. We can't when there are
+        other trace hooks besides ours.
+
+        See also trace_all() which undoes this.
+        """
+        if self.full_trace_func is not None:
+            if sys.gettrace() == self._breakpoint_call_dispatch:
+                return True
+            # Our trace hook was removed, and maybe added again, since
+            # we were here last.
+            self.full_trace_func = None
+        if not tracer.is_started() or tracer.size() != 1:
+            return False
+        full_trace_func = sys.gettrace()
+        if full_trace_func is None:
+            return False
+        self.full_trace_func = full_trace_func
+        for frame in self._thread_frames(frame):
+            if self._code_may_break(frame):
+                frame.f_trace = full_trace_func
+            else:
+                frame.f_trace = None
+        self._settrace(self._breakpoint_call_dispatch)
+        return True
+
+    def trace_all(self, frame: Optional[FrameType]):
+        """Undo trace_only_breakpoints(): trace all new frames again,
+        and `frame` and the frames below it, along with the frames of
+        other threads when threads are traced."""
+        full_trace_func = self.full_trace_func
+        if full_trace_func is None:
+            return
+        self.full_trace_func = None
+        self._settrace(full_trace_func)
+        for frame in self._thread_frames(frame):
+            frame.f_trace = full_trace_func
+        return
+
+    def _settrace(self, trace_func: Callable):
+        """Set the global trace function of this thread to `trace_func`,
+        and when threads are traced, that of threads started later and,
+        where Python allows it, that of threads already running."""
+        if self.traced_threads:
+            if hasattr(threading, "settrace_all_threads"):
+                threading.settrace_all_threads(trace_func)
+                return
+            threading.settrace(trace_func)
+        sys.settrace(trace_func)
+        return
+
+    def _thread_frames(self, frame: Optional[FrameType]):
+        """Yield `frame` and the frames below it, followed by the frames
+        of other threads if threads are traced."""
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        if self.traced_threads:
+            this_thread = threading.get_ident()
+            for thread_id, frame in list(sys._current_frames().items()):
+                if thread_id == this_thread:
+                    continue
+                while frame is not None:
+                    yield frame
+                    frame = frame.f_back
+        return
+
+    def _breakpoint_call_dispatch(self, frame: FrameType, event: str, arg):
+        """The global trace function set by trace_only_breakpoints()."""
+        if event == "call" and self._code_may_break(frame):
+            return self.full_trace_func(frame, event, arg)
+        return None
+
+    def _code_may_break(self, frame: FrameType) -> bool:
+        bpmgr = self.bpmgr
+        return bpmgr.code_may_break(
+            frame.f_code, self.canonic_filename(frame) if bpmgr.file2lines else None
+        )
+
+    def _line_may_break(self, frame: FrameType) -> bool:
+        """Return True if there is a line breakpoint at the line of
+        `frame`. This is a quick check using the breakpoint index;
+        is_break_here() does the full check."""
+        bpmgr = self.bpmgr
+        if bpmgr.file2lines:
+            lines = bpmgr.lines_for_code(frame.f_code, self.canonic_filename(frame))
+        else:
+            lines = bpmgr.code_breaks(frame.f_code)[0]
+        return bool(lines) and frame.f_lineno in lines
+
     def is_break_here(self, frame):
-        filename = self.canonic(frame.f_code.co_filename)
+        bpmgr = self.bpmgr
         code_object = frame.f_code
-        brkpts_in_code = self.bpmgr.code2position_brkpts.get(code_object)
-
-        if brkpts_in_code is None:
+        lineno = frame.f_lineno
+        if not self._line_may_break(frame):
             return False
 
-        if (filename, frame.f_lineno) in list(self.bpmgr.bplist.keys()):
-            (bp, clear_bp) = self.bpmgr.find_bp(filename, frame.f_lineno, frame)
+        filename = self.canonic_code_filename(code_object)
+        if (filename, lineno) in bpmgr.bplist:
+            (bp, clear_bp) = bpmgr.find_bp(filename, lineno, frame)
             if bp:
                 if bp.offset is not None and bp.offset != frame.f_lasti:
                     # print(f"XXXX core: have breakpoint, but offsets mismatch {bp.offset} vs {frame.f_lasti}")
@@ -322,6 +645,8 @@ class TrepanCore:
 
     def is_call_break_here(self, frame):
         code_object = frame.f_code
+        if not self.bpmgr.code_breaks(code_object)[1]:
+            return False
         brkpts_in_code = self.bpmgr.codecall_brkpts.get(code_object)
 
         if brkpts_in_code is None:
@@ -344,7 +669,7 @@ class TrepanCore:
         # Ignore count applies only to those bpt hits where the
         # condition evaluates to true.
         try:
-            val = eval(self.until_condition, frame.f_globals, frame.f_locals)
+            val = eval(self.until_condition_code, frame.f_globals, frame.f_locals)
         except Exception:
             # if eval fails, most conservative thing is to
             # stop on breakpoint regardless of ignore count.
@@ -411,6 +736,16 @@ class TrepanCore:
         # print("is_stop_here: no reason set to stop")
         return False
 
+    def _is_continuing(self) -> bool:
+        """Return True if the only way we can stop is at a breakpoint."""
+        return (
+            self.step_ignore is not None
+            and self.step_ignore < 0
+            and self.stop_level is None
+            and not self.until_condition
+            and not self.dispatch_plan.trace
+        )
+
     def _is_step_next_stop(self, event):
         if self.step_events and event not in self.step_events:
             return False
@@ -421,6 +756,26 @@ class TrepanCore:
             pass
         return False
 
+    def request_stop(self, thread_id: int):
+        """Arrange for the thread with id `thread_id` to stop at its next
+        event. Unlike set_next() and the other stepping methods, this
+        can be called from a different thread."""
+        self.stop_request = thread_id
+        if self.monitor is not None:
+            self.monitor.rearm()
+        return
+
+    def _take_stop_request(self):
+        """Called in the thread that request_stop() was for: turn the
+        request into stepping in this thread."""
+        self.stop_request = None
+        self.step_events = None
+        self.stop_level = None
+        self.stop_on_finish = False
+        self.different_line = False
+        self.step_ignore = 0
+        return
+
     def set_next(self, frame, step_ignore=0, step_events=None):
         """Sets to stop on the next event that happens in frame `frame`.
         an raises an exception return to a frame below `frame`
@@ -449,32 +804,35 @@ class TrepanCore:
         # that we don't have any breakpoint set, since we have to check
         # for breakpoints in a kind of slow way of checking all events.
 
+        if (
+            self.stop_request is not None
+            and self.stop_request == threading.get_ident()
+        ):
+            self._take_stop_request()
+
         remove_frame_on_return = False
         is_call_breakpoint = False
-        # FIXME:
-        # instead of self.bpmgr.bplist == 0, we should be counting on
-        # per breakpoints in code object.
         if event == "call":
-            if (
-                self.last_frame != frame
-                and len(self.bpmgr.bplist) == 0
-                and self.stop_level is not None
-                and self.stop_level < count_frames(frame)
-                and self.current_thread == threading.current_thread()
-            ):
-                # We are "finish"ing or "next"ing and should not be tracing into this call
-                # or any other calls from this. Return None to not trace further.
-
-                # print(
-                #     """XXX+  trace_dispatch: "finish"ing or "next"ing from call event"""
-                # )
-
-                frame.f_trace = None
-                return None
-
-            if frame not in FrameInfo:
-                count_frames(frame)
-
+            if not self._code_may_break(frame):
+                if (
+                    self.last_frame != frame
+                    and self.stop_level is not None
+                    and self.stop_level < count_frames(frame)
+                ) or self._is_continuing():
+                    # We are "finish"ing, "next"ing or "continue"ing and
+                    # no breakpoint can be hit in this code. So we
+                    # should not be tracing into this call. Return None
+                    # to not trace further.
+
+                    # print(
+                    #     """XXX+  trace_dispatch: not tracing call event"""
+                    # )
+
+                    frame.f_trace = None
+                    return None
+
+            # is_stop_here() finds the depth of the frame when it is
+            # needed, which is only when "next"ing or "finish"ing.
             if not self.is_stop_here(frame, event):
                 # We might have a stop here as a result of a breakpoint set inside
                 # this function. In this case we need to ignore this stop, but
@@ -501,20 +859,20 @@ class TrepanCore:
         if self.ignore_filter and self.ignore_filter.is_excluded(frame):
             # print("trace_dispatch: ignore_filter", self.ignore_filter, frame, frame.f_lineno, event, arg) # for debugging
             if remove_frame_on_return:
-                del FrameInfo[frame]
+                FrameInfo.discard(frame)
             return self
 
         if self.trace_hook_suspend:
             # print("XXX trace_dispatch: hook suspended")
             if remove_frame_on_return:
-                del FrameInfo[frame]
+                FrameInfo.discard(frame)
             return None
 
         # print("XXX+ trace dispatch", frame, frame.f_lineno, event, arg) # for debugging
 
-        if self.debugger.settings["trace"]:
-            print_event_set = self.debugger.settings["printset"]
-            if self.event in print_event_set:
+        plan = self.dispatch_plan
+        if plan.trace:
+            if self.event in plan.printset:
                 self.trace_processor.event_processor(frame, self.event, arg)
                 pass
             pass
@@ -523,20 +881,22 @@ class TrepanCore:
             if not self.matches_condition(frame):
                 # print(f"XXX trace until condition not met for {frame}") # for debugging
                 if remove_frame_on_return:
-                    del FrameInfo[frame]
+                    FrameInfo.discard(frame)
                 return self
             pass
 
-        # For now we only allow one instance in a process
-        # In Python 2.6 and beyond one can use "with threading.Lock():"
-        try:
-            self.debugger_lock.acquire()
+        if (
+            plan.stop_all
+            and not self.resumed.is_set()
+            and self.current_thread is not threading.current_thread()
+        ):
+            # Another thread is stopped in the debugger. Wait for it
+            # to resume.
+            self.resumed.wait()
 
-            trace_event_set = self.debugger.settings["events"]
-            if trace_event_set is None or self.event not in trace_event_set:
-                # print(f"trace_dispatch: self.event not in {trace_event_set}")
-                if remove_frame_on_return:
-                    del FrameInfo[frame]
+        try:
+            if plan.events is None or self.event not in plan.events:
+                # print(f"trace_dispatch: self.event not in {plan.events}")
                 return self
 
             # I think we *have* to run is_stop_here() before
@@ -545,24 +905,32 @@ class TrepanCore:
             # user's standpoint to test for breaks before steps. In
             # this case we will need to factor out the counting
             # updates.
-            if (
-                self.is_stop_here(frame, event)
-                or self.is_break_here(frame)
-                or is_call_breakpoint
-            ):
-                # Run the event processor
-                return self.processor.event_processor(frame, self.event, arg)
-            # else:
-            #     print("XXX no stop or break here")
-            return self
+            #
+            # Stepping state is per thread, so is_stop_here() doesn't
+            # need the lock. Breakpoints are shared, so the lock is
+            # taken to check them, but only on lines that have one.
+            is_stop = self.is_stop_here(frame, event) or is_call_breakpoint
+            if not is_stop and not self._line_may_break(frame):
+                return self
+
+            # Only one thread at a time can be in the command processor.
+            with self.debugger_lock:
+                if is_stop or self.is_break_here(frame):
+                    self.current_thread = threading.current_thread()
+                    was_resumed = self.resumed.is_set()
+                    self.resumed.clear()
+                    try:
+                        # Run the event processor
+                        return self.processor.event_processor(frame, self.event, arg)
+                    finally:
+                        if was_resumed:
+                            self.resumed.set()
+                # else:
+                #     print("XXX no stop or break here")
+                return self
         finally:
-            try:
-                self.debugger_lock.release()
-            except Exception:
-                pass
-            pass
             if remove_frame_on_return:
-                del FrameInfo[frame]
+                FrameInfo.discard(frame)
 
     pass
 
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2008-2009, 2013, 2015, 2017, 2020-2021, 2023-2025
+#   Copyright (C) 2008-2009, 2013, 2015, 2017, 2020-2021, 2023-2026
 #   Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -155,6 +155,13 @@ DEBUGGER_SETTINGS = {
     # If value is None, use Python's defaults
     "tempdir": None,
 
+    # What happens to other threads when a thread stops in the debugger?
+    #  'stop-all'       : they stop at their next traced event until the
+    #                     debugger resumes
+    #  'stop-this-only' : they keep running, and only stop at their own
+    #                     breakpoints
+    "thread_policy": "stop-all",
+
     # print trace output?
     "trace": False,
 
@@ -165,8 +172,15 @@ DEBUGGER_SETTINGS = {
 
 CLIENT_SOCKET_OPTS = {
     "HOST": "127.0.0.1",
-    "PORT": 1027,
-}  # Arbitrary non-privileged port
+    "PORT": 1027,  # Arbitrary non-privileged port
+    "framing": 2,  # Latest message framing version to offer; see tcpfns
+    "session": None,  # Session to attach to when connecting to a trepan hub
+    "compress": False,  # Ask for a zlib-compressed connection?
+    # Seconds between keepalive messages; 0 means don't send them, and
+    # don't try to resume the session if the connection is lost.
+    "keepalive": 10,
+    "reconnect": 60,  # Seconds to keep trying to reconnect
+}
 
 
 SERVER_SOCKET_OPTS = {
@@ -175,6 +189,34 @@ SERVER_SOCKET_OPTS = {
     "reuse": "posix" == os.name,  # Allow port to be reused on close?
     "skew": +0,           # additional increment on socket tries
     "search_limit": 100,  # max number of ports to try
+    "framing": 2,         # Latest message framing version to accept
+    # Seconds to wait after a connect for a client to offer a framing
+    # version. Older clients don't, and get version 1.
+    "negotiate_timeout": 0.5,
+    "compress": False,    # Agree to compress when a client asks?
+    # Let clients that send keepalives resume a session when their
+    # connection is lost?
+    "resume": True,
+    # Seconds without hearing from such a client before we decide its
+    # connection is dead, and to then wait for it to reconnect.
+    "client_timeout": 30,
+    "resume_timeout": 300,
+    "replay_size": 65536, # Characters of output kept to send again
+}
+
+UNIX_SOCKET_OPTS = {
+    "path": None,         # Socket path; None is the one for our pid
+    "pid": None,          # Process id to connect to, when no path is given
+    "check_peer": True,   # Accept only connections from our user, or root
+    "framing": 2,         # Latest message framing version to accept
+    "negotiate_timeout": 0.5,
+    "compress": False,    # Ask for, or agree to, compression?
+    "keepalive": 10,      # See CLIENT_SOCKET_OPTS and SERVER_SOCKET_OPTS
+    "reconnect": 60,
+    "resume": True,
+    "client_timeout": 30,
+    "resume_timeout": 300,
+    "replay_size": 65536,
 }
 # fmt: on
 
@@ -182,9 +224,17 @@ SERVER_SOCKET_OPTS = {
 START_OPTS = {
     "add_hook_opts": tracer.DEFAULT_ADD_HOOK_OPTS,
     "backlevel": 0,  # trace caller and frames created from that
+    # Where do events come from? "settrace" uses the "tracer" package
+    # which is built on sys.settrace(). "monitoring" uses sys.monitoring
+    # which needs Python 3.12 or later; it falls back to "settrace" when
+    # sys.monitoring is not available.
+    "backend": "settrace",
     "event_set": tracer.ALL_EVENTS,
     "force": False,  # Force a new event handler?
     "start": False,
+    # Trace threads that are started after us? This is for the
+    # "settrace" backend; sys.monitoring covers all threads.
+    "trace_threads": True,
 }
 
 # Default settings. on the Debugger#stop() method call.
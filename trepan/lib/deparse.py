@@ -1,19 +1,193 @@
 # -*- coding: utf-8 -*-
-"""Deparsing Routines"""
+"""Deparsing Routines
 
+Deparsed source for a code object is kept on disk, in a directory under
+the debugger's temporary directory, so that it is there for later
+debug sessions too. Entries are keyed by a hash of the code object's
+bytecode, constants, names, file name and line numbers. See
+code_key().
+
+Deparsing a whole program can take a while, so deparse_in_background()
+hands the code objects in it to a pool of processes. Until a code
+object is done, is_pending() is True for it and deparse_and_cache()
+doesn't wait for it; callers show disassembly instead.
+"""
+
+import atexit
+import json
+import marshal
+import os
+import os.path as osp
+import stat
 import sys
 import tempfile
+from concurrent.futures import Future
 from hashlib import sha1
 from io import StringIO
-from typing import Callable
+from types import CodeType
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pyficache
 from xdis import PYTHON_VERSION_TRIPLE
 
+# Background deparses not yet finished, by code_key().
+pending: Dict[str, Future] = {}
+_executor = None
+
+
+def _const_bytes(const) -> bytes:
+    """Return bytes for constant `const` that are the same in every
+    process. The repr() of a frozenset depends on the order its items
+    hash to, and string hashes change from one process to the next, so
+    items of sets are taken in sorted order."""
+    if isinstance(const, CodeType):
+        return code_key(const).encode("ascii")
+    if isinstance(const, (frozenset, set)):
+        items = sorted(_const_bytes(item) for item in const)
+        return b"%s{%s}" % (type(const).__name__.encode("ascii"), b",".join(items))
+    if isinstance(const, tuple):
+        return b"(%s)" % b",".join(_const_bytes(item) for item in const)
+    return repr(const).encode("utf-8", "replace")
+
+
+def code_key(co: CodeType) -> str:
+    """Return a hash of what in `co` determines its deparsed source
+    and the line map that goes with it: its bytecode, constants,
+    including nested code objects, names, file name and line
+    numbers. The hash is the same in every process."""
+    h = sha1(co.co_code)
+    for const in co.co_consts:
+        h.update(_const_bytes(const))
+        h.update(b"\0")
+    h.update(repr((co.co_name, co.co_names, co.co_varnames)).encode("utf-8"))
+    h.update(repr((co.co_filename, co.co_firstlineno)).encode("utf-8"))
+    h.update(getattr(co, "co_linetable", None) or co.co_lnotab)
+    return h.hexdigest()
+
+
+def code_objects(co: CodeType) -> List[CodeType]:
+    """Return `co` and the code objects nested in it."""
+    result = [co]
+    for const in co.co_consts:
+        if isinstance(const, CodeType):
+            result.extend(code_objects(const))
+    return result
+
+
+def deparse_cache_dir(tempdir: Optional[str] = None) -> str:
+    """Return the directory that deparsed source is kept in."""
+    if tempdir is None:
+        tempdir = tempfile.gettempdir()
+    return osp.join(
+        tempdir,
+        "trepan3k-deparse-%s" % os.getuid(),
+        sys.implementation.cache_tag or "python",
+    )
+
+
+def is_private_dir(path: str) -> bool:
+    """Return True if `path` is a directory, not a symbolic link, that
+    we own and that only we can read or write."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) == 0o700
+    )
+
+
+def private_cache_dir(tempdir: Optional[str] = None, create=False) -> Optional[str]:
+    """Return deparse_cache_dir(), or None if the directory that it is
+    in isn't private to us.
+
+    That directory is in the shared temporary directory under a name
+    that anyone can guess. Another user could create it first and put
+    their own "deparsed source" in it, which we would then show, so
+    we don't use a directory that someone else could have written to.
+    If `create` is True, missing directories are created."""
+    cache_dir = deparse_cache_dir(tempdir)
+    user_dir = osp.dirname(cache_dir)
+    if create:
+        try:
+            os.mkdir(user_dir, 0o700)
+        except FileExistsError:
+            pass
+    if not is_private_dir(user_dir):
+        return None
+    if create:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    return cache_dir
+
+
+def read_deparse_cache(
+    key: str, tempdir: Optional[str] = None
+) -> Optional[Tuple[str, list]]:
+    """Return the file with the deparsed source for `key`, and its line
+    map, if we have them."""
+    cache_dir = private_cache_dir(tempdir)
+    if cache_dir is None:
+        return None
+    path = osp.join(cache_dir, key)
+    try:
+        with open(path + ".json") as fp:
+            linemap = [tuple(pair) for pair in json.load(fp)]
+    except (OSError, ValueError):
+        return None
+    if not osp.exists(path + ".py"):
+        return None
+    return path + ".py", linemap
+
+
+def write_deparse_cache(
+    key: str, text: str, linemap: list, tempdir: Optional[str] = None
+) -> str:
+    """Save deparsed source `text`, with its line map, under `key`, and
+    return the name of the file that it is in. Files are written
+    whole and then renamed, so a reader never sees part of one.
+
+    PermissionError is raised if the cache directory is not private to
+    us; see private_cache_dir()."""
+    cache_dir = private_cache_dir(tempdir, create=True)
+    if cache_dir is None:
+        raise PermissionError(
+            "%s is not a directory private to us; not using it"
+            % osp.dirname(deparse_cache_dir(tempdir))
+        )
+    path = osp.join(cache_dir, key)
+    for suffix, data in (
+        (".py", text + f"\n\n# {linemap}"),
+        (".json", json.dumps(linemap)),
+    ):
+        fd = tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=cache_dir, delete=False
+        )
+        with fd:
+            fd.write(data)
+        os.replace(fd.name, path + suffix)
+    return path + ".py"
+
+
+def is_pending(co: CodeType) -> bool:
+    """Return True if `co` is being deparsed in the background."""
+    future = pending.get(code_key(co))
+    if future is None:
+        return False
+    if future.done():
+        del pending[code_key(co)]
+        return False
+    return True
+
+
 if PYTHON_VERSION_TRIPLE >= (3, 9):
     def deparse_and_cache(_co, _errmsg_fn, _tempdir=None):
         print("Derparsing is not available for Python >= 3.9")
 
+    def deparse_in_background(_co, _tempdir=None) -> int:
+        return 0
+
 else:
     if (3, 7) <= PYTHON_VERSION_TRIPLE:
         try:
@@ -30,66 +204,104 @@ else:
 
     deparse_cache = {}
 
+    def deparse_text(co) -> Tuple[str, list]:
+        """Deparse `co`, and return its source and line map."""
+        out = StringIO()
+        deparsed = code_deparse_with_map(co, out)
+        linemap = [
+            (line_no, deparsed.source_linemap[line_no])
+            for line_no in sorted(deparsed.source_linemap.keys())
+        ]
+        return out.getvalue(), linemap
+
+    def _deparse_to_cache(marshalled: bytes, tempdir: Optional[str]) -> str:
+        """Run in a worker process: deparse a marshalled code object
+        into the on-disk cache."""
+        co = marshal.loads(marshalled)
+        key = code_key(co)
+        if read_deparse_cache(key, tempdir) is None:
+            text, linemap = deparse_text(co)
+            write_deparse_cache(key, text, linemap, tempdir)
+        return key
+
+    def deparse_in_background(co, tempdir=None) -> int:
+        """Start deparsing `co` and the code objects in it in worker
+        processes, skipping those already deparsed. Return the number
+        started."""
+        global _executor
+        from concurrent.futures import ProcessPoolExecutor
+
+        count = 0
+        for code in code_objects(co):
+            key = code_key(code)
+            if key in pending or read_deparse_cache(key, tempdir) is not None:
+                continue
+            if _executor is None:
+                _executor = ProcessPoolExecutor()
+                atexit.register(_executor.shutdown, wait=False)
+            pending[key] = _executor.submit(
+                _deparse_to_cache, marshal.dumps(code), tempdir
+            )
+            count += 1
+        return count
+
     def deparse_and_cache(co, errmsg_fn, tempdir=None):
         # co = proc_obj.curframe.f_code
-        out = StringIO()
-        deparsed = deparse_cache.get(co, None)
-        if not deparsed or not hasattr(deparsed, "source_linemap"):
+        key = code_key(co)
+        cached = read_deparse_cache(key, tempdir)
+        if cached is None:
+            if is_pending(co):
+                errmsg_fn(f"{co.co_name} is still being deparsed")
+                return None, None
             try:
-                deparsed = code_deparse_with_map(co, out)
+                text, linemap = deparse_text(co)
             except Exception:
                 errmsg_fn(str(sys.exc_info()[0]))
                 errmsg_fn(f"error in deparsing code: {co.co_filename}")
                 return None, None
-
-            deparse_cache[co] = deparsed
-
-        text = out.getvalue()
-        linemap = [
-            (line_no, deparsed.source_linemap[line_no])
-            for line_no in sorted(deparsed.source_linemap.keys())
-        ]
+            try:
+                remapped_file = write_deparse_cache(key, text, linemap, tempdir)
+            except OSError as e:
+                errmsg_fn(f"can't save deparsed source: {e}")
+                return None, None
+        else:
+            remapped_file, linemap = cached
 
         # FIXME: DRY code with version in cmdproc.py print_location
 
-        name_for_code = sha1(co.co_code).hexdigest()[:6]
-        prefix = "deparsed-"
-        fd = tempfile.NamedTemporaryFile(
-            suffix=".py", prefix=prefix, dir=tempdir, delete=False
-        )
-        with fd:
-            fd.write(text.encode("utf-8"))
-            map_line = f"\n\n# {linemap}"
-            fd.write(map_line.encode("utf-8"))
-            remapped_file = fd.name
-        fd.close()
+        name_for_code = key[:6]
         # FIXME remap filename to a short name.
         pyficache.remap_file_lines(name_for_code, remapped_file, linemap)
         return remapped_file, name_for_code
 
     def deparse_offset(co, name: str, last_i: int, errmsg_fn: Callable) -> tuple:
+        """Return the fragment deparse of `co` and the node for
+        instruction offset `last_i` in it. (None, None) is returned
+        when `co` is still being deparsed in the background, since
+        waiting for it could take seconds, or when it can't be
+        deparsed."""
+        if is_pending(co):
+            if errmsg_fn:
+                errmsg_fn(f"{co.co_name} is still being deparsed")
+            return None, None
         node_info = None
         deparsed = deparse_cache.get(co, None)
         if not deparsed or not hasattr(deparsed, "offsets"):
             out = StringIO()
             try:
-                # FIXME: cache co
                 deparsed = code_deparse(co, out)
             except Exception:
-                print(sys.exc_info()[1])
                 if errmsg_fn:
-                    errmsg_fn(sys.exc_info()[1])
+                    errmsg_fn(str(sys.exc_info()[1]))
                     errmsg_fn("error in deparsing code")
+                return None, None
             deparse_cache[co] = deparsed
         try:
             node_info = deparsed_find((name, last_i), deparsed, co)
         except Exception:
             if errmsg_fn:
-                errmsg_fn(sys.exc_info()[1])
+                errmsg_fn(str(sys.exc_info()[1]))
                 errmsg_fn("error in deparsing code at offset %d" % last_i)
-
-        if not node_info:
-            node_info = deparsed_find((name, last_i), deparsed, co)
         return deparsed, node_info
 
 
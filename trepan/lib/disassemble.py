@@ -19,20 +19,21 @@ import bisect
 import inspect
 import sys
 import types
-from typing import Callable
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
 
 from pyficache import get_linecache_info, highlight_string
 from pygments.token import Comment
 from xdis import (
     Bytecode,
     findlabels,
-    findlinestarts,
     get_instructions_bytes,
     get_opcode,
 )
 from xdis.std import distb
 from xdis.version_info import PYTHON_IMPLEMENTATION, PYTHON_VERSION_TRIPLE
 
+from trepan.lib.bytecode import code_index
 from trepan.lib.format import (  # Opcode,
     Arrow,
     Details,
@@ -228,6 +229,86 @@ def dis_from_file(
 # Default opc whene none is given.
 PYTHON_OPCODES = get_opcode(PYTHON_VERSION_TRIPLE, PYTHON_IMPLEMENTATION)
 
+
+class DecodedCode:
+    """The instructions of a code object, decoded once, and the lines
+    formatted for them so far. Lines are formatted only for
+    instructions that get shown, and kept by disassembly flavor and
+    highlighting style. A line is kept as the list of message calls
+    that print it: (True, text) for msg() and (False, text) for
+    msg_nocr()."""
+
+    def __init__(self, code: types.CodeType, opc):
+        self.code = code
+        self.instructions = list(get_instructions_bytes(code, opc))
+        self.labels = findlabels(code, opc)
+        self.line_starts = code_index(code).linestarts
+        self.formatted: Dict[Tuple[str, str], Dict[int, List[Tuple[bool, str]]]] = {}
+        return
+
+    pass
+
+
+class DisassemblyCache:
+    """A bounded cache of decoded code objects, used by
+    disassemble_bytes() so that showing the same code again, as "set
+    autodisasm" does at every stop, doesn't decode and format all of
+    it again.
+
+    Entries are keyed by the ids of the code object and of the opcode
+    module, and are believed only when the code object is the one the
+    entry was made for. At most `maxsize` code objects are kept; the
+    least-recently-used one is dropped first.
+    """
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, int], DecodedCode]" = OrderedDict()
+        return
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all entries and reset the hit and miss counts."""
+        self._entries.clear()
+        self.hits = self.misses = 0
+        return
+
+    def get(self, code: types.CodeType, opc=PYTHON_OPCODES) -> DecodedCode:
+        """Return the decoded instructions of `code`, decoding them if
+        we don't have them already."""
+        key = (id(code), id(opc))
+        entry = self._entries.get(key)
+        if entry is not None and entry.code is code:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = DecodedCode(code, opc)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        """Return the size, bound, and hit and miss counts of the cache."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    pass
+
+
+DisasmCache = DisassemblyCache()
+
+
 def disassemble(
     msg: Callable,
     msg_nocr: Callable,
@@ -252,7 +333,7 @@ def disassemble(
         start_line,
         end_line,
         relative_pos,
-        dict(findlinestarts(code)),
+        DisasmCache.get(code, opc).line_starts,
         style,
         start_offset=start_offset,
         end_offset=end_offset,
@@ -420,19 +501,30 @@ def disassemble_bytes(
     asm_format="extended",
 ) -> tuple:
     """Disassemble byte string of code. If end_line is negative
-    it counts the number of statement line starts to use."""
+    it counts the number of statement line starts to use.
+
+    Code objects are decoded once and kept in DisasmCache, along with
+    the lines formatted for the instructions shown. Only the
+    instructions in the range asked for get formatted."""
 
     def null_print(_):
         return None
 
-    instructions = []
     if end_line < 0:
         end_line = 10000
     elif relative_pos:
         end_line += start_line - 1
         pass
 
-    labels = findlabels(code, opc)
+    if isinstance(code, types.CodeType):
+        decoded = DisasmCache.get(code, opc)
+        all_instructions = decoded.instructions
+        labels = decoded.labels
+        formatted = decoded.formatted.setdefault((asm_format, style), {})
+    else:
+        all_instructions = list(get_instructions_bytes(code, opc))
+        labels = findlabels(code, opc)
+        formatted = None
 
     if start_line > cur_line or start_offset > 0:
         msg_nocr = null_print
@@ -442,9 +534,7 @@ def disassemble_bytes(
         msg = orig_msg
 
     offset = -1
-    for instr in get_instructions_bytes(code, opc):
-        instructions.append(instr)
-
+    for i, instr in enumerate(all_instructions):
         offset = instr.offset
 
         if end_offset and offset > end_offset:
@@ -478,18 +568,33 @@ def disassemble_bytes(
             else:
                 continue
 
-        print_instruction(
-            instr,
-            instructions,
-            msg,
-            msg_nocr,
-            labels=labels,
-            lasti=lasti,
-            line_starts=line_starts,
-            style=style,
-            opc=opc,
-            asm_format=asm_format,
-        )
+        if msg is null_print:
+            continue
+
+        calls = formatted.get(i) if formatted is not None else None
+        if calls is None or offset == lasti:
+            calls = []
+            print_instruction(
+                instr,
+                all_instructions[: i + 1],
+                lambda text: calls.append((True, text)),
+                lambda text: calls.append((False, text)),
+                labels=labels,
+                lasti=lasti,
+                line_starts=line_starts,
+                style=style,
+                opc=opc,
+                asm_format=asm_format,
+            )
+            # The line with the current-instruction arrow isn't kept.
+            if formatted is not None and offset != lasti:
+                formatted[i] = calls
+        for is_line, text in calls:
+            if is_line:
+                msg(text)
+            else:
+                msg_nocr(text)
+            pass
 
     return code, offset
 
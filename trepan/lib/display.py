@@ -20,6 +20,7 @@
 
 # Our local modules
 import trepan.lib.stack as Mstack
+from trepan.lib.eval import compile_expression
 
 
 def signature(frame):
@@ -39,14 +40,18 @@ class DisplayMgr:
         return
 
     def add(self, frame, arg, fmt=None):
+        """Add display expression `arg`. None is returned if it can't be
+        evaluated in `frame`. SyntaxError is raised if `arg` is not a
+        valid expression."""
         if not frame:
             return None
+        code = compile_expression(arg, "<display>")
         try:
-            eval(arg, frame.f_globals, frame.f_locals)
+            eval(code, frame.f_globals, frame.f_locals)
         except Exception:
             return None
         self.next += 1
-        display = Display(frame, arg, fmt, self.next)
+        display = Display(frame, arg, fmt, self.next, code)
         self.list.append(display)
         return display
 
@@ -101,10 +106,12 @@ Num Enb Expression"""
 
 
 class Display:
-    def __init__(self, frame, arg, fmt, number):
+    def __init__(self, frame, arg, fmt, number, code=None):
         self.signature = signature(frame)
         self.fmt = fmt
         self.arg = arg
+        # arg compiled, so that we don't reparse it on every stop.
+        self.code = compile_expression(arg, "<display>") if code is None else code
         self.enabled = True
         self.number = number
         return
@@ -113,7 +120,7 @@ class Display:
         if not frame:
             return 'No symbol "' + self.arg + '" in current context.'
         try:
-            val = eval(self.arg, frame.f_globals, frame.f_locals)
+            val = eval(self.code, frame.f_globals, frame.f_locals)
         except Exception:
             return 'No symbol "' + self.arg + '" in current context.'
         s = "%3d: %s" % (self.number, Mstack.print_obj(self.arg, val, self.fmt, True))
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2012-2015, 2023 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2012-2015, 2023, 2026 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -19,6 +19,18 @@
 # extract the "expression" part of a line of source code.
 #
 import re
+from types import CodeType
+
+
+def compile_expression(text: str, filename: str = "<condition>") -> CodeType:
+    """Compile the Python expression `text` so that it can be given to
+    eval() repeatedly without getting reparsed each time. This is used
+    for breakpoint conditions, "until" conditions and display
+    expressions.
+
+    SyntaxError is raised if `text` is not a valid expression.
+    """
+    return compile(text.strip(), filename, "eval")
 
 
 def extract_expression(text):
@@ -66,4 +78,10 @@ if __name__ == "__main__":
     ):
         print(extract_expression(stmt))
         pass
+    x = 5
+    print(eval(compile_expression("x > 3"), globals(), locals()))
+    try:
+        compile_expression("x >")
+    except SyntaxError as e:
+        print(e)
     pass
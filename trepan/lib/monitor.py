@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A sys.monitoring (PEP 669) event backend for TrepanCore.
+
+The default backend goes through the "tracer" package which sits on
+top of sys.settrace(). There, every line, call and return event of
+every frame runs Python code.
+
+Here, instead, we enable only the events that each code object
+needs. When we are not stepping, that is:
+
+  * LINE events for code objects that have line breakpoints,
+  * PY_START events for code objects that have call breakpoints, and
+    to find the running code object of a breakpoint the first time it
+    is called.
+
+When we are "next"ing or "finish"ing, LINE and PY_RETURN events are
+enabled just on code objects of the frames in the stack at the time we
+resume. Only "step" and event tracing require events everywhere.
+
+Any event we get that can't lead to a stop returns
+sys.monitoring.DISABLE so that the interpreter no longer reports
+events at that location until the next time we rearm.
+
+sys.monitoring is available starting in Python 3.12.
+"""
+
+import sys
+from types import CodeType, FrameType
+from typing import Dict, FrozenSet, Optional, Tuple
+
+
+HAVE_MONITORING = hasattr(sys, "monitoring")
+
+if HAVE_MONITORING:
+    monitoring = sys.monitoring
+    DISABLE = monitoring.DISABLE
+    E = monitoring.events
+    STEP_EVENTS = E.PY_START | E.LINE | E.PY_RETURN
+    NEXT_EVENTS = E.LINE | E.PY_RETURN
+    EVENT_NAME2EVENT = {
+        "call": E.PY_START,
+        "line": E.LINE,
+        "return": E.PY_RETURN,
+    }
+else:
+    monitoring = None
+    DISABLE = None
+    E = None
+    STEP_EVENTS = NEXT_EVENTS = 0
+    EVENT_NAME2EVENT = {}
+
+
+class MonitoringBackend:
+    """Delivers sys.monitoring events to ``core.trace_dispatch()`` using
+    the event names of sys.settrace(), "call", "line" and "return".
+    """
+
+    def __init__(self, core, tool_id: Optional[int] = None):
+        if not HAVE_MONITORING:
+            raise RuntimeError("sys.monitoring requires Python 3.12 or later")
+        self.core = core
+        self.tool_id = monitoring.DEBUGGER_ID if tool_id is None else tool_id
+        self.is_active = False
+
+        # Events enabled for all code. This is 0 unless we are stepping
+        # or have breakpoints.
+        self.global_events = 0
+
+        # Events we have set on specific code objects. The code
+        # objects of breakpoints are often not the ones that run:
+        # pyficache compiles its own copy of a file to find them. The
+        # copies compare equal to the running code though. So this is
+        # keyed by id() to distinguish the code object we have to set
+        # events on.
+        self.local_events: Dict[int, Tuple[CodeType, int]] = {}
+
+        # Line numbers of breakpoints for each code object that has
+        # some, by id() of the code object. Entries are believed only
+        # for the code object they were made for. Hashing a code object
+        # hashes all of its contents, too slow to do on every event.
+        self.break_lines: Dict[int, Tuple[CodeType, FrozenSet[int]]] = {}
+
+        # True if we are stepping, or tracing events, so any event can
+        # lead to a stop.
+        self.step_all = True
+
+        # True if the debugger core is stepping, next'ing, finish'ing
+        # or otherwise needs to see events that are not breakpoints.
+        # In this situation we don't return DISABLE for line events.
+        self.stepping = True
+        return
+
+    def start(self):
+        """Claim our sys.monitoring tool id, register callbacks and
+        turn on the events that we currently need. ValueError is raised
+        if another tool, like pdb, already has the tool id."""
+        if self.is_active:
+            return
+        monitoring.use_tool_id(self.tool_id, "trepan3k")
+        monitoring.register_callback(self.tool_id, E.PY_START, self._py_start)
+        monitoring.register_callback(self.tool_id, E.LINE, self._line)
+        monitoring.register_callback(self.tool_id, E.PY_RETURN, self._py_return)
+        self.is_active = True
+        self.rearm(sys._getframe(1))
+        return
+
+    def stop(self):
+        """Turn off all events and release our sys.monitoring tool id."""
+        if not self.is_active:
+            return
+        self.is_active = False
+        monitoring.set_events(self.tool_id, 0)
+        for code, _ in self.local_events.values():
+            monitoring.set_local_events(self.tool_id, code, 0)
+        self.local_events = {}
+        self.break_lines = {}
+        self.global_events = 0
+        for event in (E.PY_START, E.LINE, E.PY_RETURN):
+            monitoring.register_callback(self.tool_id, event, None)
+        monitoring.free_tool_id(self.tool_id)
+        return
+
+    def rearm(self, frame: Optional[FrameType] = None):
+        """Recompute the events we need from the state of the debugger
+        core: its breakpoints, and whether we are stepping, next'ing or
+        finish'ing. `frame` is the frame that we will be resuming in;
+        it is used to figure out the code objects that "next" and
+        "finish" can stop in.
+
+        This should be called whenever the debugger is about to resume
+        execution, and after the breakpoints change.
+        """
+        if not self.is_active:
+            return
+        core = self.core
+        bpmgr = core.bpmgr
+        settings = core.debugger.settings if core.debugger else {}
+
+        local_events: Dict[int, Tuple[CodeType, int]] = {}
+
+        def add_events(code: CodeType, events: int):
+            _, old_events = local_events.get(id(code), (code, 0))
+            local_events[id(code)] = (code, old_events | events)
+
+        break_lines: Dict[int, Tuple[CodeType, FrozenSet[int]]] = {}
+        for code, lines in bpmgr.code2lines.items():
+            break_lines[id(code)] = (code, lines)
+            add_events(code, E.LINE)
+        has_call_brkpts = False
+        for code, brkpts in bpmgr.codecall_brkpts.items():
+            if brkpts:
+                add_events(code, E.PY_START)
+                has_call_brkpts = True
+
+        # Arm running code that is equal to the code of some breakpoint,
+        # or that has breakpoints set by file name and line number.
+        # Code that hasn't started yet is armed in _py_start().
+        if bpmgr.code2lines or bpmgr.file2lines:
+            codes = [code for code, _ in self.local_events.values()]
+            for thread_frame in sys._current_frames().values():
+                while thread_frame is not None:
+                    codes.append(thread_frame.f_code)
+                    thread_frame = thread_frame.f_back
+            for code in codes:
+                lines = self._lines_for_code(code)
+                if lines:
+                    break_lines[id(code)] = (code, lines)
+                    add_events(code, E.LINE)
+
+        step_ignore = core.step_ignore
+        is_stepping = step_ignore is not None and step_ignore >= 0
+        if core.step_events is None:
+            event_mask = STEP_EVENTS
+        else:
+            event_mask = 0
+            for event_name in core.step_events:
+                event_mask |= EVENT_NAME2EVENT.get(event_name, 0)
+
+        global_events = 0
+        is_next_or_finish = False
+        if (
+            core.until_condition
+            or settings.get("trace")
+            or core.stop_request is not None
+        ):
+            global_events = STEP_EVENTS
+        elif core.stop_level is not None and (is_stepping or core.stop_on_finish):
+            # "next" or "finish". Only frames at or above
+            # core.stop_level can stop, and those are all in the stack
+            # now.
+            is_next_or_finish = True
+            next_events = NEXT_EVENTS & event_mask
+            while frame is not None:
+                add_events(frame.f_code, next_events)
+                frame = frame.f_back
+        elif is_stepping:
+            global_events = event_mask
+
+        self.step_all = global_events != 0
+        self.stepping = self.step_all or is_next_or_finish
+        if break_lines or bpmgr.file2lines or has_call_brkpts:
+            global_events |= E.PY_START
+
+        tool_id = self.tool_id
+        for code_id, (code, _) in self.local_events.items():
+            if code_id not in local_events:
+                monitoring.set_local_events(tool_id, code, 0)
+        for code_id, (code, events) in local_events.items():
+            if self.local_events.get(code_id, (code, None))[1] != events:
+                monitoring.set_local_events(tool_id, code, events)
+        self.local_events = local_events
+        self.break_lines = break_lines
+
+        if self.global_events != global_events:
+            monitoring.set_events(tool_id, global_events)
+            self.global_events = global_events
+
+        # Locations that we returned DISABLE for earlier may be needed now.
+        monitoring.restart_events()
+        return
+
+    # The callbacks below get called from the frame that has the event.
+    # Since the interpreter doesn't report events while we are inside
+    # a callback, the debugger's own code isn't seen here.
+
+    def _lines_for_code(self, code: CodeType) -> FrozenSet[int]:
+        bpmgr = self.core.bpmgr
+        if bpmgr.file2lines:
+            return bpmgr.lines_for_code(code, self.core.canonic_code_filename(code))
+        return bpmgr.code_breaks(code)[0]
+
+    def _py_start(self, code: CodeType, _instruction_offset: int):
+        code_id = id(code)
+        entry = self.break_lines.get(code_id)
+        if entry is None or entry[0] is not code:
+            # Code equal to that of a breakpoint, or code in a file
+            # with breakpoints set by line number.
+            lines = self._lines_for_code(code)
+            entry = (code, lines) if lines else None
+            if entry:
+                self.break_lines[code_id] = entry
+        if entry:
+            _, events = self.local_events.get(code_id, (code, 0))
+            if not events & E.LINE:
+                events |= E.LINE
+                monitoring.set_local_events(self.tool_id, code, events)
+                self.local_events[code_id] = (code, events)
+        if self.step_all or self.core.bpmgr.code_breaks(code)[1]:
+            self.core.trace_dispatch(sys._getframe(1), "call", None)
+            return None
+        return DISABLE
+
+    def _line(self, code: CodeType, line_number: int):
+        entry = self.break_lines.get(id(code))
+        if self.stepping or (
+            entry is not None and entry[0] is code and line_number in entry[1]
+        ):
+            self.core.trace_dispatch(sys._getframe(1), "line", None)
+            return None
+        return DISABLE
+
+    def _py_return(self, _code: CodeType, _instruction_offset: int, retval):
+        if self.stepping:
+            self.core.trace_dispatch(sys._getframe(1), "return", retval)
+            return None
+        return DISABLE
+
+    pass
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#  Copyright (C) 2009, 2013, 2015-2016, 2020-2021, 2024
+#  Copyright (C) 2009, 2013, 2015-2016, 2020-2021, 2024, 2026
 #  Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
@@ -16,10 +16,12 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pprint
-from typing import Callable
+from typing import Callable, Optional
 
 from columnize import columnize
 
+from trepan.lib.variables import VariableStore, is_large
+
 # Maximum length of strings
 MAX_PP_STRLEN = 100
 
@@ -60,7 +62,31 @@ class SafePP(pprint.PrettyPrinter):
         return pprint.PrettyPrinter._format(self, obj, *args, **kwargs)
 
 
-def pp(val, display_width, msg_nocr: Callable, msg: Callable, prefix=None):
+def pp(
+    val,
+    display_width,
+    msg_nocr: Callable,
+    msg: Callable,
+    prefix=None,
+    variables: Optional[VariableStore] = None,
+):
+    """Pretty print `val`. A big value, of whatever type, is shown
+    by its type, length and a short preview, since formatting all of
+    it can take a long time. If `variables` is given, the value gets a
+    handle in it, which is mentioned so that "expand" can show more."""
+    if is_large(val):
+        if variables is None:
+            info = VariableStore().describe(val)
+            info["handle"] = None
+        else:
+            info = variables.describe(val)
+        text = f"{info['type']} of length {info['length']} = {info['preview']}"
+        if prefix is not None:
+            text = f"{prefix} {text}"
+        msg(text)
+        if info["handle"] is not None:
+            msg(f"  use 'expand @{info['handle']}' to see more")
+        return
     if prefix is not None:
         val_len = len(repr(val))
         if val_len + len(prefix) < display_width - 1:
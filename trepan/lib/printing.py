@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#  Copyright (C) 2007-2010, 2015, 2020, 2023-2025
+#  Copyright (C) 2007-2010, 2015, 2020, 2023-2026
 #  Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
@@ -18,8 +18,9 @@
 
 import inspect
 import pprint
+import re
 import types
-from typing import Optional
+from typing import List, Optional, Tuple
 
 
 def print_dict(s, obj, title) -> str:
@@ -127,6 +128,107 @@ def printf(val, fmt):
     return str(val)
 
 
+# Memory dumps, as in gdb's "x" command.
+
+# Unit sizes, and the memoryview format codes for unsigned and signed
+# integers of that size.
+MEMORY_UNITS = {
+    "b": (1, "B", "b"),
+    "h": (2, "H", "h"),
+    "w": (4, "I", "i"),
+    "g": (8, "Q", "q"),
+}
+
+# Default memory dump format letter, unit, and number of units.
+MEMORY_DEFAULTS = ("x", "b", 64)
+
+# Number of bytes shown on a line of a memory dump.
+MEMORY_LINE_SIZE = 16
+
+
+def parse_memory_format(fmt: str) -> Tuple[int, str, str]:
+    """Parse a gdb-style /NFU memory-dump format, e.g. "/32xb", into a
+    count, a format letter and a unit letter. The format letter is one
+    of "x" (hex), "d" (signed decimal), "u" (unsigned decimal) or "o"
+    (octal); the unit is one of "b", "h", "w" or "g" for 1, 2, 4 or 8
+    bytes. Missing parts get their defaults. ValueError is raised if
+    `fmt` is not of this form."""
+    m = re.match(r"^/?(\d*)([xduo]?)([bhwg]?)$", fmt)
+    if not m:
+        m = re.match(r"^/?(\d*)([bhwg]?)([xduo]?)$", fmt)
+        if not m:
+            raise ValueError("bad memory-dump format %s" % fmt)
+        count, unit, letter = m.groups()
+    else:
+        count, letter, unit = m.groups()
+    default_letter, default_unit, default_count = MEMORY_DEFAULTS
+    return (
+        int(count) if count else default_count,
+        letter or default_letter,
+        unit or default_unit,
+    )
+
+
+def dump_memory(
+    obj, offset: int = 0, count: int = 64, letter: str = "x", unit: str = "b"
+) -> List[str]:
+    """Return lines showing `count` units of `unit` size of the memory
+    of `obj`, which can be anything that supports the buffer protocol,
+    like bytes, bytearray, memoryview, array.array or mmap. The dump
+    starts `offset` bytes in. Each line has the offset, the units
+    formatted according to `letter` and the bytes as ASCII.
+
+    Only the bytes shown are looked at, so this is fast even for very
+    large buffers. TypeError is raised if `obj` has no buffer, and
+    ValueError if it isn't contiguous, `offset` is out of range or
+    there isn't a whole unit to show."""
+    size, unsigned_code, signed_code = MEMORY_UNITS[unit]
+    with memoryview(obj) as view:
+        if not view.contiguous:
+            raise ValueError("buffer is not contiguous")
+        data = view.cast("B") if view.format != "B" or view.ndim != 1 else view
+        if not 0 <= offset <= len(data):
+            raise ValueError(
+                "offset %d is outside a buffer of %d bytes" % (offset, len(data))
+            )
+        end = min(len(data), offset + count * size)
+        end -= (end - offset) % size
+        if end == offset:
+            raise ValueError(
+                "no complete %d-byte units in range: offset %d of a buffer of %d bytes"
+                % (size, offset, len(data))
+            )
+        window = data[offset:end]
+        values = window.cast(signed_code if letter == "d" else unsigned_code)
+        if letter == "x":
+            width = 2 * size
+            format_value = lambda v: "%0*x" % (width, v)
+        elif letter == "o":
+            width = len("%o" % (256**size - 1))
+            format_value = lambda v: "%0*o" % (width, v)
+        else:
+            width = len(str(-(256**size) // 2 if letter == "d" else 256**size - 1))
+            format_value = lambda v: "%*d" % (width, v)
+        per_line = MEMORY_LINE_SIZE // size
+        address_width = max(len("%x" % max(end - 1, 0)), 8)
+        lines = []
+        for i in range(0, len(values), per_line):
+            line_offset = offset + i * size
+            row = window[i * size : (i + per_line) * size]
+            text = " ".join(format_value(v) for v in values[i : i + per_line])
+            text = text.ljust(per_line * (width + 1) - 1)
+            ascii = "".join(chr(b) if 32 <= b < 127 else "." for b in row)
+            lines.append(
+                "0x%0*x: %s  |%s|" % (address_width, line_offset, text, ascii)
+            )
+            pass
+        values.release()
+        window.release()
+        if data is not view:
+            data.release()
+    return lines
+
+
 if __name__ == "__main__":
     print(print_dict("", globals(), "my globals"))
     print("-" * 40)
@@ -149,3 +251,5 @@ if __name__ == "__main__":
     assert printf(31, "/t") == "00011111"
     assert printf(33, "/c") == "!"
     assert printf(33, "/x") == "0x21"
+    print("\n".join(dump_memory(b"Hello, world!" * 4, 3, 40)))
+    print("\n".join(dump_memory(bytearray(range(40)), 0, 5, "d", "w")))
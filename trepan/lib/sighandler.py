@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013-2014, 2016, 2022, 2023-2024
+#   Copyright (C) 2009, 2013-2014, 2016, 2022, 2023-2024, 2026
 #   Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -26,6 +26,11 @@
 import signal
 from typing import Optional
 
+# signal.signal() as it was before any SignalManager replaced it. Use
+# this for handlers that belong to the debugger rather than to the
+# program being debugged.
+ORIG_SET_SIGNAL = signal.signal
+
 
 def yes_or_no(b) -> str:
     """Return 'Yes' for True and 'No' for False, and ?? for anything
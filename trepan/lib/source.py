@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Source lines, plain and syntax-highlighted, shared by the commands
+that show source text: "list", the location shown at a stop, "info
+line" and "backtrace -s".
+
+Large source files are read through a memory map and an index of line
+offsets, so that only the lines shown are decoded.
+"""
+
+import mmap
+import os
+import os.path as osp
+from array import array
+from collections import OrderedDict
+from tokenize import detect_encoding
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pyficache
+from pygments import highlight
+from pygments.formatters import Terminal256Formatter, TerminalFormatter
+from pygments.lexers import PythonLexer
+from pyficache.pyasm import PyasmLexer
+
+# Pygments lexers strip leading and trailing blank lines by default.
+# That would shift the highlighted lines away from the line numbers of
+# the file, so we keep our own lexers that don't.
+python_lexer = PythonLexer(stripnl=False)
+pyasm_lexer = PyasmLexer(stripnl=False)
+
+_formatters: Dict[Tuple[str, Optional[str]], TerminalFormatter] = {}
+
+
+def is_plain(highlight_mode: str, style: Optional[str]) -> bool:
+    """Return True if lines shown with setting "highlight" set to
+    `highlight_mode` and "style" set to `style` have no terminal
+    escape sequences in them."""
+    return highlight_mode == "plain" or style in ("plain", "none")
+
+
+def terminal_formatter(highlight_mode: str, style: Optional[str]):
+    """Return a pygments terminal formatter for `style`, or for the
+    "light" or "dark" background given in `highlight_mode` when there
+    is no style."""
+    key = (highlight_mode, style)
+    formatter = _formatters.get(key)
+    if formatter is None:
+        if style:
+            formatter = Terminal256Formatter(style=style)
+        else:
+            formatter = TerminalFormatter(bg=highlight_mode)
+        _formatters[key] = formatter
+    return formatter
+
+
+def file_signature(filename: str) -> Optional[Tuple[float, int]]:
+    """Return the modification time and size of `filename`, or None if
+    it isn't a file we can stat, like "<string>"."""
+    path = pyficache.path(filename) or filename
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+# Files at least this many bytes long are memory mapped rather than
+# read into a list of lines.
+MMAP_MIN_SIZE = 1024 * 1024
+
+
+class MappedSource:
+    """The lines of a source file, read through a memory map of the file.
+
+    An index of the offsets where lines start is built when the file is
+    mapped; a line is decoded only when it is asked for. Lines are
+    returned with a trailing newline, like the lines pyficache gives,
+    so a MappedSource can be used where a list of those lines is.
+    """
+
+    def __init__(self, path: str, signature: Optional[Tuple[float, int]] = None):
+        self.path = path
+        self.signature = signature
+        with open(path, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = array("q", [0])
+        find = self._mmap.find
+        size = len(self._mmap)
+        i = find(b"\n")
+        while i >= 0:
+            self._offsets.append(i + 1)
+            i = find(b"\n", i + 1)
+        if self._offsets[-1] != size:
+            # The last line has no newline.
+            self._offsets.append(size)
+        lines = iter(self._line_bytes(i) for i in range(min(2, len(self))))
+        self.encoding, _ = detect_encoding(lambda: next(lines, b""))
+        return
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self._decode(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("line index out of range")
+        return self._decode(i)
+
+    def close(self):
+        self._mmap.close()
+        return
+
+    def getline(self, line_number: int) -> Optional[str]:
+        """Return line `line_number`, counting from 1, or None if the
+        file doesn't have that line."""
+        if 1 <= line_number <= len(self):
+            return self._decode(line_number - 1)
+        return None
+
+    def _line_bytes(self, i: int) -> bytes:
+        return self._mmap[self._offsets[i] : self._offsets[i + 1]]
+
+    def _decode(self, i: int) -> str:
+        line = self._line_bytes(i).decode(self.encoding, errors="replace")
+        if line.endswith("\r\n"):
+            line = line[:-2] + "\n"
+        elif not line.endswith("\n"):
+            line += "\n"
+        return line
+
+    pass
+
+
+# Memory-mapped sources, by path.
+_mapped: Dict[str, MappedSource] = {}
+
+
+def mapped_source(filename: str) -> Optional[MappedSource]:
+    """Return a memory-mapped source for `filename` if it is a large
+    Python file on disk. None is returned for small files, and for
+    files that pyficache has to handle: remapped and frozen files,
+    Python assembly files, and "<string>"-like names that aren't files.
+
+    A mapped file always follows what is on disk: it is mapped again
+    when its modification time or size changes, whatever the setting
+    of "reload" is, since reading past the end of a file that has been
+    truncated under its mapping crashes the process.
+    """
+    if (
+        filename.startswith("<")
+        or filename in pyficache.file2file_remap
+        or pyficache.is_python_assembly_file(filename)
+    ):
+        return None
+    try:
+        stat = os.stat(filename)
+    except (OSError, TypeError, ValueError):
+        return None
+    path = osp.realpath(filename)
+    source = _mapped.get(path)
+    signature = (stat.st_mtime, stat.st_size)
+    if source is not None:
+        if source.signature == signature:
+            return source
+        del _mapped[path]
+        source.close()
+    if stat.st_size < MMAP_MIN_SIZE or not osp.isfile(path):
+        return None
+    try:
+        source = MappedSource(path, signature)
+    except (OSError, SyntaxError, ValueError):
+        # SyntaxError is what detect_encoding() raises on a bad
+        # coding line.
+        return None
+    _mapped[path] = source
+    return source
+
+
+def source_lines(
+    filename: str, reload_on_change: bool = False, is_pyasm: Optional[bool] = None
+) -> Optional[Sequence[str]]:
+    """Return the lines of `filename`, each with its trailing newline,
+    or None if we can't get them. Large files are memory mapped; for
+    everything else we use the lines that pyficache has."""
+    if not is_pyasm:
+        source = mapped_source(filename)
+        if source is not None:
+            return source
+    return pyficache.getlines(
+        filename,
+        {"output": "plain", "reload_on_change": reload_on_change},
+        is_pyasm=is_pyasm,
+    )
+
+
+def source_size(filename: str) -> Optional[int]:
+    """Return the number of lines in `filename` or None if we can't get
+    its lines. This is pyficache.size() without reading large files
+    into memory."""
+    source = mapped_source(filename)
+    if source is not None:
+        return len(source)
+    return pyficache.size(filename)
+
+
+class HighlightedFile:
+    """The lines of a source file as they are shown in one highlight
+    mode and style.
+
+    The plain lines come from source_lines(). Unless the file has more
+    than `whole_file_lines` lines, all of it is highlighted in one
+    pygments pass the first time a line is asked for. Larger files are
+    highlighted `chunk_size` lines at a time, as lines in the chunk are
+    needed.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        plain_lines: Sequence[str],
+        signature: Optional[Tuple[float, int]],
+        highlight_mode: str = "plain",
+        style: Optional[str] = None,
+        is_pyasm: bool = False,
+        chunk_size: int = 500,
+        whole_file_lines: int = 5000,
+    ):
+        self.filename = filename
+        self.plain_lines = plain_lines
+        self.signature = signature
+        self.highlight_mode = highlight_mode
+        self.style = style
+        self.is_pyasm = is_pyasm
+        self.chunk_size = chunk_size
+        self.whole_file_lines = whole_file_lines
+        self._lines: Dict[int, str] = {}
+        return
+
+    def __len__(self) -> int:
+        return len(self.plain_lines)
+
+    def __getitem__(self, i: int) -> str:
+        """Return line `i`, counting from 0, highlighted and without its
+        trailing newline."""
+        line = self._lines.get(i)
+        if line is None:
+            self._fill(i)
+            line = self._lines[i]
+        return line
+
+    def getline(self, line_number: int) -> Optional[str]:
+        """Return line `line_number`, counting from 1, or None if the
+        file doesn't have that line. Line numbers are remapped the way
+        pyficache.getline() remaps them."""
+        _, line_number = pyficache.unmap_file_line(self.filename, line_number)
+        if 1 <= line_number <= len(self.plain_lines):
+            return self[line_number - 1]
+        return None
+
+    def _fill(self, i: int):
+        """Highlight the chunk of lines that line `i` is in."""
+        n = len(self.plain_lines)
+        if n <= self.whole_file_lines:
+            start, end = 0, n
+        else:
+            start = i - i % self.chunk_size
+            end = min(start + self.chunk_size, n)
+        plain = [line.rstrip("\n") for line in self.plain_lines[start:end]]
+        if is_plain(self.highlight_mode, self.style):
+            self._lines.update(zip(range(start, end), plain))
+            return
+        lexer = pyasm_lexer if self.is_pyasm else python_lexer
+        text = "".join(line + "\n" for line in plain)
+        formatted = highlight(
+            text, lexer, terminal_formatter(self.highlight_mode, self.style)
+        ).split("\n")
+        # Should pygments ever give back fewer lines than it was given,
+        # show the rest plain rather than misnumbered.
+        formatted[len(plain) :] = []
+        formatted += plain[len(formatted) :]
+        self._lines.update(zip(range(start, end), formatted))
+        return
+
+    pass
+
+
+class HighlightCache:
+    """A bounded cache of highlighted source files.
+
+    Entries are keyed by file name, highlight mode, style and whether
+    the file is Python assembly. An entry is used only while the file's
+    modification time and size are the ones it was made from, and while
+    source_lines() gives the same lines for the file. At most `maxsize`
+    entries are kept; the least-recently-used one is dropped first.
+    """
+
+    def __init__(
+        self, maxsize: int = 20, chunk_size: int = 500, whole_file_lines: int = 5000
+    ):
+        self.maxsize = maxsize
+        self.chunk_size = chunk_size
+        self.whole_file_lines = whole_file_lines
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, HighlightedFile]" = OrderedDict()
+        return
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all entries and reset the hit and miss counts."""
+        self._entries.clear()
+        self.hits = self.misses = 0
+        return
+
+    def get(
+        self,
+        filename: str,
+        highlight_mode: str = "plain",
+        style: Optional[str] = None,
+        is_pyasm: Optional[bool] = None,
+        reload_on_change: bool = False,
+    ) -> Optional[HighlightedFile]:
+        """Return the lines of `filename` shown with setting "highlight"
+        set to `highlight_mode` and "style" set to `style`, or None if
+        we can't get the lines of the file."""
+        filename = pyficache.unmap_file(filename)
+        if is_pyasm is None:
+            is_pyasm = pyficache.is_python_assembly_file(filename)
+        plain_lines = source_lines(filename, reload_on_change, is_pyasm)
+        if plain_lines is None:
+            return None
+        if is_plain(highlight_mode, style):
+            # The key doesn't need to tell plain styles apart.
+            highlight_mode, style = "plain", None
+        key = (filename, highlight_mode, style, is_pyasm)
+        signature = file_signature(filename)
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry.plain_lines is plain_lines
+            and entry.signature == signature
+        ):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = HighlightedFile(
+            filename,
+            plain_lines,
+            signature,
+            highlight_mode,
+            style,
+            is_pyasm,
+            self.chunk_size,
+            self.whole_file_lines,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def getline(
+        self,
+        filename: str,
+        line_number: int,
+        highlight_mode: str = "plain",
+        style: Optional[str] = None,
+        is_pyasm: Optional[bool] = None,
+        reload_on_change: bool = False,
+    ) -> Optional[str]:
+        """Return line `line_number` of `filename`, counting from 1,
+        highlighted and without its trailing newline. None is returned
+        if we don't have that line."""
+        entry = self.get(filename, highlight_mode, style, is_pyasm, reload_on_change)
+        if entry is None:
+            return None
+        return entry.getline(line_number)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the size, bound, and hit and miss counts of the cache."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    pass
+
+
+SourceCache = HighlightCache()
+
+
+if __name__ == "__main__":
+    for mode, style in (("plain", None), ("light", None), ("dark", "monokai")):
+        print(SourceCache.getline(__file__, 20, mode, style))
+    print(SourceCache.stats())
+    pass
@@ -17,7 +17,6 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Functions for working with Python frames"""
 
-import dis
 import inspect
 import linecache
 import os
@@ -25,6 +24,7 @@ import os.path as osp
 import pyficache
 import re
 
+from collections import OrderedDict
 from opcode import opname
 from reprlib import repr
 from types import CodeType, FrameType
@@ -32,7 +32,7 @@ from typing import Dict, List, Optional, Tuple
 import xdis
 from xdis.version_info import PYTHON_IMPLEMENTATION, PYTHON_VERSION_TRIPLE
 
-from trepan.lib.bytecode import op_at_frame
+from trepan.lib.bytecode import code_index, op_at_frame
 from trepan.lib.format import (
     Arrow,
     Filename,
@@ -43,6 +43,7 @@ from trepan.lib.format import (
     format_token,
 )
 from trepan.lib.pp import pp
+from trepan.lib.source import SourceCache
 from trepan.lib.printing import printf
 
 try:
@@ -54,7 +55,7 @@ except ImportError:
 
 
 try:
-    from trepan.lib.deparse import deparse_offset
+    from trepan.lib.deparse import deparse_offset, is_pending
 
     have_deparser = True
 except ImportError:
@@ -62,41 +63,132 @@ except ImportError:
     def deparse_offset(_code, _name: str, _list_i: int, _) -> tuple:
         return None, None
 
+    def is_pending(_code) -> bool:
+        return False
+
     have_deparser = False
 
 _with_local_varname = re.compile(r"_\[[0-9+]]")
 
 opc = xdis.get_opcode_module(PYTHON_VERSION_TRIPLE, PYTHON_IMPLEMENTATION)
 
-# A mapping frame to its ExtraFrameInfo.
-FrameInfo: Dict[FrameType, int] = {}
+
+class FrameDepthCache:
+    """A bounded cache of frame stack depths, used by count_frames().
+
+    Frame objects can't be weakly referenced, and holding on to them
+    keeps their locals and all of the frames below them alive.  Entries
+    are therefore keyed by id(frame). Since the id of a frame that has
+    gone away can get reused, an entry is only believed when the frame's
+    code object and the id of its parent frame are the same as when the
+    entry was recorded.
+
+    At most `maxsize` entries are kept; the least-recently-used entry
+    is dropped first. So frames that unwind without our seeing a
+    "return" event, e.g. through an exception, or while the debugger
+    hook is suspended, don't accumulate.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._depths: "OrderedDict[int, Tuple[int, CodeType, int]]" = OrderedDict()
+        return
+
+    def __contains__(self, frame: FrameType) -> bool:
+        entry = self._depths.get(id(frame))
+        return (
+            entry is not None
+            and entry[1] is frame.f_code
+            and entry[2] == id(frame.f_back)
+        )
+
+    def __len__(self) -> int:
+        return len(self._depths)
+
+    def __setitem__(self, frame: FrameType, depth: int):
+        frame_id = id(frame)
+        depths = self._depths
+        depths[frame_id] = (depth, frame.f_code, id(frame.f_back))
+        # Entries can be evicted by other threads at any point, so
+        # KeyError here and below just means that the entry is gone.
+        try:
+            depths.move_to_end(frame_id)
+            if len(depths) > self.maxsize:
+                depths.popitem(last=False)
+        except KeyError:
+            pass
+        return
+
+    def clear(self):
+        """Remove all entries and reset the hit and miss counts."""
+        self._depths.clear()
+        self.hits = self.misses = 0
+        return
+
+    def discard(self, frame: FrameType):
+        """Remove `frame` if it is in the cache."""
+        self._depths.pop(id(frame), None)
+        return
+
+    def get(self, frame: FrameType) -> Optional[int]:
+        """Return the cached depth of `frame`, or None if we don't
+        have it."""
+        frame_id = id(frame)
+        entry = self._depths.get(frame_id)
+        if (
+            entry is not None
+            and entry[1] is frame.f_code
+            and entry[2] == id(frame.f_back)
+        ):
+            try:
+                self._depths.move_to_end(frame_id)
+            except KeyError:
+                pass
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """Return the size, bound, and hit and miss counts of the cache."""
+        return {
+            "size": len(self._depths),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    pass
+
+
+# The depth of frames that we have seen. See count_frames().
+FrameInfo = FrameDepthCache()
 
 def count_frames(frame: FrameType) -> int:
-    """Return a count of the number of frames"""
-    count = 0
-    # Bottommost frame depth is 1
-    depth = 1
+    """Return the depth of `frame` in its stack; the bottommost frame
+    has depth 1.
+
+    Depths are remembered in FrameInfo. We walk f_back only as far as
+    the first frame that we know the depth of. So when the caller of a
+    new frame has been seen, as it has for "call" events that we trace,
+    this takes constant time no matter how deep the stack is.
+    """
     frames: List[FrameType] = []
-    for _ in range(1000):
-        if frame is None:
-            break
-        elif depth_or_None := FrameInfo.get(frame):
+    depth = 0
+    while frame is not None:
+        if (depth_or_None := FrameInfo.get(frame)) is not None:
             depth = depth_or_None
-            count += depth
             break
-        else:
-            frames.append(frame)
-            count += 1
-            frame = frame.f_back
-    else:
-        return 1000
+        frames.append(frame)
+        frame = frame.f_back
 
-    # Populate or update FrameInfo
-    while len(frames) > 0 and frame not in FrameInfo:
-        frame = frames.pop()
-        FrameInfo[frame] = depth
+    # Record the depths of the frames that we had to walk.
+    for frame in reversed(frames):
         depth += 1
-    return count
+        FrameInfo[frame] = depth
+    return depth
 
 
 def get_column_start_from_frame(frame: FrameType) -> int:
@@ -445,7 +537,7 @@ def get_call_function_name(frame) -> Optional[str]:
     co = frame.f_code
     code = co.co_code
     # labels     = dis.findlabels(code)
-    linestarts = dict(dis.findlinestarts(co))
+    linestarts = code_index(co).linestarts
     offset = frame.f_lasti
     last_LOAD_offset = -1
     is_load_global = None
@@ -499,8 +591,17 @@ def print_stack_entry(proc_obj, i_stack: int, style="none", opts={}):
     )
     if opts.get("source", False):
         filename = frame2file(proc_obj.core, frame)
-        line = linecache.getline(filename, line_number, frame.f_globals)
-        intf.msg(line)
+        settings = proc_obj.debugger.settings
+        line = SourceCache.getline(
+            filename,
+            line_number,
+            settings.get("highlight", "plain"),
+            style,
+            reload_on_change=settings.get("reload", False),
+        )
+        if line is None:
+            line = linecache.getline(filename, line_number, frame.f_globals)
+        intf.msg(line.rstrip("\n"))
         pass
 
     if opts.get("deparse", False):
@@ -513,7 +614,11 @@ def print_stack_entry(proc_obj, i_stack: int, style="none", opts={}):
         if name == "<module>":
             name = "module"
 
-        if have_deparser:
+        if have_deparser and is_pending(frame.f_code):
+            # Don't wait for the background deparse; show the
+            # instruction instead.
+            intf.msg(f"    instruction {last_i}: {op_at_frame(frame, last_i)}")
+        elif have_deparser:
             deparsed, node_info = deparse_offset(frame.f_code, name, last_i, None)
             if node_info:
                 extract_info = deparsed.extract_node_info(node_info)
@@ -529,7 +634,14 @@ def print_stack_entry(proc_obj, i_stack: int, style="none", opts={}):
                 val = proc_obj.getval(name, frame.f_locals)
                 pass
             width = opts.get("width", 80)
-            pp(val, width, intf.msg_nocr, intf.msg, prefix=f"{name} =")
+            pp(
+                val,
+                width,
+                intf.msg_nocr,
+                intf.msg,
+                prefix=f"{name} =",
+                variables=proc_obj.variables,
+            )
             pass
 
         deparsed, node_info = deparse_offset(frame.f_code, name, frame.f_lasti, None)
@@ -668,6 +780,7 @@ if __name__ == "__main__":
     print("frame count: %d" % count1)
     assert count1 == count_frames(frame)
     print("frame count: %d" % count_frames(frame.f_back))
+    print("frame depth cache:", FrameInfo.stats())
     # print("def statement: x=5?: %s" % repr(is_def_stmt("x=5", frame)))
     # # Not a "def" statement because frame is wrong spot
     # print(is_def_stmt("def foo():", frame))
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Looking at values in the debugged program a piece at a time.
+
+Formatting all of a big value, like a list with millions of entries,
+can stop the debugged program for seconds and produce megabytes of
+output. Instead, a value is described by its type, its length and a
+short preview. A value that has children, such as the items of a list
+or the attributes of an object, is also given a handle: a number that
+can be used to fetch its children a page at a time, with an offset and
+a count. Children that have children of their own get handles too.
+
+Handles are good only while the program is stopped; the command
+processor clears them when the program is resumed.
+"""
+
+import itertools
+from collections.abc import Mapping
+from reprlib import Repr
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Number of children given when no count is asked for.
+PAGE_SIZE = 100
+
+# Values with more items than this are big enough that we should show
+# a preview and a handle rather than all of them.
+LARGE_COUNT = 1000
+
+# Types whose values we never break down into children.
+ATOMIC_TYPES = (bool, bytes, bytearray, complex, float, int, str, type(None))
+
+
+def attribute_names(value) -> List[str]:
+    try:
+        return sorted(vars(value))
+    except TypeError:
+        return []
+
+
+def safe_len(value) -> Optional[int]:
+    """Return len(value), or None if it has no length or len() fails."""
+    if not hasattr(value, "__len__"):
+        return None
+    try:
+        return len(value)
+    except Exception:
+        return None
+
+
+def is_large(value) -> bool:
+    """Return True if `value` has so many children that it shouldn't be
+    formatted all at once."""
+    if isinstance(value, ATOMIC_TYPES):
+        return False
+    length = safe_len(value)
+    return length is not None and length > LARGE_COUNT
+
+
+def has_children(value) -> bool:
+    if isinstance(value, ATOMIC_TYPES):
+        return False
+    length = safe_len(value)
+    if length is not None:
+        return length > 0
+    return len(attribute_names(value)) > 0
+
+
+def child_items(value, offset: int, count: int) -> List[Tuple[str, Any]]:
+    """Return up to `count` (name, value) pairs for the children of
+    `value`, starting at child `offset`. Only the children asked for
+    are looked at; the rest of `value` is not touched."""
+    end = offset + count
+    if isinstance(value, Mapping):
+        return [
+            (repr(key), item)
+            for key, item in itertools.islice(value.items(), offset, end)
+        ]
+    if isinstance(value, (list, tuple, range)):
+        return [
+            ("[%d]" % i, item)
+            for i, item in zip(range(offset, end), value[offset:end])
+        ]
+    if isinstance(value, (set, frozenset)):
+        return [
+            ("{%d}" % i, item)
+            for i, item in zip(range(offset, end), itertools.islice(value, offset, end))
+        ]
+    length = safe_len(value)
+    if length is not None:
+        # Table-like values, such as those in pandas, are indexed by
+        # position through "iloc".
+        getter = getattr(value, "iloc", value)
+        items = []
+        for i in range(offset, min(end, length)):
+            try:
+                items.append(("[%d]" % i, getter[i]))
+            except Exception as e:
+                items.append(("[%d]" % i, e))
+            pass
+        return items
+    items = []
+    for name in attribute_names(value)[offset:end]:
+        try:
+            items.append((name, getattr(value, name)))
+        except Exception as e:
+            items.append((name, e))
+        pass
+    return items
+
+
+class VariableStore:
+    """Hands out handles for values that have children, and fetches
+    their children a page at a time."""
+
+    def __init__(self, repr_fn: Optional[Callable[[Any], str]] = None):
+        if repr_fn is None:
+            repr_fn = Repr().repr
+        self.repr_fn = repr_fn
+        self.clear()
+        return
+
+    def add(self, value) -> int:
+        """Return a handle for `value`. A value given more than once
+        gets the same handle."""
+        handle = self.by_id.get(id(value))
+        if handle is None or self.handles[handle] is not value:
+            self.next_handle += 1
+            handle = self.next_handle
+            self.handles[handle] = value
+            self.by_id[id(value)] = handle
+        return handle
+
+    def children(
+        self, handle: int, offset: int = 0, count: int = PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """Describe the children of the value with `handle`, `count`
+        of them starting at `offset`. KeyError is raised if the handle
+        is unknown, for example because the program has been resumed
+        since it was given out."""
+        value = self.get(handle)
+        offset = max(offset, 0)
+        count = max(count, 0)
+        return {
+            "handle": handle,
+            "offset": offset,
+            "length": safe_len(value),
+            "children": [
+                self.describe(child, name)
+                for name, child in child_items(value, offset, count)
+            ],
+        }
+
+    def clear(self):
+        """Forget all handles."""
+        self.handles: Dict[int, Any] = {}
+        self.by_id: Dict[int, int] = {}
+        self.next_handle = 0
+        return
+
+    def describe(self, value, name: Optional[str] = None) -> Dict[str, Any]:
+        """Return the type, length and a short preview of `value`, and
+        a handle if it has children."""
+        try:
+            preview = self.repr_fn(value)
+        except Exception as e:
+            preview = "<repr failed: %s>" % e.__class__.__name__
+        info = {
+            "type": type(value).__name__,
+            "length": safe_len(value),
+            "preview": preview,
+            "handle": self.add(value) if has_children(value) else None,
+        }
+        if name is not None:
+            info["name"] = name
+        return info
+
+    def get(self, handle: int):
+        """Return the value with `handle`. KeyError is raised if there
+        is none."""
+        if handle not in self.handles:
+            raise KeyError("No value with handle %s; it may have expired." % handle)
+        return self.handles[handle]
+
+    pass
+
+
+# Demo
+if __name__ == "__main__":
+    store = VariableStore()
+    big = list(range(10_000_000))
+    info = store.describe(big, "big")
+    print(info)
+    print(store.children(info["handle"], 5_000_000, 3))
+    print(store.describe({"a": [1, 2], "b": 3}))
+    print(store.children(2))
+    store.clear()
+    try:
+        store.children(1)
+    except KeyError as e:
+        print(e)
+    pass
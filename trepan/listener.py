@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Wait for a remote client in the background, and only then start
+debugging.
+
+Until a client connects, the program runs without any trace hook
+installed. When one does, the debugger is started and a chosen thread,
+by default the main thread, stops at its next event.
+
+With sys.monitoring (Python 3.12 and later), events are turned on for
+all threads from the listening thread. Before that, sys.settrace() only
+affects the thread that calls it, so the main thread is sent a signal
+and starts tracing itself in the signal handler. In that case only the
+main thread can be stopped.
+"""
+
+import signal
+import sys
+import threading
+from typing import Optional, Union
+
+from trepan.debugger import Trepan
+from trepan.inout.tcpserver import TCPServer
+from trepan.interfaces.server import ServerInterface
+from trepan.lib.default import DEBUGGER_SETTINGS
+from trepan.lib.monitor import HAVE_MONITORING
+from trepan.lib.sighandler import ORIG_SET_SIGNAL
+
+# Signal used to get the main thread to start tracing itself when we
+# don't have sys.monitoring.
+DEFAULT_SIGNAL = getattr(signal, "SIGUSR1", None)
+
+
+class RemoteListener:
+    """Listen for a remote debugger client on a background thread. See
+    trepan.api.listen()."""
+
+    def __init__(
+        self,
+        connection_opts: dict,
+        thread: Optional[Union[threading.Thread, int]] = None,
+        stop_all: bool = True,
+        start_opts: Optional[dict] = None,
+        signum: Optional[int] = DEFAULT_SIGNAL,
+    ):
+        if thread is None:
+            thread = threading.main_thread()
+        self.thread_id = thread.ident if isinstance(thread, threading.Thread) else thread
+        self.start_opts = dict(start_opts or {})
+        self.use_monitoring = HAVE_MONITORING
+        self.signum = signum
+        self.old_handler = None
+
+        if not self.use_monitoring:
+            main_thread = threading.main_thread()
+            if self.thread_id != main_thread.ident:
+                raise ValueError(
+                    "Before Python 3.12, only the main thread can be stopped on attach"
+                )
+            if threading.current_thread() is not main_thread or signum is None:
+                raise ValueError(
+                    "Before Python 3.12, listen() must be called from the main thread "
+                    "and needs a signal to use"
+                )
+            # This signal is ours, not the program's, so keep the
+            # debugger's signal handling out of it.
+            self.old_handler = ORIG_SET_SIGNAL(signum, self._on_signal)
+
+        settings = DEBUGGER_SETTINGS.copy()
+        settings["thread_policy"] = "stop-all" if stop_all else "stop-this-only"
+        server_opts = dict(connection_opts)
+        server_opts["open"] = True
+        self.server = TCPServer(opts=server_opts)
+        self.intf = ServerInterface(inout=self.server)
+        self.debugger = Trepan({"interface": self.intf, "settings": settings})
+        core = self.debugger.core
+        # Don't stop anywhere until a client connects; and never in the
+        # code here.
+        core.step_ignore = -1
+        core.add_ignore(RemoteListener)
+
+        self.thread = threading.Thread(
+            target=self._wait_for_client, name="trepan3k-listener", daemon=True
+        )
+        self.thread.start()
+        return
+
+    @property
+    def port(self) -> int:
+        return self.server.PORT
+
+    def close(self):
+        """Stop listening. If a client is connected, it is disconnected."""
+        self.intf.close()
+        if (
+            self.old_handler is not None
+            and threading.current_thread() is threading.main_thread()
+        ):
+            ORIG_SET_SIGNAL(self.signum, self.old_handler)
+            self.old_handler = None
+        return
+
+    def _wait_for_client(self):
+        try:
+            self.server.wait_for_connect()
+        except OSError:
+            # We were closed.
+            return
+        self.attach()
+        return
+
+    def attach(self):
+        """Start debugging and stop the target thread."""
+        core = self.debugger.core
+        if self.use_monitoring:
+            core.request_stop(self.thread_id)
+            start_opts = dict(self.start_opts)
+            start_opts["backend"] = "monitoring"
+            core.start(start_opts)
+        else:
+            signal.pthread_kill(self.thread_id, self.signum)
+        return
+
+    def _on_signal(self, _signum, frame):
+        """Runs in the main thread: start tracing it and stop."""
+        core = self.debugger.core
+        core.start(self.start_opts)
+        # sys.settrace() only traces frames called from now on. Have
+        # the interrupted frames traced as well.
+        trace_func = sys.gettrace()
+        while frame is not None:
+            frame.f_trace = trace_func
+            frame = frame.f_back
+        core.request_stop(threading.get_ident())
+        return
+
+    pass
+
+
+# Demo: run this, then connect with trepan3kc --port 1955.
+if __name__ == "__main__":
+    import time
+
+    listener = RemoteListener({"IO": "TCP", "PORT": 1955})
+    print("Listening on port %s" % listener.port)
+    count = 0
+    while True:
+        count += 1
+        time.sleep(0.5)
@@ -96,6 +96,18 @@ def process_options(pkg_version: str, sys_argv: list, option_list=None):
         default=False,
         help="Show functions before executing them.",
     )
+    optparser.add_option(
+        "--backend",
+        dest="backend",
+        action="store",
+        type="choice",
+        choices=["settrace", "monitoring"],
+        metavar="{settrace|monitoring}",
+        default="settrace",
+        help="Get events through sys.settrace(), or through "
+        "sys.monitoring, which costs less while no breakpoints are hit. "
+        "sys.monitoring needs Python 3.12 or later.",
+    )
     optparser.add_option(
         "--basename",
         dest="basename",
@@ -231,6 +243,17 @@ def process_options(pkg_version: str, sys_argv: list, option_list=None):
         default=True,
         help="First stop should not be in __main__.",
     )
+    optparser.add_option(
+        "--machine",
+        dest="machine",
+        action="store",
+        type="choice",
+        choices=["json", "msgpack"],
+        metavar="{json|msgpack}",
+        default=None,
+        help="Talk to a front end on stdin and stdout using JSON lines "
+        "or msgpack messages rather than text.",
+    )
     optparser.add_option(
         "--post-mortem",
         dest="post_mortem",
@@ -282,6 +305,37 @@ def process_options(pkg_version: str, sys_argv: list, option_list=None):
         help='Out-of-process or "headless" server-connection mode.',
     )
 
+    optparser.add_option(
+        "--compress",
+        dest="compress",
+        action="store_true",
+        default=False,
+        help="With --server, listen on TCP, or with --unix on a "
+        "Unix-domain socket, and compress the connection if the client "
+        "asks for it with trepan3kc --compress.",
+    )
+
+    optparser.add_option(
+        "--client-timeout",
+        dest="client_timeout",
+        default=None,
+        action="store",
+        type="int",
+        metavar="SECONDS",
+        help="With a socket server, decide that a client sending keepalive "
+        "messages has gone away when it hasn't been heard from in SECONDS "
+        "seconds, and wait for it to reconnect. The default is 30.",
+    )
+
+    optparser.add_option(
+        "--unix",
+        dest="unix",
+        action="store_true",
+        default=False,
+        help="With --server, listen on a Unix-domain socket found "
+        "by process id. Connect with trepan3kc --pid.",
+    )
+
     optparser.add_option(
         "--style",
         dest="style",
@@ -381,6 +435,17 @@ def process_options(pkg_version: str, sys_argv: list, option_list=None):
         )
         opts.edit_mode = "emacs"
 
+    if opts.backend == "monitoring" and sys.version_info < (3, 12):
+        sys.stderr.write(
+            "Option --backend=monitoring needs Python 3.12 or later; "
+            'using "settrace".\n'
+        )
+        opts.backend = "settrace"
+
+    if opts.unix and not opts.server:
+        sys.stderr.write("Option --unix requires --server.\n")
+        sys.exit(1)
+
     readline = (
         "prompt_toolkit"
         if hasattr(opts, "use_prompt_toolkit") and opts.use_prompt_toolkit
@@ -15,8 +15,8 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import inspect
-from dis import findlinestarts
 from pyficache import code_line_info
+from trepan.lib.bytecode import code_index
 from trepan.misc import wrapped_lines, pretty_modfunc_name
 from trepan.lib.format import format_line_number, format_offset
 from trepan.lib.stack import get_column_start_from_code
@@ -55,8 +55,7 @@ def set_break(
         if isinstance(func_or_code, str):
             func_or_code = code_map.get(func_or_code, func_or_code)
         if not line_info:
-            linestarts = dict(findlinestarts(cmd_obj.curframe.f_code))
-            if line_number not in linestarts.values():
+            if line_number not in code_index(cmd_obj.curframe.f_code).lines:
                 part1 = f"File {cmd_obj.core.filename(filename)}"
                 msg = wrapped_lines(
                     part1,
@@ -88,15 +87,19 @@ def set_break(
             assert False, "Need to fix up offset determination"
 
         pass
-    bp = cmd_obj.core.bpmgr.add_breakpoint(
-        filename,
-        line_number=line_number,
-        position=offset,
-        temporary=temporary,
-        condition=condition,
-        func_or_code=func_or_code,
-        is_code_offset = True,
-    )
+    try:
+        bp = cmd_obj.core.bpmgr.add_breakpoint(
+            filename,
+            line_number=line_number,
+            position=offset,
+            temporary=temporary,
+            condition=condition,
+            func_or_code=func_or_code,
+            is_code_offset = True,
+        )
+    except SyntaxError as e:
+        cmd_obj.errmsg(f"Syntax error in breakpoint condition {condition}: {e.msg}")
+        return False
     style = cmd_obj.settings["style"]
     if func_or_code and inspect.isfunction(func_or_code):
         formatted_bp_number = format_line_number(bp.number, style)
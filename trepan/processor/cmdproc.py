@@ -16,6 +16,7 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import builtins
 import importlib
 import inspect
 import linecache
@@ -39,9 +40,12 @@ import trepan.lib.display as Mdisplay
 import trepan.lib.file as Mfile
 from trepan.lib.stack import get_column_start_from_frame
 import trepan.lib.thred as Mthread
+import trepan.lib.variables as Mvariables
 import trepan.misc as Mmisc
+import trepan.processor.machine as Mmachine
 from trepan.interfaces.script import ScriptInterface
 from trepan.lib.bytecode import is_class_def, is_def_stmt
+from trepan.lib.source import mapped_source
 from trepan.processor.complete_rl import completer
 from trepan.processor.print import print_location
 from trepan.vprocessor import Processor
@@ -145,6 +149,18 @@ def resolve_name(obj, command_name) -> Optional[str]:
     return
 
 
+def split_format_suffix(obj, args: list) -> list:
+    """Return `args` with a gdb-style /FMT suffix on the command name,
+    as in "x/8xb buf", split off into the first argument. This is done
+    only for commands that take such a format."""
+    name, slash, suffix = args[0].partition("/")
+    if slash and name:
+        cmd_name = resolve_name(obj, name)
+        if cmd_name in obj.commands and obj.commands[cmd_name].format_suffix:
+            return [name, slash + suffix] + args[1:]
+    return args
+
+
 # Default settings for command processor method call
 DEFAULT_PROC_OPTS = {
     # A list of debugger initialization files to read on first command
@@ -223,6 +239,8 @@ class CommandProcessor(Processor):
         self._repr.maxset = 10
         self._repr.maxfrozen = 10
         self._repr.array = 10
+        # Handles for paging through big values; see "expand".
+        self.variables = Mvariables.VariableStore(lambda value: self._saferepr(value))
         self.stack = []
         self.thread_name = None
         self.frame_thread_name = None
@@ -266,6 +284,21 @@ class CommandProcessor(Processor):
                     i.input.session.completer = trepan3k_completer
         return
 
+    def _displayhook(self, value):
+        """sys.displayhook for expressions evaluated by the debugger.
+        Values too big to show in full get a preview and a handle for
+        "expand"."""
+        if value is None or not Mvariables.is_large(value):
+            self.saved_displayhook(value)
+            return
+        builtins._ = value
+        info = self.variables.describe(value)
+        self.msg(
+            f"{info['type']} of length {info['length']} = {info['preview']}"
+            f"  # use 'expand @{info['handle']}' to see more"
+        )
+        return
+
     def _saferepr(self, str, maxwidth=None):
         if maxwidth is None:
             maxwidth = self.debugger.settings["width"]
@@ -282,6 +315,7 @@ class CommandProcessor(Processor):
         if clear_remap:
             self.file2file_remap = {}
             pyficache.file2file_remap = {}
+        self.core.clear_canonic_cache()
 
     # To be overridden in derived debuggers
     def defaultFile(self) -> Optional[str]:
@@ -330,7 +364,11 @@ class CommandProcessor(Processor):
 
         filename = frame.f_code.co_filename
         self.list_lineno = frame.f_lineno
-        line = linecache.getline(filename, self.list_lineno, frame.f_globals)
+        source = mapped_source(filename)
+        if source is not None:
+            line = source.getline(self.list_lineno)
+        else:
+            line = linecache.getline(filename, self.list_lineno, frame.f_globals)
         if not line:
             opts = {
                 "output": "plain",
@@ -397,6 +435,8 @@ class CommandProcessor(Processor):
             # The setup for this should be elsewhere. Possibly
             # in interaction.
             global_vars = None
+        self.saved_displayhook = sys.displayhook
+        sys.displayhook = self._displayhook
         try:
             code = compile(line + "\n", f'"{line}"', "single")
             exec(code, global_vars, local_vars)
@@ -408,6 +448,8 @@ class CommandProcessor(Processor):
                 exc_type_name = t.__name__
             self.errmsg(f"{str(exc_type_name)}: {str(v)}")
             pass
+        finally:
+            sys.displayhook = self.saved_displayhook
         return
 
     def get_an_int(
@@ -516,7 +558,8 @@ class CommandProcessor(Processor):
         return
 
     def is_using_prompt_toolkit(self) -> bool:
-        return self.intf[-1].input.session is not None
+        # Remote connections have no prompt_toolkit session.
+        return getattr(self.intf[-1].input, "session", None) is not None
 
     def ok_for_running(self, cmd_obj, name, nargs):
         """We separate some of the common debugger command checks here:
@@ -551,9 +594,14 @@ class CommandProcessor(Processor):
 
     def process_commands(self):
         """Handle debugger commands."""
+        # Remote interfaces batch output while we are stopped.
+        self.intf[-1].hold_output()
         if self.core.execution_status != "No program":
             self.setup()
-            self.location()
+            if getattr(self.intf[-1], "structured", False):
+                self.intf[-1].event("stop", Mmachine.stop_info(self))
+            else:
+                self.location()
             pass
         else:
             self.list_object = None
@@ -590,8 +638,21 @@ class CommandProcessor(Processor):
                 pass
             pass
         run_hooks(self, self.postcmd_hooks)
-        if self.fast_continue:
+        # Values can change once the program runs, so handles given out
+        # while we were stopped are no longer good.
+        self.variables.clear()
+        # Settings may have changed while we were stopped.
+        self.core.update_dispatch_plan()
+        if self.core.monitor is not None:
+            # The sys.monitoring backend only reports the events that
+            # the breakpoints and stepping state call for, so there is
+            # no hook to remove. Just recompute the events needed.
+            self.core.monitor.rearm(self.frame)
+        elif self.fast_continue:
             if len(self.core.bpmgr.bplist) == 0:
+                # We may have been tracing only breakpoints; forget that
+                # before the trace hook goes.
+                self.core.trace_all(None)
                 # Remove tracing on frames and remove trace hook.
                 frame = self.curframe
                 while frame:
@@ -600,8 +661,17 @@ class CommandProcessor(Processor):
                 self.debugger.intf[-1].msg("Fast continue...")
                 remove_hook(self.core.trace_dispatch, True)
             else:
+                # Trace only frames whose code has breakpoints.
+                self.core.trace_only_breakpoints(self.frame)
                 self.debugger.intf[-1].msg("Continue with breakpoint checking...")
+        else:
+            # We may be stepping after having stopped at a breakpoint
+            # that we reached while only tracing breakpoints.
+            self.core.trace_all(self.frame)
 
+        # Remote interfaces batch output; send what is left, including
+        # the messages above, before the program runs again.
+        self.intf[-1].flush()
         return
 
     def process_command(self):
@@ -681,6 +751,7 @@ class CommandProcessor(Processor):
                         return False
                     pass
 
+                args = split_format_suffix(self, args)
                 self.cmd_name = args[0]
                 cmd_name = resolve_name(self, self.cmd_name)
                 if cmd_name is not None and cmd_name.find(" ") > 0:
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#  Copyright (C) 2009, 2013, 2015, 2018-2020, 2024 Rocky Bernstein
+#  Copyright (C) 2009, 2013, 2015, 2018-2020, 2024, 2026 Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
 #  it under the terms of the GNU General Public License as published by
@@ -19,6 +19,7 @@ from getopt import getopt, GetoptError
 # Our local modules
 from trepan.processor.command.base_cmd import DebuggerCommand
 from trepan.lib.stack import print_stack_trace
+import trepan.processor.machine as Mmachine
 
 
 class BacktraceCommand(DebuggerCommand):
@@ -115,6 +116,7 @@ class BacktraceCommand(DebuggerCommand):
         print_stack_trace(
             self.proc, count, style=self.settings["style"], opts=bt_opts
         )
+        self.result(lambda: Mmachine.stack_info(self.proc, count))
         return False
 
     pass
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#  Copyright (C) 2009-2010, 2012-2013, 2015, 2021, 2023-2025
+#  Copyright (C) 2009-2010, 2012-2013, 2015, 2021, 2023-2026
 #  Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
@@ -71,6 +71,10 @@ class DebuggerCommand:
     aliases: tuple = ()
     name: str = "YourCommandName"
 
+    # True if, as in gdb, a /FMT format can follow the command name with
+    # no blank in between, e.g. "x/8xb buf".
+    format_suffix: bool = False
+
     def columnize_commands(self, commands):
         """List commands arranged in an aligned columns"""
         commands.sort()
@@ -124,6 +128,15 @@ class DebuggerCommand:
         )
         return self.msg(text)
 
+    def result(self, make_data):
+        """Give the data returned by `make_data()` as the result of the
+        command, if the interface is one that wants data. `make_data` is
+        called only then."""
+        intf = self.debugger.intf[-1]
+        if getattr(intf, "structured", False):
+            intf.result(make_data())
+        return
+
     def run(self, args):
         """The method that implements the debugger command.
         Help on the command comes from the docstring of this method.
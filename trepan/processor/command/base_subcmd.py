@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 #
 #   Copyright (C) 2009-2010, 2012-2013, 2015-2016, 2020,
-#   2023-2025 Rocky Bernstein
+#   2023-2026 Rocky Bernstein
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -120,6 +120,10 @@ class DebuggerSubcommand:
     aliases: Tuple[str] = tuple()
     name: str = "YourSubCommandName"
 
+    def result(self, make_data):
+        """Convenience short-hand for self.cmd.result(make_data)"""
+        return self.cmd.result(make_data)
+
     def rst_msg(self, text):
         """Convenience short-hand for self.proc.rst_msg(text)"""
         return self.proc.rst_msg(text)
@@ -53,9 +53,14 @@ class ConditionCommand(DebuggerCommand):
             condition = " ".join(args[2:])
         else:
             condition = None
-            self.msg(f"Breakpoint {bp.number} is now unconditional.")
             pass
-        bp.condition = condition
+        try:
+            bp.condition = condition
+        except SyntaxError as e:
+            self.errmsg(f"Syntax error in condition {condition}: {e.msg}")
+            return
+        if condition is None:
+            self.msg(f"Breakpoint {bp.number} is now unconditional.")
         return
 
 
@@ -75,5 +80,6 @@ if __name__ == "__main__":
     brkcmd.run(["break"])
     command.run(["condition", "1"])
     command.run(["condition", "1", "x", ">", "10"])
+    command.run(["condition", "1", "x", ">"])
     command.run(["condition", "1"])
     pass
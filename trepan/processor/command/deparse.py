@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#  Copyright (C) 2015-2018, 2020-2021, 2023-2024 Rocky Bernstein
+#  Copyright (C) 2015-2018, 2020-2021, 2023-2024, 2026 Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
 #  it under the terms of the GNU General Public License as published by
@@ -28,7 +28,7 @@ if sys.version_info[:2] < (3, 9):
     else:
         from uncompyle6.semantics.fragments import code_deparse
 
-    from trepan.lib.deparse import deparse_and_cache, deparse_offset
+    from trepan.lib.deparse import deparse_and_cache, deparse_offset, is_pending
 
 
 # Our local modules
@@ -50,7 +50,12 @@ class DeparseCommand(DebuggerCommand):
     we use the current frame offset. If `-p` is given, include parent information.
 
     If an '.' argument is given, deparse the entire function or main
-    program you are in.
+    program you are in. Deparsed functions are kept on disk under
+    `tempdir`, so they don't have to be deparsed again. When a
+    compiled program without source is debugged, its functions are
+    deparsed in the background; until a function is done, its
+    disassembly is shown instead. The directory is not used unless it
+    belongs to you and only you can read and write it.
 
     Output is colorized the same as source listing. Use `set highlight plain` to turn
     that off.
@@ -128,6 +133,10 @@ class DeparseCommand(DebuggerCommand):
         pass
         nodeInfo = None
 
+        if is_pending(co):
+            self.msg(f"{co.co_name} is still being deparsed; disassembling.")
+            self.proc.commands["disassemble"].run(["disassemble", "."])
+            return
         if len(args) >= 1 and args[0] == ".":
             temp_filename, _ = deparse_and_cache(
                 co, self.errmsg, tempdir=self.settings["tempdir"]
@@ -65,7 +65,11 @@ class DisplayCommand(DebuggerCommand):
                 format = None
                 expr = " ".join(args[1:])
                 pass
-            dp = self.proc.display_mgr.add(self.proc.curframe, expr, format)
+            try:
+                dp = self.proc.display_mgr.add(self.proc.curframe, expr, format)
+            except SyntaxError as e:
+                self.errmsg(f'Syntax error in display expression "{expr}": {e.msg}')
+                return
             if dp is None:
                 self.errmsg('Error evaluating "%s" in the current frame' % expr)
                 return
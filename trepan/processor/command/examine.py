@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013-2015, 2020 Rocky Bernstein
+#   Copyright (C) 2009, 2013-2015, 2020, 2026 Rocky Bernstein
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -16,22 +16,44 @@
 
 # Our local modules
 from trepan.processor.command.base_cmd import DebuggerCommand
-from trepan.lib.printing import print_obj
+from trepan.lib.printing import dump_memory, parse_memory_format, print_obj
 
 
 class ExamineCommand(DebuggerCommand):
     """**examine** *expr1* [*expr2* ...]
 
+    **examine** /*NFU* *expr* [*offset*]
+
     Examine value, type and object attributes of an expression.
 
     In contrast to normal Python expressions, expressions should not have
     blanks which would cause shlex to see them as different tokens.
 
+    In the second form, as in gdb's "x" command, show the memory of
+    *expr*, which can be anything with a buffer, such as bytes,
+    bytearray, memoryview, array.array or mmap. The dump starts *offset*
+    bytes in, by default 0. Only the bytes shown are looked at, so this
+    works on buffers of any size. Each of *N*, *F* and *U* is optional:
+
+    * *N* is the number of units to show, by default 64
+
+    * *F* is the format of each unit: 'x' hex, 'd' signed decimal, 'u'
+      unsigned decimal, or 'o' octal. The default is 'x'
+
+    * *U* is the unit size: 'b' bytes, 'h' halfwords (2 bytes), 'w'
+      words (4 bytes), or 'g' giant words (8 bytes). The default is 'b'
+
+    As in gdb, the format can also be attached to the command name, as
+    in "x/8xb buf". Each line gives the offset, the units, and the bytes
+    as ASCII. Units bigger than a byte are in this computer's byte order.
+
     Examples:
     ---------
 
-        examine x+1   # ok
-        examine x + 1 # not ok
+        examine x+1          # ok
+        examine x + 1        # not ok
+        x /32xb buf 1024     # 32 bytes of buf in hex, from offset 1024
+        x/4dw data           # first four 4-byte integers of data
 
     See also:
     ---------
@@ -39,6 +61,7 @@ class ExamineCommand(DebuggerCommand):
     `pr`, `pp`, and `whatis`."""
 
     aliases = ("x",)
+    format_suffix = True
     short_help = "Examine value, type, and object attributes " "of an expression"
 
     DebuggerCommand.setup(
@@ -49,12 +72,46 @@ class ExamineCommand(DebuggerCommand):
     )
 
     def run(self, args):
+        if len(args) > 1 and args[1].startswith("/"):
+            return self.dump(args)
         for arg in args[1:]:
             s = print_obj(arg, self.proc.curframe)
             self.msg(s)
             pass
         return
 
+    def dump(self, args):
+        """Show memory, for "examine /NFU expr [offset]"."""
+        if len(args) not in (3, 4):
+            self.errmsg("Expecting a format, an expression and an optional offset.")
+            return
+        try:
+            count, letter, unit = parse_memory_format(args[1])
+        except ValueError as e:
+            self.errmsg(str(e))
+            return
+        offset = self.proc.get_int(
+            args[3] if len(args) == 4 else None, default=0, cmdname="examine"
+        )
+        if offset is None:
+            return
+        obj = self.proc.eval(args[2])
+        try:
+            lines = dump_memory(obj, offset, count, letter, unit)
+        except TypeError:
+            self.errmsg(
+                "%s has no buffer to examine; it is a %s."
+                % (args[2], type(obj).__name__)
+            )
+            return
+        except ValueError as e:
+            self.errmsg(str(e))
+            return
+        for line in lines:
+            self.msg(line)
+            pass
+        return
+
     pass
 
 
@@ -72,4 +129,8 @@ if __name__ == "__main__":
     command.run(["examine", "me"])
     print("=" * 30)
     command.run(["examine", "DebuggerCommand"])
+    print("=" * 30)
+    buf = bytearray(b"Hello, world!" * 100)
+    command.run(["examine", "/40xb", "buf", "7"])
+    command.run(["examine", "/4uw", "buf"])
     pass
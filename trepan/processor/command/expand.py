@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.lib.variables import PAGE_SIZE
+from trepan.processor.command.base_cmd import DebuggerCommand
+from trepan.processor.complete_rl import complete_identifier
+
+
+class ExpandCommand(DebuggerCommand):
+    """**expand** *expression*
+
+    **expand** @*handle* [*offset* [*count*]]
+
+    Show the type, length and a short preview of the value of
+    *expression*, followed by its first children: the items of a list or
+    dictionary, or the attributes of an object.
+
+    Values that have children are given a handle, shown as @*handle*.
+    Give a handle to see the children of that value; *offset* says which
+    child to start at, and *count* how many to show. The default count is
+    100. Only the children shown are looked at, so this is a way to go
+    through lists and tables too big to print.
+
+    Handles are good only until the program is resumed.
+
+    Examples:
+    ---------
+
+        expand big_list         # first 100 items of big_list
+        expand @1 5000000 10    # items 5000000 to 5000009 of handle 1
+        expand @3               # children of a child shown above
+
+    See also:
+    ---------
+
+    `pp` and `examine`."""
+
+    short_help = "Page through the children of a value"
+
+    complete = complete_identifier
+
+    DebuggerCommand.setup(locals(), category="data", min_args=1, need_stack=True)
+
+    def run(self, args):
+        variables = self.proc.variables
+        if args[1].startswith("@"):
+            if len(args) > 4:
+                self.errmsg("Expecting at most a handle, an offset and a count.")
+                return False
+            handle = self.proc.get_an_int(
+                args[1][1:], "Expecting a handle number after @; got %s." % args[1]
+            )
+            if handle is None:
+                return False
+            offset = self.proc.get_int(
+                args[2] if len(args) > 2 else None, default=0, cmdname="expand"
+            )
+            count = self.proc.get_int(
+                args[3] if len(args) > 3 else None,
+                default=PAGE_SIZE,
+                cmdname="expand",
+            )
+            if offset is None or count is None:
+                return False
+            try:
+                page = variables.children(handle, offset, count)
+            except KeyError as e:
+                self.errmsg(e.args[0])
+                return False
+        else:
+            value = self.proc.eval(self.proc.cmd_argstr)
+            info = variables.describe(value)
+            self.msg(self.format_info(self.proc.cmd_argstr, info))
+            if info["handle"] is None:
+                self.result(lambda: info)
+                return False
+            page = variables.children(info["handle"], 0, PAGE_SIZE)
+            page["value"] = info
+
+        for child in page["children"]:
+            self.msg("  " + self.format_info(child["name"], child))
+            pass
+        shown = page["offset"] + len(page["children"])
+        if page["length"] is not None and shown < page["length"]:
+            self.msg(
+                "  ... %d more; use 'expand @%d %d' to see them."
+                % (page["length"] - shown, page["handle"], shown)
+            )
+        self.result(lambda: page)
+        return False
+
+    @staticmethod
+    def format_info(name, info) -> str:
+        """Format the description of a value in the way "expand"
+        shows it."""
+        text = "%s: %s" % (name, info["type"])
+        if info["length"] is not None:
+            text += " of length %d" % info["length"]
+        if info["handle"] is not None:
+            text += " @%d" % info["handle"]
+        return "%s = %s" % (text, info["preview"])
+
+    pass
+
+
+if __name__ == "__main__":
+    import inspect
+
+    from trepan.processor.command import mock
+
+    d, cp = mock.dbg_setup()
+    cp.curframe = inspect.currentframe()
+    command = ExpandCommand(cp)
+    big = list(range(1000))
+    cp.cmd_argstr = "big"
+    command.run(["expand", "big"])
+    command.run(["expand", "@1", "998"])
+    pass
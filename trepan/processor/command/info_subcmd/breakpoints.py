@@ -19,6 +19,7 @@ from trepan.processor.complete_rl import complete_bpnumber
 
 # Our local modules
 from trepan.processor.command import base_subcmd as Mbase_subcmd
+import trepan.processor.machine as Mmachine
 
 
 class InfoBreakpoints(Mbase_subcmd.DebuggerSubcommand):
@@ -140,6 +141,7 @@ class InfoBreakpoints(Mbase_subcmd.DebuggerSubcommand):
         else:
             self.msg("No breakpoints.")
             pass
+        self.result(lambda: Mmachine.breakpoint_info(bpmgr))
         return
 
     pass
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.lib.disassemble import DisasmCache
+from trepan.lib.source import SourceCache
+from trepan.lib.stack import FrameInfo
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+
+class InfoCache(DebuggerSubcommand):
+    """**info cache**
+
+    Show the sizes, and the hit and miss counts, of caches that the
+    debugger uses to speed up event handling:
+
+    * **file names**: canonic file names, after file name substitution,
+      by file name and by code object
+
+    * **frame depths**: stack depths of frames, used by `next` and `finish`
+
+    * **disassembly**: decoded and formatted instructions of code
+      objects, used by `disassemble` and `set autodisasm`
+
+    * **highlighted source**: syntax-highlighted lines of source files,
+      by highlight mode and style, used by `list`, `backtrace -s` and
+      the location shown when the program stops
+
+    See also:
+    ---------
+
+    `info files`, `set substitute`"""
+
+    min_abbrev = 2  # Need at least info "ca"
+    max_args = 0
+    need_stack = False
+    short_help = "Show debugger cache statistics"
+
+    def run(self, args):
+        stats = self.core.canonic_cache_stats()
+        self.section("File names")
+        self.msg(
+            f"{stats['files']} file names, {stats['code objects']} code objects; "
+            f"{stats['hits']} hits, {stats['misses']} misses"
+        )
+        stats = FrameInfo.stats()
+        self.section("Frame depths")
+        self.msg(
+            f"{stats['size']} of at most {stats['maxsize']} frames; "
+            f"{stats['hits']} hits, {stats['misses']} misses"
+        )
+        stats = DisasmCache.stats()
+        self.section("Disassembly")
+        self.msg(
+            f"{stats['size']} of at most {stats['maxsize']} code objects; "
+            f"{stats['hits']} hits, {stats['misses']} misses"
+        )
+        stats = SourceCache.stats()
+        self.section("Highlighted source")
+        self.msg(
+            f"{stats['size']} of at most {stats['maxsize']} files; "
+            f"{stats['hits']} hits, {stats['misses']} misses"
+        )
+        return
+
+    pass
+
+
+if __name__ == "__main__":
+    from trepan.processor.command import mock, info as Minfo
+
+    d, cp = mock.dbg_setup()
+    i = Minfo.InfoCommand(cp)
+    sub = InfoCache(i)
+    sub.run([])
+    pass
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013, 2015 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2009, 2013, 2015, 2026 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -17,6 +17,7 @@
 
 # Our local modules
 from trepan.processor.command import base_subcmd as Mbase_subcmd
+import trepan.processor.machine as Mmachine
 
 
 class InfoDisplay(Mbase_subcmd.DebuggerSubcommand):
@@ -34,6 +35,7 @@ class InfoDisplay(Mbase_subcmd.DebuggerSubcommand):
 
     def run(self, args):
         lines = self.proc.display_mgr.all()
+        self.result(lambda: Mmachine.display_info(self.proc))
         if 0 == len(lines):
             self.errmsg("There are no auto-display expressions now.")
             return
@@ -55,6 +57,6 @@ if __name__ == "__main__":
 
     cp.curframe = inspect.currentframe()
     sub.run([])
-    sub.proc.display_mgr.add(cp.curframe, "/x i")
+    sub.proc.display_mgr.add(cp.curframe, "i", "/x")
     sub.proc.display_mgr.add(cp.curframe, "d")
     sub.run([])
@@ -58,6 +58,7 @@ class InfoGlobals(Mbase_subcmd.DebuggerSubcommand):
                     self.msg_nocr,
                     self.msg,
                     prefix=f"{name} =",
+                    variables=self.proc.variables,
                 )
                 pass
         else:
@@ -70,6 +71,7 @@ class InfoGlobals(Mbase_subcmd.DebuggerSubcommand):
                         self.msg_nocr,
                         self.msg,
                         prefix=f"{name} =",
+                        variables=self.proc.variables,
                     )
                     pass
                 else:
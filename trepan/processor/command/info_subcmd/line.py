@@ -18,12 +18,17 @@
 import inspect
 import os.path as osp
 import re
+import sys
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Tuple
 
 import columnize
 from pyficache import file2file_remap, get_linecache_info
 
 from trepan.clifns import search_file
+from trepan.lib.bytecode import code_index
 from trepan.lib.format import Filename, format_line_number, format_token
+from trepan.lib.source import mapped_source, source_size
 from trepan.misc import wrapped_lines
 from trepan.processor.cmdbreak import parse_break_cmd
 
@@ -53,6 +58,44 @@ def find_function(funcname, filename):
     return answer
 
 
+def code_line_info(
+    filename: str, frame: Optional[FrameType]
+) -> Dict[int, List[Tuple[CodeType, int]]]:
+    """Return a map from line number to the code objects and offsets
+    that start the line, like pyficache's line_info, for the code of
+    `filename` that we can find without compiling the file: that of
+    frames in the stack of `frame`, and the functions and methods of a
+    module loaded from `filename`. Code nested in these is included."""
+    path = osp.realpath(filename)
+    codes: List[CodeType] = []
+    while frame is not None:
+        if osp.realpath(frame.f_code.co_filename) == path:
+            codes.append(frame.f_code)
+        frame = frame.f_back
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, "__file__", None)
+        if not module_file or osp.realpath(module_file) != path:
+            continue
+        for obj in list(vars(module).values()):
+            objs = list(vars(obj).values()) if inspect.isclass(obj) else [obj]
+            for obj in objs:
+                code = getattr(getattr(obj, "__func__", obj), "__code__", None)
+                if isinstance(code, CodeType) and code.co_filename == module_file:
+                    codes.append(code)
+
+    line_info: Dict[int, List[Tuple[CodeType, int]]] = {}
+    seen = set()
+    while codes:
+        code = codes.pop()
+        if id(code) in seen:
+            continue
+        seen.add(id(code))
+        for line, offsets in code_index(code).line_offsets.items():
+            line_info.setdefault(line, []).extend((code, offset) for offset in offsets)
+        codes.extend(c for c in code.co_consts if isinstance(c, CodeType))
+    return line_info
+
+
 class InfoLine(DebuggerSubcommand):
     """**info line* [*location*]
 
@@ -60,6 +103,10 @@ class InfoLine(DebuggerSubcommand):
 
     If no location is given, use the the current stopped line.
 
+    For large source files, which are not read into memory, line
+    information comes from the code in the stack and in the loaded
+    module for the file, rather than from compiling the file.
+
     Examples
     --------
 
@@ -129,16 +176,31 @@ class InfoLine(DebuggerSubcommand):
             filename = search_file(remapped_filename, self.core.search_path, self.main_dirname)
             pass
 
-        linecache_info = get_linecache_info(remapped_filename)
-        if line_number not in linecache_info.line_numbers:
+        max_line = source_size(remapped_filename)
+        if max_line is not None and line_number > max_line:
             self.errmsg(
-                "No line information for line %d of %s" % (line_number, formatted_filename)
+                "Line %d is past the end of %s, which has %d lines"
+                % (line_number, formatted_filename, max_line)
             )
             return
 
+        if mapped_source(remapped_filename) is not None:
+            # Getting line information from pyficache would mean reading
+            # and compiling all of this large file. Use the code objects
+            # for the file that we can find instead.
+            line_info = code_line_info(remapped_filename, self.proc.curframe)
+        else:
+            linecache_info = get_linecache_info(remapped_filename)
+            if line_number not in linecache_info.line_numbers:
+                self.errmsg(
+                    "No line information for line %d of %s"
+                    % (line_number, formatted_filename)
+                )
+                return
+            line_info = linecache_info.line_info
+
         formatted_line_number = format_line_number(line_number, style)
         msg1 = "Line %s of %s" % (formatted_line_number, formatted_filename)
-        line_info = linecache_info.line_info
         line_number_offsets = line_info.get(line_number)
         if line_number_offsets:
             offset_data = [
@@ -15,10 +15,10 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import sys
-from dis import findlinestarts
 from getopt import getopt, GetoptError
 
 from trepan.processor.command.base_subcmd import DebuggerSubcommand
+from trepan.lib.bytecode import code_index
 from trepan.lib.format import Filename, format_line_number, format_offset, format_token
 from trepan.misc import pretty_modfunc_name
 from pyficache import file2file_remap, get_linecache_info
@@ -135,7 +135,7 @@ class InfoOffsets(DebuggerSubcommand):
         else:
             self.section(f"Line:   offset for table for {filename}")
             lines = []
-            for offset, line_number in findlinestarts(curframe.f_code):
+            for offset, line_number in code_index(curframe.f_code).linestarts.items():
                 lines.append("%4d: *%d" % (line_number, offset))
             m = self.columnize_commands(list(sorted(lines)))
             self.msg(m)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#   Copyright (C) 2008-2009, 2013, 2015, 2018, 2020, 2023-2024 Rocky
+#   Copyright (C) 2008-2009, 2013, 2015, 2018, 2020, 2023-2024, 2026 Rocky
 #   Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
@@ -23,6 +23,7 @@ from getopt import getopt, GetoptError
 from trepan.processor.command import base_subcmd as Mbase_subcmd
 from trepan.lib import pp as Mpp
 from trepan.lib.complete import complete_token
+import trepan.processor.machine as Mmachine
 
 # when the "with" statement is used, there
 # can be get variables having names
@@ -111,6 +112,7 @@ class InfoLocals(Mbase_subcmd.DebuggerSubcommand):
                     self.msg_nocr,
                     self.msg,
                     prefix=f"{name} =",
+                    variables=self.proc.variables,
                 )
                 pass
             pass
@@ -132,10 +134,16 @@ class InfoLocals(Mbase_subcmd.DebuggerSubcommand):
                         self.msg_nocr,
                         self.msg,
                         prefix=f"{name} =",
+                        variables=self.proc.variables,
                     )
                 else:
                     self.errmsg(f"{name} is not a local variable")
                     pass
+        self.result(
+            lambda: Mmachine.locals_info(
+                self.proc, args if args and args[0] != "*" else None
+            )
+        )
         return False
 
     pass
@@ -16,8 +16,7 @@
 
 import inspect
 
-from xdis import findlinestarts
-
+from trepan.lib.bytecode import code_index
 from trepan.lib.disassemble import disassemble_bytes
 from trepan.lib.format import format_offset
 from trepan.misc import wrapped_lines
@@ -74,7 +73,7 @@ class InfoPC(DebuggerSubcommand):
                     constants=code.co_consts,
                     cells=code.co_cellvars,
                     freevars=code.co_freevars,
-                    line_starts=dict(findlinestarts(code)),
+                    line_starts=code_index(code).linestarts,
                     style=style,
                     end_offset=offset + 10,
                 )
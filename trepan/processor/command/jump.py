@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#  Copyright (C) 2009, 2013, 2015, 2020, 2023-2025 Rocky Bernstein
+#  Copyright (C) 2009, 2013, 2015, 2020, 2023-2026 Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
 #  it under the terms of the GNU General Public License as published by
@@ -16,11 +16,11 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import inspect
 import os
-from dis import findlinestarts
 
 from trepan.processor.cmdproc import print_location
 
 # Our local modules
+from trepan.lib.bytecode import code_index
 from trepan.lib.stack import get_column_start_from_frame
 from trepan.processor.command.base_cmd import DebuggerCommand
 
@@ -84,8 +84,7 @@ class JumpCommand(DebuggerCommand):
         if lineno is None:
             return False
 
-        linestarts = dict(findlinestarts(self.proc.curframe.f_code))
-        if lineno not in linestarts.values():
+        if lineno not in code_index(self.proc.curframe.f_code).lines:
             self.warnmsg(f"code for line {lineno} not found. Results may be unpredictable.")
 
         try:
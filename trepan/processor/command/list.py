@@ -24,13 +24,19 @@ import pyficache
 # Our local modules
 from pygments.console import colorize
 
+from trepan.lib.source import SourceCache, source_size
 from trepan.processor.cmdlist import INVALID_PARSE_LIST, parse_list_cmd
 
 # Our local modules
 from trepan.processor.command.base_cmd import DebuggerCommand
 
 try:
-    from trepan.lib.deparse import deparse_cache
+    from trepan.lib.deparse import (
+        code_key,
+        deparse_cache,
+        is_pending,
+        read_deparse_cache,
+    )
 
     have_deparse = True
 except ImportError:
@@ -118,12 +124,21 @@ class ListCommand(DebuggerCommand):
         is_pyasm = pyficache.is_python_assembly_file(filename)
 
         # We now have range information. Do the listing.
-        max_line = pyficache.size(filename)
+        max_line = source_size(filename)
         if max_line is None:
             if have_deparse:
                 bytecode = curframe.f_code
 
-                if bytecode not in deparse_cache.keys():
+                # Say why we deparse only the first time: after that
+                # the deparse is in memory, on disk, or on its way.
+                if (
+                    bytecode not in deparse_cache
+                    and not is_pending(bytecode)
+                    and read_deparse_cache(
+                        code_key(bytecode), self.settings["tempdir"]
+                    )
+                    is None
+                ):
                     self.errmsg(
                         'No file %s found; using "deparse" command instead to show source'
                         % filename
@@ -147,51 +162,36 @@ class ListCommand(DebuggerCommand):
             last = max_line
 
         bplist = self.core.bpmgr.bplist
-        opts = {
-            "reload_on_change": self.settings["reload"],
-            "output": self.settings["highlight"],
-            "strip_nl": False,
-        }
-        style = self.settings.get("style", "plain")
-        is_plain = style in ("plain", "none")
-
-        for field in ("highlight", "style"):
-            if field in self.settings:
-                opts[field] = self.settings[field]
+        source = SourceCache.get(
+            filename,
+            self.settings["highlight"],
+            self.settings.get("style"),
+            is_pyasm=is_pyasm,
+            reload_on_change=self.settings["reload"],
+        )
 
         try:
             if is_pyasm:
                 lineno = first
-                opts["strip_nl"] = True
-                opts["style"] = "plain"
+                opts = {"reload_on_change": self.settings["reload"], "style": "plain"}
 
                 # FIXME add approximate
                 line, pyasm_line_index = pyficache.get_pyasm_line(
                     filename, lineno, is_source_line=True, opts=opts
                 )
                 proc.list_lineno = lineno
-                if line is None:
+                if line is None or source is None:
                     self.errmsg(f"cannot find assembly for line number {lineno}")
                     return
-                while lineno <= last:
-                    if not is_plain:
-                        line = pyficache.highlight_string(
-                                line, lexer=pyficache.pyasm_lexer, style=style
-                            )
-                        if line.endswith("\n"):
-                            line = line[:-1]
-                    self.msg(line)
-                    pyasm_line_index += 1
-                    line, pyasm_line_index = pyficache.get_pyasm_line(
-                        filename, pyasm_line_index, is_source_line=False, opts=opts
-                    )
-                    if line is None:
-                        break
+                # pyasm_line_index counts from 1.
+                for i in range(pyasm_line_index - 1, len(source)):
+                    self.msg(source[i])
+                    pass
             else:
                 if first <= 0:
                     first = 1
                 for lineno in range(first, last + 1):
-                    line = pyficache.getline(filename, lineno, opts)
+                    line = source.getline(lineno) if source else None
                     if line is None:
                         line = linecache.getline(filename, lineno, proc.frame.f_globals)
                         pass
@@ -60,6 +60,12 @@ class MockUserInterface:
     def finalize(self, last_wishes=None):
         return
 
+    def flush(self):
+        return
+
+    def hold_output(self):
+        return
+
     def msg(self, msg):
         print(msg)
         return
@@ -127,6 +133,12 @@ class MockDebuggerCore:
     def canonic_filename(self, frame):
         return frame.f_code.co_filename
 
+    def canonic_cache_stats(self):
+        return {"files": 0, "code objects": 0, "hits": 0, "misses": 0}
+
+    def clear_canonic_cache(self):
+        pass
+
     def filename(self, name):
         return name
 
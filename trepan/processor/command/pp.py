@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#  Copyright (C) 2009, 2013, 2015, 2020, 2024 Rocky Bernstein
+#  Copyright (C) 2009, 2013, 2015, 2020, 2024, 2026 Rocky Bernstein
 #
 #  This program is free software: you can redistribute it and/or modify
 #  it under the terms of the GNU General Public License as published by
@@ -28,11 +28,15 @@ class PrettyPrintCommand(DebuggerCommand):
     Simple arrays are shown columnized horizontally. Other values are printed
     via *pprint.pformat()*.
 
+    A big value of any type, such as a long list, a deque or a DataFrame,
+    is shown by its type, its length and a short preview, along with a
+    handle. Use `expand` with the handle to see the rest.
+
     See also:
     ---------
 
     `pr` and `examine` for commands which do more in the way of
-    formatting."""
+    formatting, and `expand` to page through big values."""
 
     short_help = "Pretty print value of expression EXP"
 
@@ -43,7 +47,13 @@ class PrettyPrintCommand(DebuggerCommand):
     def run(self, args):
         arg = " ".join(args[1:])
         val = self.proc.eval(arg)
-        pp(val, self.settings["width"], self.msg_nocr, self.msg)
+        pp(
+            val,
+            self.settings["width"],
+            self.msg_nocr,
+            self.msg,
+            variables=self.proc.variables,
+        )
         return False
 
     pass
@@ -48,6 +48,7 @@ class SetSubstitute(Mbase_subcmd.DebuggerSubcommand):
 
     def run(self, args):
         pyficache.remap_file(args[1], args[0])
+        self.core.clear_canonic_cache()
 
     pass
 
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.lib.complete import complete_token
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+
+class SetThreadPolicy(DebuggerSubcommand):
+    """**set thread-policy** {**stop-all** | **stop-this-only**}
+
+    Set what happens to the other threads of the program when a thread
+    stops in the debugger:
+
+           stop-all:       other threads stop at their next traced event, and
+                           wait there until the debugger resumes. This is the default.
+           stop-this-only: other threads keep running. They stop only when they
+                           reach a breakpoint, and then one at a time.
+
+    Stepping with `step`, `next` and `finish` applies only to the thread
+    that the command was given in.
+
+    Examples:
+    --------
+
+        set thread-policy stop-this-only # let a worker pool keep running
+        set thread-policy stop-all       # this is the default
+
+    See also:
+    ---------
+    `show thread-policy`, `info threads`"""
+
+    # Note: the "completion_choices" name is special and used by prompt_toolkit's completion
+    completion_choices = ["stop-all", "stop-this-only"]
+
+    in_list = True
+    max_args = 1
+    min_abbrev = len("thr")
+    min_args = 1
+    short_help = "Set what other threads do when a thread stops"
+
+    def __init__(self, cmd):
+        super().__init__(cmd)
+        # A module name can't have a dash in it.
+        self.name = "thread-policy"
+        return
+
+    def complete(self, prefix):
+        return complete_token(SetThreadPolicy.completion_choices, prefix)
+
+    def run(self, args):
+        policy = args[0]
+        if policy not in SetThreadPolicy.completion_choices:
+            self.errmsg(
+                f"Expecting one of: {', '.join(SetThreadPolicy.completion_choices)}; got: {policy}."
+            )
+            return
+        self.debugger.settings["thread_policy"] = policy
+        show_cmd = self.proc.commands["show"]
+        show_cmd.run(["show", self.name])
+        return
+
+    pass
+
+
+if __name__ == "__main__":
+    from trepan.processor.command.set_subcmd.__demo_helper__ import demo_run
+
+    demo_run(SetThreadPolicy, ["stop-this-only"])
+    pass
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2026 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+
+class ShowThreadPolicy(DebuggerSubcommand):
+    """**show thread-policy**
+
+    Show what happens to the other threads of the program when a thread
+    stops in the debugger.
+
+    See also:
+    ---------
+
+    `set thread-policy`"""
+
+    min_abbrev = len("thr")
+    short_help = "Show what other threads do when a thread stops"
+
+    def __init__(self, cmd):
+        super().__init__(cmd)
+        # A module name can't have a dash in it.
+        self.name = "thread-policy"
+        return
+
+    def run(self, args):
+        if len(args) != 0:
+            self.errmsg("Expecting no args")
+            return
+
+        policy = self.debugger.settings.get("thread_policy", "stop-all")
+        self.msg(f"Thread policy is {policy}")
+        return
+
+    pass
+
+
+if __name__ == "__main__":
+    from trepan.processor.command.set_subcmd import __demo_helper__ as Mhelper
+
+    sub = Mhelper.demo_run(ShowThreadPolicy, [])
+    pass
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2026 Rocky Bernstein <rocky@gnu.org>
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""The state of the debugger and of the debugged program as data
+rather than text, for front ends. See trepan.interfaces.machine.
+
+Everything returned is made of dictionaries, lists, strings, numbers,
+booleans and None. Values in the debugged program are described by
+trepan.lib.variables: their type name, length and a short preview,
+along with a handle for getting their children with "expand".
+"""
+
+import linecache
+from typing import Any, Dict, List, Optional
+
+from trepan.lib.display import signature
+
+
+def value_info(proc, value) -> Dict[str, Any]:
+    return proc.variables.describe(value)
+
+
+def frame_info(proc, frame, line_number: int) -> Dict[str, Any]:
+    return {
+        "filename": proc.core.canonic_filename(frame),
+        "line": line_number,
+        "function": frame.f_code.co_name,
+        "offset": frame.f_lasti,
+    }
+
+
+def location_info(proc) -> Optional[Dict[str, Any]]:
+    """Where we are stopped, or None if there is no stack."""
+    if not proc.stack or proc.curframe is None:
+        return None
+    frame, line_number, column_number = proc.stack[proc.curindex]
+    info = frame_info(proc, frame, line_number)
+    info["column"] = column_number
+    text = linecache.getline(info["filename"], line_number, frame.f_globals)
+    info["text"] = text.rstrip("\n") if text else None
+    return info
+
+
+def stack_info(proc, count: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Up to `count` stack entries, most recent first, like the
+    "backtrace" command."""
+    stack = proc.stack or []
+    n = len(stack) if count is None else min(len(stack), count)
+    entries = []
+    for level in range(n):
+        frame, line_number, _ = stack[len(stack) - level - 1]
+        info = frame_info(proc, frame, line_number)
+        info["level"] = level
+        info["current"] = frame is proc.curframe
+        entries.append(info)
+    return entries
+
+
+def breakpoint_info(bpmgr) -> List[Dict[str, Any]]:
+    return [
+        {
+            "number": bp.number,
+            "filename": bp.filename,
+            "line": bp.line_number,
+            "offset": bp.offset,
+            "enabled": bp.enabled,
+            "temporary": bp.temporary,
+            "condition": bp.condition,
+            "hits": bp.hits,
+            "ignore": bp.ignore,
+        }
+        for bp in bpmgr.bpbynumber
+        if bp is not None
+    ]
+
+
+def locals_info(proc, names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """The local variables of the current frame, or those in `names`
+    that exist."""
+    frame = proc.curframe
+    if frame is None:
+        return {}
+    f_locals = frame.f_locals
+    if names is None:
+        names = sorted(f_locals)
+    return {name: value_info(proc, f_locals[name]) for name in names if name in f_locals}
+
+
+def display_info(proc) -> List[Dict[str, Any]]:
+    """Display expressions, with their values in the current frame if
+    they belong to it and are enabled."""
+    frame = proc.curframe
+    sig = signature(frame)
+    displays = []
+    for display in proc.display_mgr.list:
+        info = {
+            "number": display.number,
+            "expression": display.arg,
+            "enabled": display.enabled,
+        }
+        if frame is not None and display.enabled and display.signature == sig:
+            try:
+                value = eval(display.code, frame.f_globals, frame.f_locals)
+            except Exception as e:
+                info["error"] = f"{e.__class__.__name__}: {e}"
+            else:
+                info.update(value_info(proc, value))
+        displays.append(info)
+    return displays
+
+
+def stop_info(proc) -> Dict[str, Any]:
+    """Everything a front end is likely to want to show when the
+    program stops, so that it doesn't have to ask."""
+    core = proc.core
+    info = {
+        "reason": core.stop_reason,
+        "trace_event": proc.event,
+        "thread": proc.thread_name,
+        "breakpoint": core.current_bp.number if core.current_bp else None,
+        "location": location_info(proc),
+        "stack": stack_info(proc),
+        "locals": locals_info(proc),
+        "displays": display_info(proc),
+    }
+    if proc.event == "return":
+        info["return_value"] = value_info(proc, proc.event_arg)
+    elif proc.event in ("exception", "c_exception") and proc.event_arg:
+        exc_type, exc_value = proc.event_arg[:2]
+        info["exception"] = {
+            "type": getattr(exc_type, "__name__", str(exc_type)),
+            "repr": proc._saferepr(exc_value),
+        }
+    return info
@@ -27,6 +27,7 @@ from typing import Optional
 import pyficache
 
 from trepan.lib.format import Filename, Hex, Symbol, format_line_number, format_token
+from trepan.lib.source import SourceCache, mapped_source
 from trepan.lib.stack import (
     check_path_with_frame,
     frame2file,
@@ -301,7 +302,8 @@ def print_location(proc_obj):
         elif "style" in proc_obj.debugger.settings:
             opts["style"] = proc_obj.settings("style")
 
-        pyficache.update_cache(filename)
+        if mapped_source(filename) is None:
+            pyficache.update_cache(filename)
 
         is_pyasm = pyficache.is_python_assembly_file(remapped_file or filename)
         if is_pyasm:
@@ -313,19 +315,31 @@ def print_location(proc_obj):
                 is_source_line=True,
                 offset=frame.f_lasti,
             )
+            if line is not None:
+                source = SourceCache.get(
+                    filename,
+                    opts["output"],
+                    opts.get("style"),
+                    is_pyasm=True,
+                    reload_on_change=opts["reload_on_change"],
+                )
+                if source is not None:
+                    # remapped_line_number counts from 1 here.
+                    line = source[remapped_line_number - 1]
             if remapped_line_number >= 0:
                 # FIXME: +1 is because getlines is 0 origin.
                 remapped_line_number += 1
-            if line is not None and opts["style"] not in ("plain", "none"):
-                line = pyficache.highlight_string(
-                    line, lexer=pyficache.pyasm_lexer, style=opts["style"]
-                )
-                if line.endswith("\n"):
-                    line = line[:-1]
 
         else:
             remapped_line_number = -1  # -1 means no remapping
-            line = pyficache.getline(filename, line_number, opts)
+            line = SourceCache.getline(
+                filename,
+                line_number,
+                opts["output"],
+                opts.get("style"),
+                is_pyasm=False,
+                reload_on_change=opts["reload_on_change"],
+            )
 
         if not line:
             if (